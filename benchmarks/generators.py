@@ -0,0 +1,162 @@
+"""
+Synthetic data generators for the benchmarks.
+
+This module writes workbooks (.xlsx, .xls, .csv) of a given size, sheet
+count and hit density, and folder trees full of them. The content depends
+only on the arguments, so runs with the same settings are comparable.
+"""
+
+import os
+import csv
+import random
+import importlib
+import importlib.util
+import openpyxl
+
+# Keyword planted in the generated cells and file names
+KEYWORD = "needle"
+
+# Formats make_workbook can write
+FORMATS = ("xlsx", "xls", "csv")
+
+# Limits of the .xls format
+_XLS_MAX_ROWS = 65536
+_XLS_MAX_COLS = 256
+
+def xls_available():
+    """
+    Whether .xls files can be written (needs the optional xlwt package).
+    """
+    return importlib.util.find_spec("xlwt") is not None
+
+def generate_rows(rows, cols, hit_density=0.001, fill=1.0, seed=0):
+    """
+    Generate the cell values of one sheet.
+
+    Filled cells hold text and numbers in turn; a hit_density fraction of
+    them contain KEYWORD.
+
+    Args:
+        rows, cols: Size of the sheet
+        hit_density: Fraction of the filled cells that contain KEYWORD
+        fill: Fraction of the cells that have a value, spread evenly; the
+            last column is always filled so every row has the full width
+        seed: Seed for the random hit positions
+
+    Yields:
+        list: Values of one row, None for empty cells
+    """
+    rng = random.Random(seed)
+    n = 0
+    for r in range(rows):
+        row = []
+        for c in range(cols):
+            i = r * cols + c
+            if c < cols - 1 and int((i + 1) * fill) == int(i * fill):
+                row.append(None)
+                continue
+            n += 1
+            if rng.random() < hit_density:
+                row.append(f"row {r + 1} {KEYWORD} {n}")
+            elif n % 2:
+                row.append(n * 1.5)
+            else:
+                row.append(f"text {n}")
+        yield row
+
+def make_workbook(path, rows, cols, sheets=1, hit_density=0.001, fill=1.0, seed=0):
+    """
+    Write a workbook, in the format given by the file extension.
+
+    A .csv file has a single sheet; sheets is ignored for it.
+
+    Args:
+        path: Path of the .xlsx, .xls or .csv file to write
+        rows, cols: Size of each sheet
+        sheets: Number of sheets
+        hit_density: Fraction of the filled cells that contain KEYWORD
+        fill: Fraction of the cells that have a value
+        seed: Seed for the random hit positions
+
+    Raises:
+        ImportError: For .xls when xlwt is not installed
+        ValueError: For an unknown extension, or a sheet too large for .xls
+    """
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext == "xlsx":
+        wb = openpyxl.Workbook(write_only=True)
+        for sheet_idx in range(sheets):
+            ws = wb.create_sheet(f"Sheet{sheet_idx + 1}")
+            for row in generate_rows(rows, cols, hit_density, fill, seed + sheet_idx):
+                ws.append(row)
+        wb.save(path)
+    elif ext == "csv":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            for row in generate_rows(rows, cols, hit_density, fill, seed):
+                writer.writerow(["" if value is None else value for value in row])
+    elif ext == "xls":
+        if not xls_available():
+            raise ImportError("xlwt module not available for writing .xls files")
+        if rows > _XLS_MAX_ROWS or cols > _XLS_MAX_COLS:
+            raise ValueError(f".xls sheets hold at most {_XLS_MAX_ROWS} rows and {_XLS_MAX_COLS} columns")
+        xlwt = importlib.import_module("xlwt")
+        wb = xlwt.Workbook()
+        for sheet_idx in range(sheets):
+            ws = wb.add_sheet(f"Sheet{sheet_idx + 1}")
+            for r, row in enumerate(generate_rows(rows, cols, hit_density, fill, seed + sheet_idx)):
+                for c, value in enumerate(row):
+                    if value is not None:
+                        ws.write(r, c, value)
+        wb.save(path)
+    else:
+        raise ValueError(f"Unsupported workbook format: {path}")
+
+def make_tree(root, folders, files, formats=("xlsx", "csv"), fanout=4, rows=100, cols=10,
+              sheets=1, hit_density=0.001, name_hit_ratio=0.1, seed=0):
+    """
+    Write a folder tree with workbooks spread across its folders.
+
+    The folders form a tree with up to fanout sub-folders each. Files go to
+    the folders in turn and cycle through the formats; a name_hit_ratio
+    fraction of them have KEYWORD in their name. Identical workbooks are
+    written once and copied.
+
+    Args:
+        root: Folder to create the tree in (created if needed)
+        folders: Number of folders, root not included
+        files: Number of files
+        formats: Formats to cycle through, from FORMATS
+        fanout: Maximum number of sub-folders per folder
+        rows, cols, sheets, hit_density: Size and content of each workbook
+        name_hit_ratio: Fraction of the files with KEYWORD in their name
+        seed: Seed for the random content and names
+
+    Returns:
+        list: Paths of the files written
+    """
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+
+    # Breadth-first, so the tree is as shallow as fanout allows
+    dirs = [root]
+    for idx in range(folders):
+        parent = dirs[idx // fanout]
+        path = os.path.join(parent, f"folder_{idx:05d}")
+        os.makedirs(path, exist_ok=True)
+        dirs.append(path)
+
+    templates = {}
+    paths = []
+    for idx in range(files):
+        ext = formats[idx % len(formats)]
+        name = f"{KEYWORD}_{idx:06d}" if rng.random() < name_hit_ratio else f"report_{idx:06d}"
+        path = os.path.join(dirs[idx % len(dirs)], f"{name}.{ext}")
+        if ext not in templates:
+            templates[ext] = path
+            make_workbook(path, rows, cols, sheets, hit_density, seed=seed)
+        else:
+            with open(templates[ext], "rb") as src, open(path, "wb") as dst:
+                dst.write(src.read())
+        paths.append(path)
+    return paths
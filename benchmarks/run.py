@@ -0,0 +1,191 @@
+"""
+Benchmark harness.
+
+Generates a synthetic folder tree of workbooks, times the filename search,
+the content search, the content index and the exports over it, and prints
+the timings as JSON, so builds can be compared before they are rolled out.
+
+Run from the project root:
+    python -m benchmarks.run [--folders 50] [--files 500] [--output results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from core.file_search import FileSearch
+from core.content_search import ContentSearch, BACKEND_THREAD, BACKEND_PROCESS
+from core.content_index import ContentIndex
+from utils.export import ExportManager
+from benchmarks.generators import make_tree, xls_available, KEYWORD, FORMATS
+
+# Word in about half of the generated text cells, for content index lookups
+COMMON_KEYWORD = "text"
+
+# Fraction of the files looked up in the content index by the *_subset timings
+LOOKUP_SUBSET_RATIO = 0.01
+
+def time_runs(func, repeat):
+    """
+    Call func repeat times.
+
+    Args:
+        func: Function without arguments returning the number of results
+        repeat: Number of runs
+
+    Returns:
+        dict: Best and all run times in seconds, and the number of results
+    """
+    runs = []
+    count = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = func()
+        runs.append(time.perf_counter() - start)
+    return {"best": min(runs), "runs": runs, "results": count}
+
+def run_benchmarks(root, files, args):
+    """
+    Time each operation over the generated tree.
+
+    Args:
+        root: Root folder of the tree
+        files: Paths of the generated files
+        args: Parsed command-line arguments
+
+    Returns:
+        dict: Timings per operation
+    """
+    timings = {}
+    keywords = [KEYWORD]
+
+    timings["filename_search"] = time_runs(
+        lambda: len(FileSearch(max_workers=args.workers).search_by_filename([root], keywords)),
+        args.repeat
+    )
+    found_files = FileSearch(max_workers=args.workers).search_by_filename([root], [])
+    timings["filename_list_all"] = time_runs(
+        lambda: len(FileSearch(max_workers=args.workers).search_by_filename([root], [])),
+        args.repeat
+    )
+
+    content_results = {}
+    for backend in args.backends:
+        # One search per backend, as the app keeps it; starting its pool isn't timed
+        search = ContentSearch(max_workers=args.workers, backend=backend)
+        try:
+            search.search_files_contents(files, keywords)
+            def content_search():
+                content_results.clear()
+                content_results.update(search.search_files_contents(files, keywords))
+                return sum(len(results) for results in content_results.values())
+            timings[f"content_search_{backend}"] = time_runs(content_search, args.repeat)
+        finally:
+            search.shutdown()
+
+    # Outside the tree, so the index is never searched
+    with tempfile.TemporaryDirectory(prefix="fe_bench_index_") as index_dir:
+        index = ContentIndex(os.path.join(index_dir, "content_index.db"))
+        # A second refresh has nothing to read, so the build is timed once
+        timings["content_index_build"] = time_runs(lambda: index.refresh([root]) and len(files), 1)
+        subset = files[::max(1, round(1 / LOOKUP_SUBSET_RATIO))]
+        for name, paths, keyword in (
+            ("content_index_lookup", files, KEYWORD),
+            ("content_index_lookup_subset", subset, KEYWORD),
+            ("content_index_lookup_common_subset", subset, COMMON_KEYWORD),
+        ):
+            def lookup():
+                answered, _ = index.lookup(paths, [keyword])
+                return sum(len(results) for results in answered.values())
+            timings[name] = time_runs(lookup, args.repeat)
+
+    # Outside the tree, so the exports are never searched
+    with tempfile.TemporaryDirectory(prefix="fe_bench_export_") as export_dir:
+        for name, export, results, filename in (
+            ("export_filenames_csv", ExportManager.export_filename_results, found_files, "files.csv"),
+            ("export_content_csv", ExportManager.export_content_results, content_results, "content.csv"),
+            ("export_content_txt", ExportManager.export_content_results, content_results, "content.txt"),
+        ):
+            path = os.path.join(export_dir, filename)
+            def run_export():
+                if not export(results, path):
+                    raise RuntimeError(f"{name} failed, see the log")
+                return len(results)
+            timings[name] = time_runs(run_export, args.repeat)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--folders", type=int, default=50, help="Folders in the tree")
+    parser.add_argument("--files", type=int, default=500, help="Workbooks in the tree")
+    parser.add_argument("--formats", default="xlsx,csv",
+                        help=f"Comma-separated workbook formats, from {', '.join(FORMATS)}")
+    parser.add_argument("--rows", type=int, default=200, help="Rows per sheet")
+    parser.add_argument("--cols", type=int, default=10, help="Columns per sheet")
+    parser.add_argument("--sheets", type=int, default=2, help="Sheets per workbook")
+    parser.add_argument("--hit-density", type=float, default=0.001,
+                        help="Fraction of the cells containing the keyword")
+    parser.add_argument("--name-hit-ratio", type=float, default=0.1,
+                        help="Fraction of the file names containing the keyword")
+    parser.add_argument("--backends", default=BACKEND_THREAD,
+                        help=f"Comma-separated content search backends ({BACKEND_THREAD}, {BACKEND_PROCESS})")
+    parser.add_argument("--workers", type=int, default=None, help="Worker threads or processes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per operation")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated content")
+    parser.add_argument("--dir", default=None,
+                        help="Folder to generate the tree in (default: a temporary folder, deleted afterwards)")
+    parser.add_argument("--output", default=None, help="Write the JSON to this file instead of stdout")
+    args = parser.parse_args()
+
+    args.formats = [fmt.strip().lower() for fmt in args.formats.split(",") if fmt.strip()]
+    args.backends = [backend.strip() for backend in args.backends.split(",") if backend.strip()]
+    unknown = [fmt for fmt in args.formats if fmt not in FORMATS]
+    if unknown or not args.formats:
+        parser.error(f"unknown formats: {', '.join(unknown)}")
+    if "xls" in args.formats and not xls_available():
+        parser.error("writing .xls files needs the xlwt package")
+
+    # Errors only; the searches log every file at INFO level
+    logging.basicConfig(level=logging.ERROR)
+
+    root = args.dir or tempfile.mkdtemp(prefix="fe_bench_")
+    try:
+        start = time.perf_counter()
+        files = make_tree(
+            root, args.folders, args.files, args.formats, rows=args.rows, cols=args.cols,
+            sheets=args.sheets, hit_density=args.hit_density, name_hit_ratio=args.name_hit_ratio,
+            seed=args.seed
+        )
+        generate_time = time.perf_counter() - start
+        timings = run_benchmarks(root, files, args)
+    finally:
+        if args.dir is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        "parameters": {
+            key: value for key, value in vars(args).items() if key not in ("dir", "output")
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": multiprocessing.cpu_count(),
+        },
+        "generate_seconds": generate_time,
+        "timings": timings,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Worksheet iteration benchmark.
+
+Times the per-cell cost of searching an openpyxl read-only worksheet, as
+search_content does for workbooks the streaming xlsx reader can't read,
+comparing the former Cell-object iteration with ExcelProcessor._search_worksheet.
+
+Run from the project root:
+    python -m benchmarks.worksheet_iteration [--rows 100000] [--cols 10] [--repeat 3]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import openpyxl
+
+from core.excel_processor import ExcelProcessor
+from core.keyword_matcher import KeywordMatcher
+from core.match_collector import MatchCollector
+from benchmarks.generators import make_workbook, KEYWORD
+
+def search_cells(sheet_name, sheet, matcher, collector):
+    """
+    The former loop: a Cell object per cell, empty cells searched as "".
+    """
+    for row_idx, row in enumerate(sheet.iter_rows(), start=1):
+        for col_idx, cell in enumerate(row, start=1):
+            cell_value_str = str(cell.value) if cell.value is not None else ""
+            for found_keyword in matcher.find_all(cell_value_str):
+                collector.add(
+                    found_keyword,
+                    sheet_name,
+                    f"{openpyxl.utils.get_column_letter(col_idx)}{row_idx}",
+                    cell_value_str
+                )
+
+def search_values(sheet_name, sheet, matcher, collector):
+    """
+    The current loop.
+    """
+    ExcelProcessor._search_worksheet(sheet_name, sheet, matcher, None, collector)
+
+def iterate_only(sheet_name, sheet, matcher, collector):
+    """
+    Read the cells without searching them, to measure the parsing alone.
+    """
+    for row in sheet.iter_rows(values_only=True):
+        for _ in row:
+            pass
+
+def time_search(path, search, matcher, repeat):
+    """
+    Search the workbook's first sheet, read-only as search_content opens it.
+
+    Returns:
+        tuple: (best time in seconds over repeat runs, number of matches)
+    """
+    best = None
+    for _ in range(repeat):
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            collector = MatchCollector()
+            start = time.perf_counter()
+            search(wb.sheetnames[0], wb[wb.sheetnames[0]], matcher, collector)
+            elapsed = time.perf_counter() - start
+        finally:
+            wb.close()
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(collector.results)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="Rows in the sheet")
+    parser.add_argument("--cols", type=int, default=10, help="Columns in the sheet")
+    parser.add_argument("--fill", type=float, default=0.5, help="Fraction of non-empty cells")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per loop, the best is reported")
+    args = parser.parse_args()
+
+    cells = args.rows * args.cols
+    matcher = KeywordMatcher([KEYWORD])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.xlsx")
+        print(f"Writing {cells:,} cells ({args.fill:.0%} filled)...")
+        make_workbook(path, args.rows, args.cols, fill=args.fill)
+
+        # Warm up the disk cache and the interpreter before timing anything
+        time_search(path, iterate_only, matcher, 1)
+        parse_time, _ = time_search(path, iterate_only, matcher, args.repeat)
+        print(f"{'parsing only':>13}: {parse_time:7.2f} s, {parse_time / cells * 1e9:6.0f} ns/cell")
+        for label, search in (("Cell objects", search_cells), ("values_only", search_values)):
+            elapsed, found = time_search(path, search, matcher, args.repeat)
+            print(
+                f"{label:>13}: {elapsed:7.2f} s, {elapsed / cells * 1e9:6.0f} ns/cell, "
+                f"{(elapsed - parse_time) / cells * 1e9:6.0f} ns/cell over parsing, {found} matches"
+            )
+
+if __name__ == "__main__":
+    main()
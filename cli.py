@@ -0,0 +1,347 @@
+"""
+Command-line entry point for the FindingExcellence application.
+
+Runs filename and content searches without a display, for scheduled jobs
+and servers, and streams the results to stdout or a file as JSON Lines or
+CSV. Never imports tkinter.
+
+Examples:
+    python cli.py C:\\Reports --keyword budget
+    python cli.py /data/shares --content invoice --format csv --output hits.csv
+
+Exit status: 0 if anything was found, 1 if nothing was, 2 on errors
+(including unreadable files and missing folders), 130 if interrupted.
+"""
+
+import os
+import sys
+import csv
+import json
+import logging
+import argparse
+import datetime
+import threading
+import multiprocessing
+from core.config_manager import ConfigManager, CONFIG_FILE
+from core.file_search import FileSearch
+from core.content_cache import ContentCache, CACHE_FILE
+from core.content_search import ContentSearch, BACKEND_THREAD, BACKEND_PROCESS
+from core.search_results import ContentError, MoreHits
+
+# Exit statuses, as grep uses them
+EXIT_FOUND = 0
+EXIT_NOT_FOUND = 1
+EXIT_ERROR = 2
+EXIT_INTERRUPTED = 130
+
+# Files per content search call; results are written after each call
+CONTENT_BATCH_FILES = 200
+
+FORMAT_JSON = "json"
+FORMAT_CSV = "csv"
+
+def default_cache_file():
+    """
+    Get the path of the content cache in the per-user cache folder.
+
+    Scheduled jobs often run from / or the home folder, so the cache isn't
+    put in the current folder as the GUI does.
+    """
+    if sys.platform == 'win32':
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+        folder = os.path.join(base, "FindingExcellence", "Cache")
+    elif sys.platform == 'darwin':
+        folder = os.path.join(os.path.expanduser("~/Library/Caches"), "FindingExcellence")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        folder = os.path.join(base, "finding_excellence")
+    return os.path.join(folder, CACHE_FILE)
+
+class ResultWriter:
+    """
+    Writes results as they arrive, one JSON object per line or one CSV row each.
+    """
+
+    FILE_COLUMNS = ["File Name", "Full Path", "Modified Date", "Size"]
+    CONTENT_COLUMNS = ["File Path", "Keyword", "Sheet", "Cell", "Value Snippet"]
+    MATCHING_FILE_COLUMNS = ["File Path", "Keywords"]
+
+    def __init__(self, stream, output_format, columns):
+        """
+        Initialize the writer and write the CSV header.
+
+        Args:
+            stream: Text stream to write to
+            output_format: FORMAT_JSON or FORMAT_CSV
+            columns: CSV header, one of the *_COLUMNS lists
+        """
+        self.stream = stream
+        self.output_format = output_format
+        self.found = 0
+        self.errors = 0
+        self._csv = None
+        if output_format == FORMAT_CSV:
+            self._csv = csv.writer(stream)
+            self._csv.writerow(columns)
+
+    def write_files(self, matches):
+        """
+        Write a batch of FileMatch records.
+        """
+        for match in matches:
+            if self._csv is not None:
+                self._csv.writerow([match.name, match.path, match.modified, match.size])
+            else:
+                self._write_json({
+                    "type": "file", "name": match.name, "path": match.path,
+                    "modified": match.modified, "size": match.size,
+                })
+        self.found += len(matches)
+        self.stream.flush()
+
+    def write_content(self, results_map):
+        """
+        Write the content search results of a batch of files.
+
+        Args:
+            results_map: Dictionary mapping file paths to their search results
+        """
+        for file_path, findings in results_map.items():
+            for finding in findings:
+                if isinstance(finding, ContentError):
+                    self.errors += 1
+                    row = [file_path, "ERROR", "", "", finding.error]
+                    record = {"type": "error", "path": file_path, "error": finding.error}
+                elif isinstance(finding, MoreHits):
+                    row = [file_path, "MORE HITS", "", "", f"{finding.count} more hits not shown"]
+                    record = {"type": "more_hits", "path": file_path, "count": finding.count}
+                else:
+                    self.found += 1
+                    row = [file_path, finding.keyword, finding.sheet, finding.cell, finding.value]
+                    record = {
+                        "type": "match", "path": file_path, "keyword": finding.keyword,
+                        "sheet": finding.sheet, "cell": finding.cell, "value": finding.value,
+                    }
+                if self._csv is not None:
+                    self._csv.writerow(row)
+                else:
+                    self._write_json(record)
+        self.stream.flush()
+
+    def write_matching_files(self, matching_files):
+        """
+        Write the files of a batch that contain the keywords.
+
+        Args:
+            matching_files: Dictionary mapping file paths to the keywords found in them
+        """
+        for file_path, keywords in matching_files.items():
+            if self._csv is not None:
+                self._csv.writerow([file_path, "; ".join(keywords)])
+            else:
+                self._write_json({"type": "matching_file", "path": file_path, "keywords": keywords})
+        self.found += len(matching_files)
+        self.stream.flush()
+
+    def _write_json(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+def parse_date(text):
+    """
+    Parse a YYYY-MM-DD date argument.
+    """
+    try:
+        return datetime.date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{text}', expected YYYY-MM-DD")
+
+def positive_int(text):
+    """
+    Parse a worker count argument.
+    """
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return value
+
+def build_parser():
+    """
+    Build the command-line argument parser.
+    """
+    parser = argparse.ArgumentParser(
+        description="Search Excel and CSV files by name and content, without the GUI.",
+        epilog="Exit status: 0 if anything was found, 1 if nothing was, 2 on errors, 130 if interrupted."
+    )
+    parser.add_argument("folders", nargs="+", help="Folders to search")
+    parser.add_argument("-k", "--keyword", action="append", default=[],
+                        help="Keyword the file name must contain (repeatable; any of them matches)")
+    parser.add_argument("-x", "--exclude", action="append", default=[],
+                        help="Skip folders whose name contains this text (repeatable)")
+    parser.add_argument("-c", "--content", action="append", default=[],
+                        help="Search the matching files for this cell text (repeatable)")
+    parser.add_argument("-s", "--case-sensitive", action="store_true", help="Match case")
+    parser.add_argument("--since", type=parse_date, help="Only files modified on or after this date")
+    parser.add_argument("--until", type=parse_date, help="Only files modified on or before this date")
+    parser.add_argument("--first-hit-only", action="store_true",
+                        help="Stop reading each file at its first content match")
+    parser.add_argument("-l", "--files-only", action="store_true",
+                        help="With --content, only list the files containing the keywords, and which ones; "
+                             "each file is read until every keyword is found in it")
+    parser.add_argument("-f", "--format", choices=(FORMAT_JSON, FORMAT_CSV), default=FORMAT_JSON,
+                        help="Output format: JSON Lines or CSV (default: json)")
+    parser.add_argument("-o", "--output", help="Write the results to this file instead of stdout")
+    parser.add_argument("--walk-workers", type=positive_int,
+                        help="Directories listed concurrently")
+    parser.add_argument("--content-workers", type=positive_int,
+                        help="Content search worker threads or processes (default: config file)")
+    parser.add_argument("--backend", choices=(BACKEND_THREAD, BACKEND_PROCESS),
+                        help="Content search backend (default: config file, else thread)")
+    parser.add_argument("--cache", default=None,
+                        help="Content search cache file (default: in the per-user cache folder)")
+    parser.add_argument("--no-cache", action="store_true", help="Don't use the content search cache")
+    parser.add_argument("--config", default=CONFIG_FILE, help="Configuration file")
+    parser.add_argument("--progress", action="store_true", help="Show progress on stderr")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log search details on stderr")
+    return parser
+
+def run(args, stream):
+    """
+    Run the searches and write their results.
+
+    Args:
+        args: Parsed command-line arguments
+        stream: Text stream the results are written to
+
+    Returns:
+        int: Exit status
+    """
+    config_manager = ConfigManager(args.config)
+    cancel_event = threading.Event()
+    error = False
+
+    folders = []
+    for folder in args.folders:
+        if os.path.isdir(folder):
+            folders.append(folder)
+        else:
+            print(f"cli: {folder}: no such folder", file=sys.stderr)
+            error = True
+    if not folders:
+        return EXIT_ERROR
+
+    status_callback = None
+    if args.progress:
+        def status_callback(msg):
+            print(msg, file=sys.stderr, flush=True)
+
+    if not args.content:
+        columns = ResultWriter.FILE_COLUMNS
+    elif args.files_only:
+        columns = ResultWriter.MATCHING_FILE_COLUMNS
+    else:
+        columns = ResultWriter.CONTENT_COLUMNS
+    writer = ResultWriter(stream, args.format, columns)
+    # The GUI's filename and content indexes are refreshed in the background
+    # after each search, which a short-lived process would only start; always walk
+    file_search = FileSearch(cancel_event, max_workers=args.walk_workers)
+
+    if not args.content:
+        file_search.search_by_filename(
+            folders, args.keyword, args.since, args.until, args.exclude, args.case_sensitive,
+            status_callback=status_callback, results_callback=writer.write_files
+        )
+        return EXIT_ERROR if error else (EXIT_FOUND if writer.found else EXIT_NOT_FOUND)
+
+    found_files = file_search.search_by_filename(
+        folders, args.keyword, args.since, args.until, args.exclude, args.case_sensitive,
+        status_callback=status_callback
+    )
+
+    content_cache = None
+    if not args.no_cache and config_manager.get("use_content_cache", True):
+        cache_file = args.cache or default_cache_file()
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(cache_file)), exist_ok=True)
+            content_cache = ContentCache(
+                cache_file, max_bytes=config_manager.get("content_cache_max_mb", 256) * 1024 * 1024
+            )
+        except Exception as e:
+            # e.g. a read-only home folder in a container; the search works without it
+            logging.warning(f"Could not open content cache {cache_file}, searching without it: {e}")
+
+    content_search = ContentSearch(
+        cancel_event,
+        max_workers=args.content_workers or config_manager.get("content_search_workers", None),
+        backend=args.backend or config_manager.get("content_search_backend", BACKEND_THREAD),
+        content_cache=content_cache,
+        max_hits_per_file=config_manager.get("content_max_hits_per_file", 1000),
+        max_value_chars=config_manager.get("content_max_value_chars", 200)
+    )
+    file_paths = [match.path for match in found_files]
+    total = len(file_paths)
+    try:
+        for start in range(0, total, CONTENT_BATCH_FILES):
+            batch = file_paths[start:start + CONTENT_BATCH_FILES]
+
+            progress_callback = None
+            if args.progress:
+                def progress_callback(current, _batch_total, done=start):
+                    print(f"Content search: Processed {done + current}/{total} files...",
+                          file=sys.stderr, flush=True)
+
+            if args.files_only:
+                writer.write_matching_files(content_search.find_matching_files(
+                    batch, args.content, args.case_sensitive,
+                    progress_callback=progress_callback, stop_at_first_hit=args.first_hit_only
+                ))
+            else:
+                writer.write_content(content_search.search_files_contents(
+                    batch, args.content, args.case_sensitive,
+                    progress_callback=progress_callback, stop_at_first_hit=args.first_hit_only
+                ))
+    finally:
+        content_search.shutdown()
+
+    if error or writer.errors:
+        return EXIT_ERROR
+    return EXIT_FOUND if writer.found else EXIT_NOT_FOUND
+
+def main(argv=None):
+    """
+    Parse the arguments, run the searches and return the exit status.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.files_only and not args.content:
+        parser.error("--files-only needs --content")
+
+    # Results go to stdout, so logs only go to stderr
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(levelname)s: %(message)s'
+    )
+
+    try:
+        if args.output:
+            with open(args.output, 'w', newline='', encoding='utf-8') as f:
+                return run(args, f)
+        if args.format == FORMAT_CSV:
+            # The csv module writes its own line endings
+            sys.stdout.reconfigure(newline='')
+        return run(args, sys.stdout)
+    except KeyboardInterrupt:
+        print("cli: interrupted", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); don't fail on flushing stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_FOUND
+    except Exception as e:
+        logging.error(f"Search failed: {e}", exc_info=args.verbose)
+        return EXIT_ERROR
+
+if __name__ == "__main__":
+    # Required for the process-based content search
+    multiprocessing.freeze_support()
+    sys.exit(main())
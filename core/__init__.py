@@ -2,4 +2,7 @@
 
 from core.config_manager import ConfigManager
 from core.file_search import FileSearch
+from core.file_index import FileIndex
+from core.content_cache import ContentCache
+from core.content_index import ContentIndex
 from core.content_search import ContentSearch
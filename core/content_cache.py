@@ -0,0 +1,380 @@
+"""
+Content cache module.
+
+This module keeps a persistent SQLite cache of content search hits, stored
+per file and keyword, so repeat searches over unchanged files don't parse
+the workbooks again, even when some of the keywords changed.
+"""
+
+import os
+import re
+import json
+import zlib
+import sqlite3
+import logging
+import time
+from core.search_results import ContentMatch, MoreHits
+
+# Default cache database file
+CACHE_FILE = "finding_excellence_content_cache.db"
+
+# Default upper bound on the size of the stored hits
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Upper bound on the number of unreadable files remembered
+MAX_UNREADABLE_FILES = 65536
+
+# Bump when the schema or the stored format changes; the cache is simply rebuilt
+_SCHEMA_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sheets TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hits (
+    path TEXT NOT NULL,
+    case_sensitive INTEGER NOT NULL,
+    pattern TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (path, case_sensitive, pattern)
+);
+CREATE TABLE IF NOT EXISTS unreadable (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_last_used ON files (last_used);
+"""
+
+_CELL_REF = re.compile(r"([A-Za-z]+)(\d+)$")
+
+def _pattern(keyword, case_sensitive):
+    """
+    Get the form a keyword is matched (and cached) in, as KeywordMatcher does.
+    """
+    return keyword if case_sensitive else keyword.lower()
+
+def _cell_sort_key(ref):
+    """
+    Get a (row, column) sort key for an A1-style cell reference.
+
+    Raw text matches ("byte 1234") sort by their offset.
+    """
+    match = _CELL_REF.match(ref)
+    if not match:
+        if ref.startswith("byte ") and ref[5:].isdigit():
+            return (int(ref[5:]), 0)
+        return (0, 0)
+    col = 0
+    for ch in match.group(1).upper():
+        col = col * 26 + (ord(ch) - 64)
+    return (int(match.group(2)), col)
+
+class CachedFile:
+    """
+    What the cache knows about one file for a given search.
+    """
+
+    __slots__ = ('path', 'size', 'mtime', 'sheets', 'hits', 'missing')
+
+    def __init__(self, path, size, mtime, sheets, hits, missing):
+        """
+        Initialize a cache lookup result.
+
+        Args:
+            path: File path
+            size: File size when looked up (None if the file couldn't be stat'ed)
+            mtime: File modification time when looked up
+            sheets: Known sheet names in workbook order
+            hits: Dict mapping cached patterns to lists of (sheet, cell, value)
+            missing: Keywords that still have to be searched in the file
+        """
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.sheets = sheets
+        self.hits = hits
+        self.missing = missing
+
+class ContentCache:
+    """
+    Persistent cache of content search hits, keyed by file path, size and mtime.
+
+    Files whose size or modification time changed are searched again. The
+    least recently used files are evicted once the stored hits exceed
+    max_bytes. All methods open their own connection, but the cache is meant
+    to be used from the thread that runs the search, not from its workers.
+    """
+
+    def __init__(self, db_file=CACHE_FILE, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the content cache.
+
+        Args:
+            db_file: Path to the SQLite database file
+            max_bytes: Upper bound on the size of the stored (compressed) hits
+        """
+        self.db_file = db_file
+        self.max_bytes = max_bytes
+
+        conn = self._connect()
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                conn.executescript(
+                    "DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS hits; DROP TABLE IF EXISTS unreadable;"
+                )
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        """
+        Open a new connection to the cache database.
+
+        Returns:
+            sqlite3.Connection: Open database connection
+        """
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def lookup(self, file_paths, keywords, case_sensitive=False):
+        """
+        Find the cached hits of each file for the given keywords.
+
+        Args:
+            file_paths: List of file paths to search
+            keywords: List of keywords to find
+            case_sensitive: Whether the search is case-sensitive
+
+        Returns:
+            dict: Dictionary mapping file paths to CachedFile objects
+        """
+        patterns = list(dict.fromkeys(_pattern(kw, case_sensitive) for kw in keywords))
+        lookups = {}
+        used = []
+        now = time.time()
+
+        conn = self._connect()
+        try:
+            for file_path in file_paths:
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    # Let the search itself report the problem
+                    lookups[file_path] = CachedFile(file_path, None, None, [], {}, list(keywords))
+                    continue
+
+                row = conn.execute("SELECT size, mtime, sheets FROM files WHERE path = ?", (file_path,)).fetchone()
+                hits = {}
+                sheets = []
+                if row is not None and row[0] == st.st_size and row[1] == st.st_mtime:
+                    sheets = json.loads(row[2])
+                    for pattern in patterns:
+                        cached = conn.execute(
+                            "SELECT data FROM hits WHERE path = ? AND case_sensitive = ? AND pattern = ?",
+                            (file_path, int(case_sensitive), pattern)
+                        ).fetchone()
+                        if cached is not None:
+                            hits[pattern] = [tuple(hit) for hit in json.loads(zlib.decompress(cached[0]))]
+                    if hits:
+                        used.append((now, file_path))
+
+                missing = [kw for kw in keywords if _pattern(kw, case_sensitive) not in hits]
+                lookups[file_path] = CachedFile(file_path, st.st_size, st.st_mtime, sheets, hits, missing)
+
+            if used:
+                with conn:
+                    conn.executemany("UPDATE files SET last_used = ? WHERE path = ?", used)
+        except sqlite3.Error as e:
+            logging.warning(f"Could not read content cache {self.db_file}: {e}")
+            return {
+                file_path: CachedFile(file_path, None, None, [], {}, list(keywords))
+                for file_path in file_paths
+            }
+        finally:
+            conn.close()
+
+        return lookups
+
+    def store(self, searched, case_sensitive=False):
+        """
+        Store the hits of newly searched keywords.
+
+        Only store complete results: a file whose search failed or was
+        cancelled must not be passed in.
+
+        Args:
+            searched: List of (CachedFile, results) tuples, where results are
+                the matches ExcelProcessor.search_content found for the
+                CachedFile's missing keywords
+            case_sensitive: Whether the search was case-sensitive
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                for cached_file, results in searched:
+                    if cached_file.size is None or not cached_file.missing:
+                        continue
+                    path = cached_file.path
+
+                    # Hits for keywords searched before, unless the file changed since
+                    row = conn.execute("SELECT size, mtime, sheets FROM files WHERE path = ?", (path,)).fetchone()
+                    if row is None or row[0] != cached_file.size or row[1] != cached_file.mtime:
+                        conn.execute("DELETE FROM hits WHERE path = ?", (path,))
+                        sheets = []
+                    else:
+                        sheets = json.loads(row[2])
+
+                    new_hits = {_pattern(kw, case_sensitive): [] for kw in cached_file.missing}
+                    for result in results:
+                        new_hits[_pattern(result.keyword, case_sensitive)].append(
+                            (result.sheet, result.cell, result.value)
+                        )
+                        if result.sheet not in sheets:
+                            sheets.append(result.sheet)
+
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO hits VALUES (?, ?, ?, ?)",
+                        [
+                            (path, int(case_sensitive), pattern, zlib.compress(json.dumps(hits).encode('utf-8')))
+                            for pattern, hits in new_hits.items()
+                        ]
+                    )
+                    total_bytes = conn.execute(
+                        "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM hits WHERE path = ?", (path,)
+                    ).fetchone()[0]
+                    conn.execute(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                        (path, cached_file.size, cached_file.mtime, json.dumps(sheets), total_bytes, now)
+                    )
+
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logging.warning(f"Could not update content cache {self.db_file}: {e}")
+        finally:
+            conn.close()
+
+    def unreadable_keys(self, file_paths):
+        """
+        Get what is stored about the given files being unreadable.
+
+        Args:
+            file_paths: List of file paths
+
+        Returns:
+            list: (path, size, mtime) keys of the files no parser could read,
+                as of when they were searched; see ExcelProcessor.remember_unreadable
+        """
+        keys = []
+        conn = self._connect()
+        try:
+            for file_path in file_paths:
+                row = conn.execute("SELECT size, mtime FROM unreadable WHERE path = ?", (file_path,)).fetchone()
+                if row is not None:
+                    keys.append((file_path, row[0], row[1]))
+        except sqlite3.Error as e:
+            logging.warning(f"Could not read content cache {self.db_file}: {e}")
+            return []
+        finally:
+            conn.close()
+        return keys
+
+    def store_unreadable(self, keys):
+        """
+        Remember files no parser could read, until they change.
+
+        Args:
+            keys: Iterable of (path, size, mtime) keys
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO unreadable VALUES (?, ?, ?)", keys)
+                # Replaced rows get a new rowid, so the lowest ones are the oldest
+                conn.execute(
+                    "DELETE FROM unreadable WHERE rowid <= (SELECT MAX(rowid) FROM unreadable) - ?",
+                    (MAX_UNREADABLE_FILES,)
+                )
+        except sqlite3.Error as e:
+            logging.warning(f"Could not update content cache {self.db_file}: {e}")
+        finally:
+            conn.close()
+
+    def _evict(self, conn):
+        """
+        Drop the least recently used files until the cache fits in max_bytes.
+
+        Args:
+            conn: Open database connection (inside a transaction)
+        """
+        total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM files").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for path, size in conn.execute("SELECT path, bytes FROM files ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((path,))
+            total -= size
+
+        conn.executemany("DELETE FROM hits WHERE path = ?", evicted)
+        conn.executemany("DELETE FROM files WHERE path = ?", evicted)
+        logging.info(f"Evicted {len(evicted)} files from the content cache")
+
+    @staticmethod
+    def merge(cached_file, results, keywords, case_sensitive=False):
+        """
+        Combine cached hits with the results of searching the missing keywords.
+
+        Args:
+            cached_file: CachedFile returned by lookup
+            results: Matches found for the missing keywords (may be empty)
+            keywords: All keywords of the search, in the order given
+            case_sensitive: Whether the search is case-sensitive
+
+        Returns:
+            list: List of matches in the format of ExcelProcessor.search_content
+        """
+        if not cached_file.hits:
+            return results
+
+        # A count of matches dropped by a per-file cap stays at the end
+        more_hits = [result for result in results if isinstance(result, MoreHits)]
+        results = [result for result in results if not isinstance(result, MoreHits)]
+
+        # Report each pattern under the first spelling given, as KeywordMatcher does
+        reported = {}
+        for kw in keywords:
+            reported.setdefault(_pattern(kw, case_sensitive), kw)
+        order = {pattern: idx for idx, pattern in enumerate(reported)}
+
+        merged = list(results)
+        for pattern, hits in cached_file.hits.items():
+            if pattern not in reported:
+                continue
+            keyword = reported[pattern]
+            for sheet, cell, value in hits:
+                merged.append(ContentMatch(keyword, sheet, cell, value))
+
+        # Put the hits back in workbook order, keywords in the order given within a cell
+        sheets = list(cached_file.sheets)
+        for result in results:
+            if result.sheet not in sheets:
+                sheets.append(result.sheet)
+        sheet_rank = {sheet: idx for idx, sheet in enumerate(sheets)}
+        merged.sort(key=lambda r: (
+            sheet_rank.get(r.sheet, len(sheet_rank)),
+            _cell_sort_key(r.cell),
+            order[_pattern(r.keyword, case_sensitive)]
+        ))
+        return merged + more_hits
@@ -0,0 +1,494 @@
+"""
+Content index module.
+
+This module maintains a persistent SQLite full-text index of the cells of
+every workbook under the configured search folders, so content searches
+can be answered without opening the files.
+"""
+
+import os
+import re
+import sqlite3
+import logging
+import threading
+import time
+from core.directory_crawler import DirectoryCrawler
+from core.excel_processor import ExcelProcessor
+from core.keyword_matcher import KeywordMatcher
+from core.search_results import ContentMatch
+
+# Default index database file
+CONTENT_INDEX_FILE = "finding_excellence_content_index.db"
+
+# Bump when the schema, the tokenization or the cell text read changes; the index is simply rebuilt
+_SCHEMA_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (
+    path TEXT PRIMARY KEY,
+    refreshed REAL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS cells (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    sheet TEXT NOT NULL,
+    cell TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tokens (
+    id INTEGER PRIMARY KEY,
+    token TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    token_id INTEGER NOT NULL,
+    cell_id INTEGER NOT NULL,
+    PRIMARY KEY (token_id, cell_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS token_grams (
+    gram TEXT NOT NULL,
+    token_id INTEGER NOT NULL,
+    PRIMARY KEY (gram, token_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_root ON files (root);
+CREATE INDEX IF NOT EXISTS cells_path ON cells (path);
+CREATE INDEX IF NOT EXISTS postings_cell ON postings (cell_id);
+"""
+
+# Cell text is split into lowercase runs of word characters
+_TOKEN = re.compile(r"\w+")
+
+# Length of the token substrings indexed in token_grams
+_GRAM_LENGTH = 3
+
+# Upper bound on the grams of a keyword intersected per lookup; more add little selectivity
+_MAX_LOOKUP_GRAMS = 16
+
+def _tokens(text):
+    """
+    Get the distinct tokens of a piece of text.
+    """
+    return set(_TOKEN.findall(text.lower()))
+
+def _grams(token):
+    """
+    Get the distinct trigrams of a token (none if it is shorter).
+    """
+    return {token[i:i + _GRAM_LENGTH] for i in range(len(token) - _GRAM_LENGTH + 1)}
+
+class ContentIndex:
+    """
+    Persistent inverted index from cell tokens to (file, sheet, cell).
+
+    Keywords keep their substring meaning: a keyword can only occur in a
+    cell that has a token containing the keyword's longest word. Those
+    tokens are found through an index of the tokens' trigrams (words of
+    one or two characters scan the vocabulary, which is far smaller than
+    the cells), and the candidate cells of the searched files are then
+    checked exactly with a KeywordMatcher.
+    """
+
+    def __init__(self, db_file=CONTENT_INDEX_FILE, extensions=None):
+        """
+        Initialize the content index.
+
+        Args:
+            db_file: Path to the SQLite database file
+            extensions: Tuple of lowercase file extensions to index
+        """
+        if extensions is None:
+            extensions = ExcelProcessor.SUPPORTED_EXTENSIONS
+
+        self.db_file = db_file
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.stop_event = threading.Event()
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread = None
+
+        conn = self._connect()
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                conn.executescript(
+                    "DROP TABLE IF EXISTS roots; DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS cells; "
+                    "DROP TABLE IF EXISTS tokens; DROP TABLE IF EXISTS postings; DROP TABLE IF EXISTS token_grams;"
+                )
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        """
+        Open a new connection to the index database.
+
+        Each operation uses its own connection so that searches never wait
+        for a background refresh to finish.
+
+        Returns:
+            sqlite3.Connection: Open database connection
+        """
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def lookup(self, file_paths, keywords, case_sensitive=False):
+        """
+        Answer a content search from the index.
+
+        Only files whose size and modification time are unchanged since they
+        were indexed are answered; the rest must be searched as usual.
+
+        Args:
+            file_paths: List of file paths to search
+            keywords: List of keywords to find
+            case_sensitive: Whether the search is case-sensitive
+
+        Returns:
+            tuple: (dict mapping answered file paths to their results in the
+                format of ExcelProcessor.search_content, list of file paths
+                that are not indexed)
+        """
+        answered = {}
+        not_indexed = []
+
+        conn = self._connect()
+        try:
+            for file_path in file_paths:
+                row = conn.execute("SELECT size, mtime, error FROM files WHERE path = ?", (file_path,)).fetchone()
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    # Let the search itself report the problem
+                    row = None
+                if row is None or row[2] is not None or row[0] != st.st_size or row[1] != st.st_mtime:
+                    not_indexed.append(file_path)
+                else:
+                    answered[file_path] = []
+
+            if not answered:
+                return answered, not_indexed
+
+            # Candidate cells of every keyword, keyed by id (which is workbook order)
+            candidates = {}
+            words = [_TOKEN.findall(kw.lower()) for kw in keywords]
+            # Nothing to look up, e.g. punctuation only: check every cell
+            scan_all = not all(words)
+
+            if not scan_all:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS lookup_files (path TEXT PRIMARY KEY)")
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS lookup_tokens (id INTEGER PRIMARY KEY)")
+                conn.execute("DELETE FROM lookup_files")
+                conn.execute("DELETE FROM lookup_tokens")
+                conn.executemany("INSERT INTO lookup_files VALUES (?)", ((path,) for path in answered))
+                for longest in {max(kw_words, key=len) for kw_words in words}:
+                    self._add_lookup_tokens(conn, longest)
+
+                for cell_id, path, sheet, cell, value in conn.execute(self._candidates_query(conn)):
+                    candidates[cell_id] = (path, sheet, cell, value)
+            else:
+                candidates = {}
+                for file_path in answered:
+                    for cell_id, sheet, cell, value in conn.execute(
+                        "SELECT id, sheet, cell, value FROM cells WHERE path = ?", (file_path,)
+                    ):
+                        candidates[cell_id] = (file_path, sheet, cell, value)
+        except sqlite3.Error as e:
+            logging.warning(f"Could not read content index {self.db_file}: {e}")
+            return {}, list(file_paths)
+        finally:
+            conn.close()
+
+        matcher = KeywordMatcher(keywords, case_sensitive)
+        for cell_id in sorted(candidates):
+            path, sheet, cell, value = candidates[cell_id]
+            for found_keyword in matcher.find_all(value):
+                answered[path].append(ContentMatch(found_keyword, sheet, cell, value))
+
+        return answered, not_indexed
+
+    @staticmethod
+    def _candidates_query(conn):
+        """
+        Get the query for the cells of the lookup_files having a lookup_tokens token.
+
+        The temp tables have no statistics, so the join order is chosen
+        here: from the postings of the tokens when they are fewer than the
+        cells of the files (rare keywords, many files), else from the cells
+        of the files (common keywords, few files). CROSS JOIN keeps SQLite
+        from reordering it.
+        """
+        postings = conn.execute(
+            "SELECT COUNT(*) FROM lookup_tokens t CROSS JOIN postings p ON p.token_id = t.id"
+        ).fetchone()[0]
+        # Counting stops as soon as the cells outnumber the postings
+        cells = conn.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM lookup_files f CROSS JOIN cells c ON c.path = f.path LIMIT ?)",
+            (postings + 1,)
+        ).fetchone()[0]
+        if postings < cells:
+            return (
+                "SELECT c.id, c.path, c.sheet, c.cell, c.value FROM lookup_tokens t "
+                "CROSS JOIN postings p ON p.token_id = t.id "
+                "CROSS JOIN cells c ON c.id = p.cell_id "
+                "WHERE c.path IN (SELECT path FROM lookup_files)"
+            )
+        return (
+            "SELECT c.id, c.path, c.sheet, c.cell, c.value FROM lookup_files f "
+            "CROSS JOIN cells c ON c.path = f.path "
+            "WHERE EXISTS (SELECT 1 FROM postings p WHERE p.cell_id = c.id "
+            "AND p.token_id IN (SELECT id FROM lookup_tokens))"
+        )
+
+    @staticmethod
+    def _add_lookup_tokens(conn, word):
+        """
+        Add the ids of the tokens containing a word to the lookup_tokens table.
+
+        Args:
+            conn: Open database connection with the lookup_tokens temp table
+            word: Lowercase word
+        """
+        grams = sorted(_grams(word))
+        if not grams:
+            conn.execute(
+                "INSERT OR IGNORE INTO lookup_tokens SELECT id FROM tokens WHERE instr(token, ?) > 0", (word,)
+            )
+            return
+        # Tokens having all of the word's trigrams, then checked for the word itself
+        step = max(1, len(grams) // _MAX_LOOKUP_GRAMS)
+        grams = grams[::step][:_MAX_LOOKUP_GRAMS]
+        having_grams = " INTERSECT ".join("SELECT token_id FROM token_grams WHERE gram = ?" for _ in grams)
+        conn.execute(
+            f"INSERT OR IGNORE INTO lookup_tokens SELECT id FROM tokens "
+            f"WHERE id IN ({having_grams}) AND instr(token, ?) > 0",
+            grams + [word]
+        )
+
+    def refresh(self, folder_paths, cancel_event=None, status_callback=None):
+        """
+        Bring the index entries of the given folders up to date.
+
+        Only files whose size or modification time changed since they were
+        indexed are read again; files that disappeared are dropped. Changes
+        are committed file by file, so an interrupted refresh keeps what it
+        has indexed so far.
+
+        Args:
+            folder_paths: List of root folders to refresh
+            cancel_event: Optional threading event for cancellation
+            status_callback: Function to call with status updates
+
+        Returns:
+            bool: True if all folders were refreshed, False if cancelled
+        """
+        if isinstance(folder_paths, str):
+            folder_paths = [folder_paths]
+
+        with self._refresh_lock:
+            for folder_path in folder_paths:
+                root = os.path.normpath(os.path.abspath(folder_path))
+                if not os.path.isdir(root):
+                    logging.warning(f"Dropping non-existent folder from content index: {root}")
+                    self._forget_root(root)
+                    continue
+
+                if status_callback:
+                    status_callback(f"Indexing contents of folder: {os.path.basename(root)}...")
+
+                conn = self._connect()
+                try:
+                    if not self._refresh_root(conn, root, cancel_event):
+                        logging.info(f"Content index refresh of {root} cancelled.")
+                        return False
+                finally:
+                    conn.close()
+
+        return True
+
+    def _refresh_root(self, conn, root, cancel_event):
+        """
+        Refresh a single root folder, re-reading only changed files.
+
+        Args:
+            conn: Open database connection
+            root: Normalized root folder path
+            cancel_event: Optional threading event for cancellation
+
+        Returns:
+            bool: True if the refresh completed, False if cancelled
+        """
+        started = time.time()
+        known = {
+            path: (size, mtime)
+            for path, size, mtime in conn.execute("SELECT path, size, mtime FROM files WHERE root = ?", (root,))
+        }
+
+        crawler = DirectoryCrawler(cancel_event=cancel_event)
+        seen = set()
+        changed = []
+        for listing in crawler.walk(
+            root,
+            file_filter=lambda name: os.path.splitext(name)[1].lower() in self.extensions,
+            stat_files=True
+        ):
+            for entry in listing.files:
+                try:
+                    st = entry.stat()  # Cached by the crawler
+                except OSError as e:  # File might have been moved/deleted
+                    logging.warning(f"Could not stat {entry.path} while indexing contents: {e}")
+                    continue
+                seen.add(entry.path)
+                if known.get(entry.path) != (st.st_size, st.st_mtime):
+                    changed.append((entry.path, st.st_size, st.st_mtime))
+
+        if cancel_event and cancel_event.is_set():
+            return False
+
+        removed = [path for path in known if path not in seen]
+        with conn:
+            for path in removed:
+                self._delete_file(conn, path)
+
+        for file_path, size, mtime in changed:
+            if cancel_event and cancel_event.is_set():
+                return False
+
+            # The cells go into the database batch by batch as they are read, in one
+            # transaction per file, so a huge file is never held in memory
+            with conn:
+                self._delete_file(conn, file_path)
+                error_msg = ExcelProcessor.extract_cells(
+                    file_path,
+                    lambda cells: self._insert_cells(conn, file_path, cells),
+                    cancel_event,
+                    on_reset=lambda: self._delete_file(conn, file_path)
+                )
+                # A cancelled read may have stopped part way through the file
+                if cancel_event and cancel_event.is_set():
+                    conn.rollback()
+                    return False
+                if error_msg:
+                    # Drop the cells read before the error
+                    self._delete_file(conn, file_path)
+                conn.execute(
+                    "INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+                    (file_path, root, size, mtime, error_msg)
+                )
+
+        now = time.time()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO roots VALUES (?, ?)", (root, now))
+
+        logging.info(
+            f"Refreshed content index of {root} in {now - started:.1f}s "
+            f"({len(changed)} files read, {len(removed)} dropped, {len(seen)} indexed)"
+        )
+        return True
+
+    @staticmethod
+    def _insert_cells(conn, file_path, cells):
+        """
+        Add a batch of the cells of a file and their postings.
+
+        Args:
+            conn: Open database connection (inside a transaction)
+            file_path: File path
+            cells: List of (sheet, cell, value) tuples in workbook order
+        """
+        postings = []
+        token_ids = {}
+        for sheet, cell, value in cells:
+            cell_id = conn.execute(
+                "INSERT INTO cells (path, sheet, cell, value) VALUES (?, ?, ?, ?)",
+                (file_path, sheet, cell, value)
+            ).lastrowid
+            for token in _tokens(value):
+                token_id = token_ids.get(token)
+                if token_id is None:
+                    cursor = conn.execute("INSERT OR IGNORE INTO tokens (token) VALUES (?)", (token,))
+                    if cursor.rowcount:
+                        token_id = cursor.lastrowid
+                        conn.executemany(
+                            "INSERT INTO token_grams VALUES (?, ?)",
+                            ((gram, token_id) for gram in _grams(token))
+                        )
+                    else:
+                        token_id = conn.execute("SELECT id FROM tokens WHERE token = ?", (token,)).fetchone()[0]
+                    token_ids[token] = token_id
+                postings.append((token_id, cell_id))
+        conn.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?)", postings)
+
+    @staticmethod
+    def _delete_file(conn, file_path):
+        """
+        Remove a file and its cells from the index.
+
+        Tokens no longer used by any cell are left in the vocabulary, with
+        their trigrams; they only cost a little space and lead to no cells.
+
+        Args:
+            conn: Open database connection (inside a transaction)
+            file_path: File path
+        """
+        conn.execute("DELETE FROM postings WHERE cell_id IN (SELECT id FROM cells WHERE path = ?)", (file_path,))
+        conn.execute("DELETE FROM cells WHERE path = ?", (file_path,))
+        conn.execute("DELETE FROM files WHERE path = ?", (file_path,))
+
+    def _forget_root(self, root):
+        """
+        Remove all entries of a root folder from the index.
+
+        Args:
+            root: Normalized root folder path
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                for (path,) in conn.execute("SELECT path FROM files WHERE root = ?", (root,)).fetchall():
+                    self._delete_file(conn, path)
+                conn.execute("DELETE FROM roots WHERE path = ?", (root,))
+        finally:
+            conn.close()
+
+    def start_background_refresh(self, folder_paths):
+        """
+        Refresh the given folders in a background thread.
+
+        Only one background refresh runs at a time; a request made while
+        another refresh is running is ignored. The refresh stops early
+        when stop() is called.
+
+        Args:
+            folder_paths: List of root folders to refresh
+
+        Returns:
+            bool: True if a refresh was started
+        """
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return False
+
+        if isinstance(folder_paths, str):
+            folder_paths = [folder_paths]
+
+        def run():
+            try:
+                self.refresh(list(folder_paths), self.stop_event)
+            except Exception as e:
+                logging.error(f"Error during background content index refresh: {e}", exc_info=True)
+
+        self._refresh_thread = threading.Thread(target=run, daemon=True)
+        self._refresh_thread.start()
+        return True
+
+    def stop(self):
+        """
+        Stop any running background refresh.
+        """
+        self.stop_event.set()
@@ -7,91 +7,358 @@ This module contains functionality for searching content within Excel files.
 import os
 import logging
 import threading
+import multiprocessing
 import concurrent.futures
 from core.excel_processor import ExcelProcessor
+from core.keyword_matcher import KeywordMatcher
+from core.content_cache import ContentCache
+from core.match_collector import MatchCollector
+from core.progress_reporter import ProgressReporter
+from core.search_results import ContentMatch, ContentError, MoreHits
+
+# Search backends
+BACKEND_THREAD = "thread"    # Threads in this process (light, but limited by the GIL)
+BACKEND_PROCESS = "process"  # Worker processes (parsing runs on all cores)
+
+# Upper bound on the number of files sent to a worker process at once
+PROCESS_CHUNK_SIZE = 16
+
+# Cancellation event shared with the worker processes, set by _init_process_worker
+_worker_cancel_event = None
+
+def _init_process_worker(cancel_event):
+    """
+    Initialize a content search worker process.
+    
+    Args:
+        cancel_event: multiprocessing.Event shared with the parent process
+    """
+    global _worker_cancel_event
+    _worker_cancel_event = cancel_event
+
+def _search_file_chunk(file_paths, keywords, case_sensitive, limits, unreadable_keys=()):
+    """
+    Search a chunk of files. Runs in a worker process.
+    
+    Matches are returned as plain tuples, which pickle smaller than the
+    result records.
+    
+    Args:
+        file_paths: List of file paths to search
+        keywords: List of keywords to find
+        case_sensitive: Whether to perform case-sensitive search
+        limits: (max_hits_per_keyword, stop_at_first_hit, max_hits_per_file,
+                max_value_chars) passed to search_content
+        unreadable_keys: Keys of the files known to be unreadable, see
+                ExcelProcessor.remember_unreadable
+        
+    Returns:
+        tuple: (list of (file_path, packed_results) tuples, list of the keys
+            of the files found unreadable by this chunk)
+    """
+    ExcelProcessor.remember_unreadable(unreadable_keys)
+    known_unreadable = ExcelProcessor.unreadable_keys()
+    matcher = KeywordMatcher(keywords, case_sensitive)
+    chunk_results = []
+    for file_path in file_paths:
+        if _worker_cancel_event is not None and _worker_cancel_event.is_set():
+            break
+        try:
+            results = ExcelProcessor.search_content(
+                file_path, keywords, case_sensitive, _worker_cancel_event, matcher, *limits
+            )
+        except Exception as e:
+            logging.error(f"Error processing file {file_path}: {e}")
+            results = [ContentError(f"Error processing file: {str(e)}", file_path)]
+        chunk_results.append((file_path, [_pack_result(result) for result in results]))
+    return chunk_results, list(ExcelProcessor.unreadable_keys() - known_unreadable)
+
+def _pack_result(result):
+    """
+    Convert a result record to a compact tuple for transfer between processes.
+    """
+    if isinstance(result, ContentError):
+        return (result.error,)
+    if isinstance(result, MoreHits):
+        return ('more_hits', result.count)
+    return (result.keyword, result.sheet, result.cell, result.value)
+
+def _unpack_result(packed, file_path):
+    """
+    Convert a tuple made by _pack_result back to a result record.
+    """
+    if len(packed) == 1:
+        return ContentError(packed[0], file_path)
+    if len(packed) == 2:
+        return MoreHits(packed[1])
+    return ContentMatch(*packed)
 
 class ContentSearch:
     """
     Handles content-based searching within files.
     """
     
-    def __init__(self, cancel_event=None, max_workers=None):
+    def __init__(self, cancel_event=None, max_workers=None, backend=BACKEND_THREAD, content_cache=None,
+                 content_index=None, max_hits_per_file=None, max_value_chars=None):
         """
         Initialize the content search functionality.
         
         Args:
             cancel_event: Threading event for cancellation
-            max_workers: Maximum number of worker threads
+            max_workers: Maximum number of worker threads or processes
+            backend: BACKEND_THREAD or BACKEND_PROCESS
+            content_cache: Optional ContentCache used to skip files searched before
+            content_index: Optional ContentIndex used to answer searches without opening files
+            max_hits_per_file: Keep at most this many matches per file; the
+                rest are only counted, in a final MoreHits record
+            max_value_chars: Store cell values longer than this as a snippet around the keyword
         """
         self.cancel_event = cancel_event or threading.Event()
+        self.content_cache = content_cache
+        self.content_index = content_index
+        self.max_hits_per_file = max_hits_per_file
+        self.max_value_chars = max_value_chars
+        
+        if backend not in (BACKEND_THREAD, BACKEND_PROCESS):
+            logging.warning(f"Unknown content search backend '{backend}', using '{BACKEND_THREAD}'")
+            backend = BACKEND_THREAD
+        self.backend = backend
         
         if max_workers is None:
-            # Using fewer workers by default to avoid overwhelming systems
-            max_workers = max(1, os.cpu_count() // 2)
+            if backend == BACKEND_PROCESS:
+                # Parsing is CPU bound, one process per core
+                max_workers = os.cpu_count() or 1
+            else:
+                # Using fewer workers by default to avoid overwhelming systems
+                max_workers = max(1, os.cpu_count() // 2)
             
         self.max_workers = max_workers
-        # Don't create executor in __init__ to avoid resource leaks
+        # Don't create executors in __init__ to avoid resource leaks
         self.executor = None
+        self._process_executor = None
+        self._process_cancel_event = None
         self._current_futures = []
     
     def search_files_contents(self, files_to_search, keywords, case_sensitive=False,
-                             progress_callback=None):
+                             progress_callback=None, max_hits_per_keyword=None, stop_at_first_hit=False):
         """
         Search for keywords within the content of multiple files.
         
+        Files the content index has read since they last changed are
+        answered from the index. With a content cache, only the keywords a
+        remaining file hasn't been searched for since it last changed are
+        searched; files that are fully cached aren't opened at all.
+        
         Args:
             files_to_search: List of file paths to search
             keywords: List of keywords to find
             case_sensitive: Whether to perform case-sensitive search
-            progress_callback: Function to call with progress updates
+            progress_callback: Function called with the number of files done and
+                the total, at most every PUBLISH_INTERVAL seconds and once at the end
+            max_hits_per_keyword: Report at most this many matches per keyword
+                and file, and stop reading a file once every keyword has them
+            stop_at_first_hit: Stop reading each file at its first match
             
         Returns:
             dict: Dictionary mapping file paths to their search results
         """
+        limits = (max_hits_per_keyword, stop_at_first_hit, self.max_hits_per_file, self.max_value_chars)
+        limited = MatchCollector(*limits).limited
+        reshaped = limited or self.max_hits_per_file is not None or self.max_value_chars is not None
+        total = len(files_to_search)
+        indexed = {}
+        to_search = files_to_search
+        
+        if self.content_index is not None:
+            try:
+                indexed, to_search = self.content_index.lookup(files_to_search, keywords, case_sensitive)
+            except Exception as e:
+                logging.error(f"Content index lookup failed, searching all files: {e}", exc_info=True)
+                indexed, to_search = {}, files_to_search
+            if indexed:
+                logging.info(f"Content search: {len(indexed)} of {total} files answered from the index.")
+        
+        cached_files = {}
+        jobs = [(file_path, keywords) for file_path in to_search]
+        
+        if self.content_cache is not None and to_search:
+            try:
+                cached_files = self.content_cache.lookup(to_search, keywords, case_sensitive)
+                jobs = [(file_path, cached_files[file_path].missing) for file_path in to_search
+                        if cached_files[file_path].missing]
+            except Exception as e:
+                logging.error(f"Content cache lookup failed, searching all files: {e}", exc_info=True)
+                cached_files = {}
+        
+        # Files no parser could read in earlier runs go straight to the raw text search
+        unreadable_before = None
+        if self.content_cache is not None and jobs:
+            try:
+                ExcelProcessor.remember_unreadable(
+                    self.content_cache.unreadable_keys([file_path for file_path, _ in jobs])
+                )
+            except Exception as e:
+                logging.error(f"Content cache lookup of unreadable files failed: {e}", exc_info=True)
+            unreadable_before = ExcelProcessor.unreadable_keys()
+        
+        cached_count = total - len(jobs)
+        if cached_count:
+            logging.info(f"Content search: {cached_count} of {total} files answered without opening them.")
+            if progress_callback:
+                progress_callback(cached_count, total)
+        
+        # Files complete far faster than the UI can show them; publish a few times per second
+        progress = ProgressReporter(
+            (lambda snapshot: progress_callback(snapshot["processed"], total)) if progress_callback else None,
+            processed=cached_count
+        )
+        
+        def report_progress(processed_count):
+            progress.update(processed=cached_count + processed_count)
+        
+        if self.backend == BACKEND_PROCESS:
+            searched = self._search_with_processes(jobs, case_sensitive, report_progress, limits)
+        else:
+            searched = self._search_with_threads(jobs, case_sensitive, report_progress, limits)
+        progress.flush()
+        
+        if unreadable_before is not None:
+            found_unreadable = ExcelProcessor.unreadable_keys() - unreadable_before
+            if found_unreadable:
+                try:
+                    self.content_cache.store_unreadable(found_unreadable)
+                except Exception as e:
+                    logging.error(f"Could not remember unreadable files: {e}", exc_info=True)
+        
+        # Cancelled or limited searches may have stopped part way through a file, so nothing is cached
+        if (self.content_cache is not None and cached_files and not limited
+                and not self.cancel_event.is_set()):
+            # Files that hit max_hits_per_file have matches missing, they aren't cached either
+            completed = [
+                (cached_files[file_path], results) for file_path, results in searched.items()
+                if not any(isinstance(result, (ContentError, MoreHits)) for result in results)
+            ]
+            try:
+                self.content_cache.store(completed, case_sensitive)
+            except Exception as e:
+                logging.error(f"Could not update content cache: {e}", exc_info=True)
+        
         all_results_map = {}  # Map path to results list
+        for file_path in files_to_search:
+            if file_path in indexed:
+                results = indexed[file_path]
+            else:
+                results = searched.get(file_path, [])
+            cached_file = cached_files.get(file_path)
+            if cached_file is not None and not any(isinstance(result, ContentError) for result in results):
+                results = ContentCache.merge(cached_file, results, keywords, case_sensitive)
+            if reshaped and (file_path in indexed or cached_file is not None):
+                # Hits from the index and the cache are complete, apply the limits to them too
+                collector = MatchCollector(*limits)
+                collector.start(KeywordMatcher(keywords, case_sensitive).distinct_keywords)
+                collector.extend(results)
+                results = collector.results
+            if results:  # Only add if there are findings or errors
+                all_results_map[file_path] = results
+        
+        return all_results_map
+    
+    def find_matching_files(self, files_to_search, keywords, case_sensitive=False,
+                            progress_callback=None, stop_at_first_hit=False):
+        """
+        Find which files contain which keywords, without collecting every matching cell.
+
+        Each file is read only until every keyword has been found in it, or
+        until its first match with stop_at_first_hit, which is much faster
+        for triage over many workbooks.
+
+        Args:
+            files_to_search: List of file paths to search
+            keywords: List of keywords to find
+            case_sensitive: Whether to perform case-sensitive search
+            progress_callback: Function to call with progress updates
+            stop_at_first_hit: Report only the first keyword found in each file
+
+        Returns:
+            dict: Dictionary mapping the paths of matching files to the
+                keywords found in them, in the order given
+        """
+        all_results = self.search_files_contents(
+            files_to_search, keywords, case_sensitive, progress_callback,
+            max_hits_per_keyword=1, stop_at_first_hit=stop_at_first_hit
+        )
+        order = {kw: idx for idx, kw in enumerate(keywords)}
+        matching_files = {}
+        for file_path, results in all_results.items():
+            found = {result.keyword for result in results if isinstance(result, ContentMatch)}
+            if found:
+                matching_files[file_path] = sorted(found, key=lambda kw: order.get(kw, len(order)))
+        return matching_files
+
+    def _search_with_threads(self, jobs, case_sensitive, report_progress, limits):
+        """
+        Search files in worker threads.
+        
+        Args:
+            jobs: List of (file_path, keywords) tuples
+            case_sensitive: Whether to perform case-sensitive search
+            report_progress: Function called with the number of files processed
+            limits: (max_hits_per_keyword, stop_at_first_hit, max_hits_per_file,
+                max_value_chars) passed to search_content
+            
+        Returns:
+            dict: Dictionary mapping each searched file path to its results
+        """
+        searched = {}
         processed_count = 0
         
+        # Compile each keyword list once and share the matcher across files
+        matchers = {}
+        for _, keywords in jobs:
+            if tuple(keywords) not in matchers:
+                matchers[tuple(keywords)] = KeywordMatcher(keywords, case_sensitive)
+        
         # Create executor for this search session
         if self.executor is None:
             self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
         
         try:
             # Submit all search tasks to the executor
-            futures = [
-                self.executor.submit(self._process_single_file, file_path, keywords, case_sensitive)
-                for file_path in files_to_search
-            ]
+            pending = {
+                self.executor.submit(
+                    self._process_single_file, file_path, keywords, case_sensitive,
+                    matchers[tuple(keywords)], limits
+                )
+                for file_path, keywords in jobs
+            }
             
             # Store futures for potential cancellation
-            self._current_futures = futures
+            self._current_futures = list(pending)
             
-            # Process completed futures as they finish
-            for future in concurrent.futures.as_completed(futures, timeout=1):
+            # Wait in short slices so cancellation is noticed, however long the search runs
+            while pending:
                 if self.cancel_event.is_set():
                     logging.info("Content search cancelled - stopping processing.")
+                    for future in pending:
+                        future.cancel()
                     break
-                    
-                try:
-                    file_path, single_file_results = future.result(timeout=0.1)
-                    if single_file_results:  # Only add if there are findings or errors
-                        all_results_map[file_path] = single_file_results
-                except concurrent.futures.TimeoutError:
-                    # Skip this future and continue
-                    continue
-                except concurrent.futures.CancelledError:
-                    logging.info("A content search task was cancelled.")
-                except Exception as e:
-                    # Handle unhandled errors from futures
-                    logging.error(f"Unhandled error from content search future: {e}", exc_info=True)
-                finally:
-                    processed_count += 1
-                    if progress_callback:
-                        progress_callback(processed_count, len(files_to_search))
-        
-        except concurrent.futures.TimeoutError:
-            # Normal timeout, check if cancelled
-            if self.cancel_event.is_set():
-                logging.info("Content search timed out and cancelled.")
+                
+                done, pending = concurrent.futures.wait(
+                    pending, timeout=0.2, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    try:
+                        file_path, single_file_results = future.result()
+                        searched[file_path] = single_file_results
+                    except concurrent.futures.CancelledError:
+                        logging.info("A content search task was cancelled.")
+                    except Exception as e:
+                        # Handle unhandled errors from futures
+                        logging.error(f"Unhandled error from content search future: {e}", exc_info=True)
+                    finally:
+                        processed_count += 1
+                        report_progress(processed_count)
+        
         except Exception as e:
             logging.error(f"Error in content search executor: {e}", exc_info=True)
             raise
@@ -99,9 +366,119 @@ class ContentSearch:
             # Clean up futures list
             self._current_futures = []
             
-        return all_results_map
+        return searched
     
-    def _process_single_file(self, file_path, keywords, case_sensitive):
+    def _search_with_processes(self, jobs, case_sensitive, report_progress, limits):
+        """
+        Search files in worker processes, sending them over in chunks.
+        
+        Args:
+            jobs: List of (file_path, keywords) tuples
+            case_sensitive: Whether to perform case-sensitive search
+            report_progress: Function called with the number of files processed
+            limits: (max_hits_per_keyword, stop_at_first_hit, max_hits_per_file,
+                max_value_chars) passed to search_content
+            
+        Returns:
+            dict: Dictionary mapping each searched file path to its results
+        """
+        searched = {}
+        processed_count = 0
+        total = len(jobs)
+        
+        # The pool is kept between searches, starting worker processes is slow
+        if self._process_executor is None:
+            ctx = multiprocessing.get_context()
+            self._process_cancel_event = ctx.Event()
+            self._process_executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=ctx,
+                initializer=_init_process_worker,
+                initargs=(self._process_cancel_event,)
+            )
+        self._process_cancel_event.clear()
+        
+        # Small chunks keep all workers busy on short lists, bigger ones cut IPC overhead
+        chunk_size = max(1, min(PROCESS_CHUNK_SIZE, total // (self.max_workers * 4)))
+        
+        # Files searched for the same keywords share chunks
+        groups = {}
+        for file_path, keywords in jobs:
+            groups.setdefault(tuple(keywords), []).append(file_path)
+        chunks = [
+            (paths[i:i + chunk_size], list(keywords))
+            for keywords, paths in groups.items()
+            for i in range(0, len(paths), chunk_size)
+        ]
+        
+        # Workers have their own memo of unreadable files, send them what this process knows
+        unreadable = {key[0]: key for key in ExcelProcessor.unreadable_keys()}
+        
+        try:
+            pending = {
+                self._process_executor.submit(
+                    _search_file_chunk, chunk, keywords, case_sensitive, limits,
+                    [unreadable[path] for path in chunk if path in unreadable]
+                ): len(chunk)
+                for chunk, keywords in chunks
+            }
+            self._current_futures = list(pending)
+            
+            while pending:
+                if self.cancel_event.is_set():
+                    logging.info("Content search cancelled - stopping worker processes.")
+                    self._process_cancel_event.set()
+                    for future in pending:
+                        future.cancel()
+                    break
+                
+                done, _ = concurrent.futures.wait(
+                    pending, timeout=0.2, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    chunk_len = pending.pop(future)
+                    try:
+                        chunk_results, unreadable_keys = future.result()
+                        for file_path, packed_results in chunk_results:
+                            searched[file_path] = [
+                                _unpack_result(packed, file_path) for packed in packed_results
+                            ]
+                        # Passed on to the workers by the next searches
+                        ExcelProcessor.remember_unreadable(unreadable_keys)
+                    except concurrent.futures.CancelledError:
+                        logging.info("A content search chunk was cancelled.")
+                    except concurrent.futures.BrokenExecutor as e:
+                        # A crashed worker breaks the whole pool, it is rebuilt on the next search
+                        logging.error(f"Content search worker process died: {e}", exc_info=True)
+                        self._shutdown_process_executor()
+                        pending.clear()
+                        break
+                    except Exception as e:
+                        logging.error(f"Unhandled error from content search process: {e}", exc_info=True)
+                    finally:
+                        processed_count += chunk_len
+                        report_progress(processed_count)
+        finally:
+            self._current_futures = []
+        
+        return searched
+    
+    def _shutdown_process_executor(self):
+        """
+        Shut down the worker process pool, if one was started.
+        """
+        if self._process_executor is not None:
+            if self._process_cancel_event is not None:
+                self._process_cancel_event.set()
+            try:
+                self._process_executor.shutdown(wait=False, cancel_futures=True)
+            except Exception as e:
+                logging.warning(f"Error during process pool shutdown: {e}")
+            self._process_executor = None
+            self._process_cancel_event = None
+    
+    def _process_single_file(self, file_path, keywords, case_sensitive, matcher=None,
+                             limits=(None, False, None, None)):
         """
         Process a single file for content searching.
         
@@ -109,6 +486,9 @@ class ContentSearch:
             file_path: Path to the file
             keywords: List of keywords to search for
             case_sensitive: Whether to use case-sensitive search
+            matcher: Optional shared KeywordMatcher for the keywords
+            limits: (max_hits_per_keyword, stop_at_first_hit, max_hits_per_file,
+                max_value_chars) passed to search_content
             
         Returns:
             tuple: (file_path, results_list)
@@ -121,11 +501,13 @@ class ContentSearch:
         try:
             # Use the ExcelProcessor to handle the Excel file
             # Pass the cancel_event so Excel processor can also check for cancellation
-            results = ExcelProcessor.search_content(file_path, keywords, case_sensitive, self.cancel_event)
+            results = ExcelProcessor.search_content(
+                file_path, keywords, case_sensitive, self.cancel_event, matcher, *limits
+            )
         except Exception as e:
             # If processing fails, log error and return empty results
             logging.error(f"Error processing file {file_path}: {e}")
-            results = [{'error': f"Error processing file: {str(e)}", 'file_path': file_path}]
+            results = [ContentError(f"Error processing file: {str(e)}", file_path)]
         
         return file_path, results
     
@@ -134,6 +516,8 @@ class ContentSearch:
         Cancel an ongoing search.
         """
         self.cancel_event.set()
+        if self._process_cancel_event is not None:
+            self._process_cancel_event.set()
         
         # Cancel all current futures if possible
         for future in self._current_futures:
@@ -172,6 +556,9 @@ class ContentSearch:
             # Clear the executor reference
             self.executor = None
         
+        # Stop worker processes
+        self._shutdown_process_executor()
+        
         # Clear futures list
         self._current_futures = []
         logging.info("Content search executor shut down successfully.")
@@ -0,0 +1,157 @@
+"""
+Streaming CSV reader module.
+
+This module searches .csv files one record at a time, so files of any size
+are searched in a fixed amount of memory. The encoding and the dialect
+(delimiter, quoting) are detected from a sample at the start of the file.
+"""
+
+import os
+import csv
+import codecs
+from openpyxl.utils import get_column_letter
+from core.match_collector import MatchCollector
+
+# Size of the sample used to detect the encoding and the dialect
+_SAMPLE_SIZE = 64 * 1024
+
+# Size of the blocks read from disk
+_READ_CHUNK_SIZE = 1024 * 1024
+
+# Delimiters the dialect detection chooses from
+_DELIMITERS = ",;\t|"
+
+# Byte order marks, longest first so UTF-32 isn't taken for UTF-16
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Encoding assumed for files that aren't valid UTF-8 (Excel's default on Windows)
+_FALLBACK_ENCODING = "cp1252"
+
+# Check for cancellation every this many records
+_CANCEL_CHECK_ROWS = 1000
+
+def detect_encoding(sample):
+    """
+    Guess the text encoding of a file from the bytes at its start.
+
+    Args:
+        sample: First bytes of the file
+
+    Returns:
+        str: Codec name
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # Not final: the sample may end in the middle of a character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return _FALLBACK_ENCODING
+
+class CsvReader:
+    """
+    Reads the cells of a .csv file as a stream of records.
+    """
+
+    def __init__(self, file_path):
+        """
+        Open the file and detect its encoding and dialect.
+
+        Args:
+            file_path: Path to the .csv file
+
+        Raises:
+            OSError: If the file can't be read
+        """
+        self.file_path = file_path
+        # Excel shows a CSV file as one sheet named after the file
+        self.sheet_name = os.path.splitext(os.path.basename(file_path))[0]
+
+        with open(file_path, 'rb') as f:
+            sample = f.read(_SAMPLE_SIZE)
+        self.encoding = detect_encoding(sample)
+
+        self._file = open(
+            file_path, 'r', encoding=self.encoding, errors='replace', newline='', buffering=_READ_CHUNK_SIZE
+        )
+        try:
+            self.dialect = self._detect_dialect(sample)
+        except Exception:
+            self._file.close()
+            raise
+
+    def close(self):
+        """
+        Close the file.
+        """
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _detect_dialect(self, sample):
+        """
+        Detect the delimiter and quoting from the sample.
+
+        Args:
+            sample: First bytes of the file
+
+        Returns:
+            csv.Dialect subclass: Detected dialect, or csv.excel if unsure
+        """
+        text = sample.decode(self.encoding, errors='replace')
+        # Only sniff complete lines, the last one may be cut off
+        if len(sample) == _SAMPLE_SIZE and "\n" in text:
+            text = text[:text.rindex("\n")]
+        try:
+            return csv.Sniffer().sniff(text, delimiters=_DELIMITERS)
+        except csv.Error:
+            return csv.excel
+
+    def search(self, matcher, cancel_event=None, collector=None):
+        """
+        Search every cell for the matcher's keywords.
+
+        Cell references count records, so a quoted value spanning several
+        lines is still one row, as in Excel.
+
+        Args:
+            matcher: KeywordMatcher for the keywords
+            cancel_event: Optional threading event for cancellation
+            collector: Optional MatchCollector; reading stops once it is done
+
+        Returns:
+            list: List of matches found, in the same format as ExcelProcessor.search_content
+
+        Raises:
+            csv.Error: If a record is malformed or a field exceeds csv.field_size_limit()
+        """
+        if collector is None:
+            collector = MatchCollector()
+        sheet_name = self.sheet_name
+        for row_idx, row in enumerate(csv.reader(self._file, self.dialect), start=1):
+            if collector.done:
+                break
+            if row_idx % _CANCEL_CHECK_ROWS == 0 and cancel_event and cancel_event.is_set():
+                break
+            for col_idx, value in enumerate(row, start=1):
+                if not value:
+                    continue
+                found = matcher.find_all(value)
+                if not found:
+                    continue
+                ref = f"{get_column_letter(col_idx)}{row_idx}"
+                for keyword in found:
+                    collector.add(keyword, sheet_name, ref, value)
+        return collector.results
@@ -0,0 +1,182 @@
+"""
+Directory crawler module.
+
+This module lists directory trees with os.scandir from a pool of threads.
+Listing a directory on a network share is mostly spent waiting for the
+server, so listing many directories at once hides most of that latency.
+"""
+
+import os
+import logging
+import queue
+import threading
+import concurrent.futures
+
+# Directory listings are I/O bound, so this can be well above the CPU count
+DEFAULT_CRAWL_WORKERS = 8
+
+class DirectoryListing:
+    """
+    The contents of one directory as produced by DirectoryCrawler.
+    """
+
+    __slots__ = ('root', 'path', 'parent', 'mtime', 'dirs', 'files', 'reused')
+
+    def __init__(self, root, path, parent, mtime, dirs, files, reused=False):
+        """
+        Initialize a directory listing.
+
+        Args:
+            root: Root folder the directory was reached from
+            path: Directory path
+            parent: Parent directory path (None for the root)
+            mtime: Directory modification time, if it was needed
+            dirs: List of (path, mtime) tuples for sub-directories that will be crawled
+            files: List of os.DirEntry objects for the files (None if reused)
+            reused: True if the listing was skipped via reuse_listing
+        """
+        self.root = root
+        self.path = path
+        self.parent = parent
+        self.mtime = mtime
+        self.dirs = dirs
+        self.files = files
+        self.reused = reused
+
+class DirectoryCrawler:
+    """
+    Walks directory trees, listing several directories concurrently.
+    """
+
+    def __init__(self, max_workers=None, cancel_event=None):
+        """
+        Initialize the crawler.
+
+        Args:
+            max_workers: Number of directories listed at the same time per root
+            cancel_event: Threading event for cancellation
+        """
+        self.max_workers = max_workers or DEFAULT_CRAWL_WORKERS
+        self.cancel_event = cancel_event or threading.Event()
+
+    def walk(self, root, dir_filter=None, file_filter=None, stat_files=False, reuse_listing=None):
+        """
+        Walk a single directory tree. See walk_many for the arguments.
+
+        Yields:
+            DirectoryListing: Contents of each directory
+        """
+        return self.walk_many([root], dir_filter, file_filter, stat_files, reuse_listing)
+
+    def walk_many(self, roots, dir_filter=None, file_filter=None, stat_files=False, reuse_listing=None):
+        """
+        Walk several directory trees at once, yielding one DirectoryListing per directory.
+
+        Each root gets its own pool of max_workers threads, so a slow share
+        only holds up its own listings. Directories are yielded in the order
+        their listings complete, interleaved across roots, not in os.walk
+        order. Symlinked directories are listed but not descended into, and
+        directories that can't be listed are logged and skipped, as with
+        os.walk.
+
+        Args:
+            roots: Root directories to walk
+            dir_filter: Function taking a sub-directory name, return False to prune it
+            file_filter: Function taking a file name, return False to drop the file
+            stat_files: Call DirEntry.stat() on kept files in the worker threads,
+                so the cached result is free for the caller
+            reuse_listing: Function taking (path, mtime) that returns the known
+                sub-directory paths of an unchanged directory, or None to list it.
+                When given, directory mtimes are collected for every directory.
+
+        Yields:
+            DirectoryListing: Contents of each directory
+        """
+        results = queue.Queue()
+        executors = {}
+        outstanding = 0
+
+        def scan(root, path, parent, mtime):
+            try:
+                return self._scan(root, path, parent, mtime, dir_filter, file_filter, stat_files, reuse_listing)
+            except OSError as e:
+                logging.warning(f"Could not list directory {path}: {e}")
+                return None
+
+        def submit(root, path, parent, mtime):
+            future = executors[root].submit(scan, root, path, parent, mtime)
+            future.add_done_callback(results.put)
+
+        try:
+            for root in dict.fromkeys(roots):
+                executors[root] = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="crawler"
+                )
+                submit(root, root, None, None)
+                outstanding += 1
+
+            while outstanding:
+                if self.cancel_event.is_set():
+                    logging.info(f"Directory crawl of {list(executors)} cancelled.")
+                    return
+
+                try:
+                    future = results.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                outstanding -= 1
+
+                if future.cancelled():
+                    continue
+                listing = future.result()
+                if listing is None:
+                    continue
+
+                for child_path, child_mtime in listing.dirs:
+                    submit(listing.root, child_path, listing.path, child_mtime)
+                    outstanding += 1
+
+                yield listing
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _scan(self, root, path, parent, mtime, dir_filter, file_filter, stat_files, reuse_listing):
+        """
+        List a single directory. Runs in a worker thread.
+
+        Returns:
+            DirectoryListing: Listing of the directory
+        """
+        if reuse_listing is not None:
+            if mtime is None:
+                mtime = os.stat(path).st_mtime
+            known_subdirs = reuse_listing(path, mtime)
+            if known_subdirs is not None:
+                # Sub-directory mtimes are fetched when they are scanned themselves
+                return DirectoryListing(root, path, parent, mtime, [(d, None) for d in known_subdirs], None, reused=True)
+
+        dirs = []
+        files = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        if entry.is_symlink():
+                            continue
+                        if dir_filter is not None and not dir_filter(entry.name):
+                            continue
+                        child_mtime = entry.stat().st_mtime if reuse_listing is not None else None
+                        dirs.append((entry.path, child_mtime))
+                        continue
+
+                    if file_filter is not None and not file_filter(entry.name):
+                        continue
+                    if stat_files:
+                        entry.stat()
+                except OSError as e:  # Entry might have been moved/deleted
+                    logging.warning(f"Could not stat {entry.path}: {e}")
+                    continue
+                files.append(entry)
+
+        return DirectoryListing(root, path, parent, mtime, dirs, files)
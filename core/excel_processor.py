@@ -6,9 +6,104 @@ This module handles the reading and analysis of Excel files.
 
 import os
 import logging
+import threading
+import numpy as np
 import openpyxl
 import pandas as pd
 import importlib
+from core.keyword_matcher import KeywordMatcher
+from core.xlsx_reader import XlsxReader
+from core.csv_reader import CsvReader
+from core.raw_text_scanner import RawTextScanner, RAW_TEXT_SHEET
+from core.match_collector import MatchCollector
+from core.search_results import ContentError
+from core.file_sniffer import sniff_file_type, KIND_OLE, KIND_XLSX
+
+# Upper bound on the number of unreadable files remembered
+MAX_UNREADABLE_FILES = 4096
+
+# Number of cells extract_cells hands over at once
+EXTRACT_BATCH_SIZE = 5000
+
+# (path, size, mtime) of files only a raw text search can read, oldest first.
+# Each process has its own; ContentSearch shares it with its worker processes
+# and persists it in the content cache
+_unreadable_files = {}
+_unreadable_lock = threading.Lock()
+
+def _file_key(file_path):
+    """
+    Get a (path, size, mtime) key that changes whenever the file does.
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (file_path, st.st_size, st.st_mtime)
+
+def _sniff(file_path):
+    """
+    Sniff a file's type, or None if it can't be read; diagnose_excel_file reports why.
+    """
+    try:
+        return sniff_file_type(file_path)
+    except OSError:
+        return None
+
+def _remember_unreadable(key):
+    """
+    Remember that the parsers failed on a file, dropping the oldest entry when full.
+    """
+    if key is None:
+        return
+    with _unreadable_lock:
+        if key not in _unreadable_files and len(_unreadable_files) >= MAX_UNREADABLE_FILES:
+            del _unreadable_files[next(iter(_unreadable_files))]
+        _unreadable_files[key] = True
+
+class _CellSink(MatchCollector):
+    """
+    Passes the cells read from a file on in batches instead of keeping them.
+
+    Used by extract_cells with the empty keyword, which every cell matches.
+    Only errors are kept; reading stops as soon as the file turns out to be
+    readable as raw bytes only.
+    """
+
+    def __init__(self, on_cells, on_reset, batch_size):
+        super().__init__()
+        self.on_cells = on_cells
+        self.on_reset = on_reset
+        self.batch_size = batch_size
+        self.raw_bytes = False
+        self._batch = []
+
+    def add(self, keyword, sheet, cell, value):
+        if self.done:
+            return
+        if sheet == RAW_TEXT_SHEET and cell is not None and cell.startswith("byte "):
+            self.raw_bytes = True
+            self.done = True
+            return
+        if value:
+            self._batch.append((sheet, cell, value))
+            if len(self._batch) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """
+        Pass on the cells read since the last batch.
+        """
+        if self._batch:
+            self.on_cells(self._batch)
+            self._batch = []
+
+    def reset(self):
+        super().reset()
+        self.raw_bytes = False
+        self._batch = []
+        if self.on_reset:
+            self.on_reset()
 
 class ExcelProcessor:
     """
@@ -20,7 +115,11 @@ class ExcelProcessor:
     @staticmethod
     def diagnose_excel_file(file_path):
         """
-        Diagnose and attempt to open an Excel file with various strategies.
+        Diagnose and attempt to open an Excel file with the strategy its contents call for.
+        
+        The file type is sniffed from its bytes, so only the parser that can
+        read it is tried. Files no parser can read are scanned as raw bytes,
+        and remembered until they change so later searches go straight there.
         
         Args:
             file_path: Path to the Excel file
@@ -42,114 +141,176 @@ class ExcelProcessor:
             if ext not in ExcelProcessor.SUPPORTED_EXTENSIONS:
                 return None, f"Unexpected file extension: {ext}"
             
+            # 3. Skip the parsers for files that already failed them
+            key = _file_key(file_path)
+            if ExcelProcessor.is_known_unreadable(file_path, key):
+                logging.info(f"Known unreadable file, using raw text search: {file_path}")
+                return RawTextScanner(file_path), None
+            
+            # 4. Find out what the file really is, whatever its extension
+            kind = sniff_file_type(file_path)
+            
             # Log diagnostic info    
-            logging.info(f"Diagnosing Excel file: {file_path} with extension {ext} and size {file_size} bytes")
-                
-            # 3. Try different strategies based on file type
-            if ext == '.xls':
-                # Use pandas with xlrd for .xls files
+            logging.info(
+                f"Diagnosing Excel file: {file_path} with extension {ext}, "
+                f"type {kind} and size {file_size} bytes"
+            )
+            
+            errors = []
+            if kind == KIND_OLE:
+                # Legacy .xls (whatever the extension); encrypted workbooks are OLE files too
                 try:
                     # Import xlrd here to avoid unnecessary dependencies
                     if importlib.util.find_spec("xlrd") is None:
-                        return None, "xlrd module not available for reading .xls files"
+                        raise ImportError("xlrd module not available for reading .xls files")
                         
-                    # Try to read with xlrd engine
-                    logging.info(f"Attempting to read .xls file with xlrd engine: {file_path}")
+                    logging.info(f"Attempting to read OLE file with xlrd engine: {file_path}")
                     df = pd.read_excel(file_path, engine='xlrd', sheet_name=None)
                     return df, None
                 except Exception as e:
                     error_msg = f"Failed to read .xls file: {str(e)}"
                     logging.error(error_msg)
-                    return None, error_msg
-            else:  # .xlsx or .xlsm
-                # Try different strategies for xlsx/xlsm files
-                errors = []
-                
-                # Strategy 1: direct openpyxl read_only — fastest, up to 50x less memory
+                    errors.append(error_msg)
+            elif kind == KIND_XLSX:
+                # openpyxl read_only — fastest, up to 50x less memory
                 try:
                     logging.info(f"Attempting read_only openpyxl: {file_path}")
+                    # Given a path, openpyxl goes by the extension and refuses a workbook
+                    # named .xls; a file object makes it read whatever the archive holds
                     wb = openpyxl.load_workbook(
-                        file_path, read_only=True, data_only=True, keep_links=False
+                        open(file_path, 'rb'), read_only=True, data_only=True, keep_links=False
                     )
                     return wb, None
                 except Exception as e:
                     error_msg = f"read_only openpyxl error: {str(e)}"
                     logging.error(error_msg)
                     errors.append(error_msg)
+            else:
+                errors.append(f"Not a readable workbook (detected type: {kind})")
                 
-                # Strategy 2: pandas with openpyxl (fallback for problematic files)
-                try:
-                    logging.info(f"Attempting pandas+openpyxl fallback: {file_path}")
-                    df = pd.read_excel(file_path, engine='openpyxl', sheet_name=None)
-                    return df, None
-                except Exception as e:
-                    error_msg = f"Pandas+openpyxl error: {str(e)}"
-                    logging.error(error_msg)
-                    errors.append(error_msg)
-                
-                # Strategy 3: Fallback for corrupted Excel files
-                try:
-                    # More primitive approach for problematic files
-                    # Read as text and check for keywords
-                    logging.info(f"Attempting fallback text-based search for: {file_path}")
-                    with open(file_path, 'rb') as f:
-                        raw_content = f.read()
-                        # Convert to string, ignore errors
-                        text_content = raw_content.decode('utf-8', errors='ignore')
-                    
-                    # Create wrapper to mimic Excel structure
-                    class SimpleTextWrapper:
-                        def __init__(self, content):
-                            self.content = content
-                            self.sheetnames = ['TextContent']
-                        
-                        def __getitem__(self, sheet_name):
-                            # Simple wrapper that generates mock cells
-                            class MockSheet:
-                                def __init__(self, content):
-                                    self.content = content
-                                
-                                def iter_rows(self):
-                                    # Return a single row with a single cell
-                                    class MockCell:
-                                        def __init__(self, value):
-                                            self.value = value
-                                    
-                                    return [[MockCell(self.content)]]
-                            
-                            return MockSheet(self.content)
-                    
-                    # If we have text content, use it as a last resort
-                    if text_content and len(text_content) > 0:
-                        logging.info(f"Using text-based fallback search for: {file_path}")
-                        return SimpleTextWrapper(text_content), None
-                except Exception as e:
-                    error_msg = f"Fallback text approach error: {str(e)}"
-                    logging.error(error_msg)
-                    errors.append(error_msg)
-                
-                # If nothing worked, return detailed error
+            # Fallback for corrupted Excel files
+            try:
+                # Scan the raw bytes through a memory map instead of reading the file
+                logging.info(f"Attempting fallback raw text search for: {file_path}")
+                scanner = RawTextScanner(file_path)
+            except Exception as e:
+                error_msg = f"Fallback text approach error: {str(e)}"
+                logging.error(error_msg)
+                errors.append(error_msg)
+                # If nothing worked, return detailed error (not remembered, it may be a passing I/O problem)
                 return None, "\n".join(["Multiple read attempts failed:"] + errors)
+            
+            _remember_unreadable(key)
+            return scanner, None
                 
         except Exception as general_error:
             return None, f"Diagnosis error: {str(general_error)}"
     
     @staticmethod
-    def search_content(file_path, keywords, case_sensitive=False, cancel_event=None):
+    def is_known_unreadable(file_path, key=None):
+        """
+        Check whether a file failed its parsers before and hasn't changed since.
+        
+        Args:
+            file_path: Path to the Excel file
+            key: The file's (path, size, mtime) key, if already known
+            
+        Returns:
+            bool: True if only a raw text search can read the file
+        """
+        if key is None:
+            key = _file_key(file_path)
+        with _unreadable_lock:
+            return key is not None and key in _unreadable_files
+    
+    @staticmethod
+    def unreadable_keys():
+        """
+        Get the (path, size, mtime) keys of the files known to be unreadable.
+        
+        Returns:
+            set: Keys remembered by this process
+        """
+        with _unreadable_lock:
+            return set(_unreadable_files)
+    
+    @staticmethod
+    def remember_unreadable(keys):
+        """
+        Remember files found unreadable elsewhere, e.g. by another process.
+        
+        Args:
+            keys: Iterable of (path, size, mtime) keys
+        """
+        for key in keys:
+            _remember_unreadable(tuple(key))
+    
+    @staticmethod
+    def extract_cells(file_path, on_cells, cancel_event=None, on_reset=None, batch_size=EXTRACT_BATCH_SIZE):
+        """
+        Read the text of every non-empty cell of a file.
+        
+        The text is exactly what search_content matches keywords against.
+        The cells are passed on in batches as they are read, so a file of
+        any size is read in bounded memory.
+        
+        Args:
+            file_path: Path to the Excel file
+            on_cells: Function called with each list of (sheet, cell, value)
+                tuples, in workbook order
+            cancel_event: Optional threading event for cancellation
+            on_reset: Function called when a reader fails part way and the
+                file is read again from the start; the cells passed on so
+                far are then to be dropped
+            batch_size: Number of cells per call of on_cells
+            
+        Returns:
+            str: Error message, or None if the file was read
+        """
+        sink = _CellSink(on_cells, on_reset, batch_size)
+        # The empty keyword is contained in every cell's text
+        results = ExcelProcessor.search_content(file_path, [""], True, cancel_event, collector=sink)
+        for result in results:
+            if isinstance(result, ContentError):
+                return result.error
+        if sink.raw_bytes:
+            # Raw bytes have no cells; such files have to be searched every time
+            return "File could only be read as raw bytes"
+        sink.flush()
+        return None
+    
+    @staticmethod
+    def search_content(file_path, keywords, case_sensitive=False, cancel_event=None, matcher=None,
+                       max_hits_per_keyword=None, stop_at_first_hit=False,
+                       max_hits_per_file=None, max_value_chars=None, collector=None):
         """
         Search for keywords in an Excel file's content.
         
+        A cell containing several keywords yields one match per keyword.
+        Files no parser can read are scanned as raw bytes; each occurrence
+        is a match whose cell is its byte offset ("byte 1234").
+        
         Args:
             file_path: Path to the Excel file
             keywords: List of keywords to search for
             case_sensitive: Whether to perform case-sensitive search
             cancel_event: Optional threading event for cancellation
+            matcher: Optional KeywordMatcher for the keywords, built once per
+                search and shared across files
+            max_hits_per_keyword: Report at most this many matches per keyword;
+                the file is read only until every keyword has them
+            stop_at_first_hit: Stop reading the file at its first match
+            max_hits_per_file: Keep at most this many matches; the rest are
+                only counted, in a final MoreHits record
+            max_value_chars: Store values longer than this as a snippet around the keyword
+            collector: Optional MatchCollector to add the matches to, in place of
+                one built from the limits above; it is reset if a reader fails
+                part way and the file is read again
             
         Returns:
-            list: List of matches found
+            list: ContentMatch records for the matches found, a ContentError record
+                if the file couldn't be searched, and a final MoreHits record if capped
         """
-        file_results = []
-        
         try:
             # Log file details
             try:
@@ -158,15 +319,29 @@ class ExcelProcessor:
             except Exception as e:
                 logging.warning(f"Unable to get file size for {file_path}: {e}")
             
-            # Prepare keywords based on case sensitivity
-            processed_keywords = keywords if case_sensitive else [k.lower() for k in keywords]
+            # Compile the keywords unless the caller shares a matcher across files
+            if matcher is None:
+                matcher = KeywordMatcher(keywords, case_sensitive)
+            if collector is None:
+                collector = MatchCollector(max_hits_per_keyword, stop_at_first_hit, max_hits_per_file, max_value_chars)
+            collector.start(matcher.distinct_keywords)
 
-            def check_cell(cell_val_str):
-                val_to_check = cell_val_str if case_sensitive else cell_val_str.lower()
-                for idx, kw in enumerate(processed_keywords):
-                    if kw in val_to_check:
-                        return keywords[idx]  # Return original keyword
-                return None
+            ext = os.path.splitext(file_path)[1].lower()
+            if ext == '.csv':
+                # Stream the records; neither openpyxl nor a whole-file read is of any use for text
+                with CsvReader(file_path) as reader:
+                    return reader.search(matcher, cancel_event, collector)
+            
+            # Fast path for workbook archives, whatever their extension says:
+            # stream the sheet XML instead of building openpyxl cells
+            if not ExcelProcessor.is_known_unreadable(file_path) and _sniff(file_path) == KIND_XLSX:
+                try:
+                    with XlsxReader(file_path) as reader:
+                        return reader.search(matcher, cancel_event, collector)
+                except Exception as e:
+                    logging.warning(f"Streaming xlsx reader failed for {file_path}, falling back to openpyxl: {e}")
+                    # Drop whatever the failed reader found before it gave up
+                    collector.reset()
 
             # Diagnose and open the file
             excel_data, error_msg = ExcelProcessor.diagnose_excel_file(file_path)
@@ -174,65 +349,34 @@ class ExcelProcessor:
             if error_msg:
                 # If diagnosis failed, log and return error
                 logging.error(f"Excel diagnosis error for {file_path}: {error_msg}")
-                file_results.append({'error': f"Error processing file: {error_msg}", 'file_path': file_path})
-                return file_results
+                collector.add_error(f"Error processing file: {error_msg}", file_path)
+                return collector.results
                 
             # Process based on the type of data returned
-            if isinstance(excel_data, dict):  # pandas DataFrame dict
+            if isinstance(excel_data, RawTextScanner):  # Unreadable file, raw bytes only
+                with excel_data:
+                    excel_data.search(matcher, cancel_event, collector)
+                    
+            elif isinstance(excel_data, dict):  # pandas DataFrame dict
                 # Process pandas DataFrames
                 for sheet_name, df in excel_data.items():
                     # Check for cancellation before processing each sheet
-                    if cancel_event and cancel_event.is_set():
-                        logging.debug(f"Content search cancelled while processing sheet {sheet_name} in {file_path}")
+                    if (cancel_event and cancel_event.is_set()) or collector.done:
+                        logging.debug(f"Content search stopped before sheet {sheet_name} in {file_path}")
                         break
-                        
-                    # Iterate over all cells
-                    for row_idx, row_series in df.iterrows():
-                        # Check for cancellation every few rows for responsiveness
-                        if cancel_event and cancel_event.is_set() and row_idx % 50 == 0:
-                            logging.debug(f"Content search cancelled at row {row_idx} in {file_path}")
-                            break
-                            
-                        for col_idx, cell_value in enumerate(row_series, start=1):
-                            # Process only if not NaN
-                            if pd.notna(cell_value):
-                                cell_value_str = str(cell_value)
-                                found_keyword = check_cell(cell_value_str)
-                                if found_keyword:
-                                    col_letter = openpyxl.utils.get_column_letter(col_idx)
-                                    # In pandas rows start at 0, add 1 for A1 notation
-                                    file_results.append({
-                                        'keyword': found_keyword, 
-                                        'sheet': sheet_name,
-                                        'cell': f"{col_letter}{row_idx+1}",
-                                        'value': cell_value_str
-                                    })
+                    ExcelProcessor._search_dataframe(sheet_name, df, matcher, cancel_event, collector)
                                     
             elif hasattr(excel_data, 'sheetnames'):  # openpyxl Workbook
                 # Process openpyxl workbook
                 for sheet_name in excel_data.sheetnames:
                     # Check for cancellation before processing each sheet
-                    if cancel_event and cancel_event.is_set():
-                        logging.debug(f"Content search cancelled while processing sheet {sheet_name} in {file_path}")
+                    if (cancel_event and cancel_event.is_set()) or collector.done:
+                        logging.debug(f"Content search stopped before sheet {sheet_name} in {file_path}")
                         break
                         
-                    sheet = excel_data[sheet_name]
-                    for row_idx, row in enumerate(sheet.iter_rows(), start=1):
-                        # Check for cancellation every few rows for responsiveness
-                        if cancel_event and cancel_event.is_set() and row_idx % 50 == 0:
-                            logging.debug(f"Content search cancelled at row {row_idx} in {file_path}")
-                            break
-                            
-                        for col_idx, cell in enumerate(row, start=1):
-                            cell_value_str = str(cell.value) if cell.value is not None else ""
-                            found_keyword = check_cell(cell_value_str)
-                            if found_keyword:
-                                file_results.append({
-                                    'keyword': found_keyword, 
-                                    'sheet': sheet_name,
-                                    'cell': f"{openpyxl.utils.get_column_letter(col_idx)}{row_idx}",
-                                    'value': cell_value_str
-                                })
+                    ExcelProcessor._search_worksheet(
+                        sheet_name, excel_data[sheet_name], matcher, cancel_event, collector
+                    )
             else:
                 # Unexpected object type
                 raise Exception(f"Unexpected data type returned from file diagnosis: {type(excel_data)}")
@@ -240,9 +384,102 @@ class ExcelProcessor:
         except Exception as e:
             logging.error(f"Error processing content of {file_path}: {e}", exc_info=True)
             # Add error marker for UI
-            file_results.append({
-                'error': f"Error processing file: {str(e)}", 
-                'file_path': file_path
-            })
+            if collector is None:
+                collector = MatchCollector()
+            collector.add_error(f"Error processing file: {str(e)}", file_path)
+        
+        return collector.results
+    
+    @staticmethod
+    def _search_worksheet(sheet_name, sheet, matcher, cancel_event, collector):
+        """
+        Search an openpyxl worksheet row by row and collect its matches.
+        
+        Rows are read as plain values, so no Cell objects are created; empty
+        cells, and numbers or dates no keyword can match, are skipped, and
+        the column letter is only computed for a match.
+        
+        Args:
+            sheet_name: Name of the sheet
+            sheet: openpyxl worksheet (read-only or not)
+            matcher: KeywordMatcher for the keywords
+            cancel_event: Optional threading event for cancellation
+            collector: MatchCollector the matches are added to
+        """
+        find_all = matcher.find_all
+        search_non_text = matcher.can_match_non_text
+        for row_idx, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+            # Check for cancellation every few rows for responsiveness
+            if collector.done or (row_idx % 50 == 0 and cancel_event and cancel_event.is_set()):
+                logging.debug(f"Content search stopped at row {row_idx} of sheet {sheet_name}")
+                return
+            
+            for col_idx, value in enumerate(row, start=1):
+                if type(value) is str:
+                    text = value
+                elif value is None or not search_non_text:
+                    continue
+                else:
+                    text = str(value)
+                found = find_all(text)
+                if not found:
+                    continue
+                cell_ref = f"{openpyxl.utils.get_column_letter(col_idx)}{row_idx}"
+                for found_keyword in found:
+                    collector.add(found_keyword, sheet_name, cell_ref, text)
+    
+    @staticmethod
+    def _search_dataframe(sheet_name, df, matcher, cancel_event, collector):
+        """
+        Search a pandas DataFrame column by column and collect its matches.
+        
+        Each column is converted to text once and pre-filtered with the
+        matcher's combined regex; only the cells it flags are checked with
+        find_all to get their keywords.
+        
+        Args:
+            sheet_name: Name of the sheet the DataFrame was read from
+            df: pandas DataFrame
+            matcher: KeywordMatcher for the keywords
+            cancel_event: Optional threading event for cancellation
+            collector: MatchCollector the matches are added to
+        """
+        pattern = matcher.regex()
+        hits = []  # (row position, column number, text)
+        
+        for col_idx in range(df.shape[1]):
+            # Check for cancellation before each column for responsiveness
+            if cancel_event and cancel_event.is_set():
+                logging.debug(f"Content search cancelled at column {col_idx + 1} of sheet {sheet_name}")
+                return
+            
+            column = df.iloc[:, col_idx]
+            present = column.notna().to_numpy()
+            if not present.any():
+                continue
+            values = column[present]
+            if pd.api.types.is_datetime64_any_dtype(values.dtype):
+                # astype(str) drops the time of day, str() of a Timestamp doesn't
+                text = values.map(str)
+            else:
+                text = values.astype(str)
+            
+            haystack = text if matcher.case_sensitive else text.str.lower()
+            flagged = haystack.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+            positions = np.nonzero(present)[0][flagged]
+            for row_pos, cell_text in zip(positions, text.to_numpy()[flagged]):
+                hits.append((row_pos, col_idx + 1, cell_text))
         
-        return file_results
+        # Report the matches in row order, as the cells appear in the sheet
+        hits.sort(key=lambda hit: (hit[0], hit[1]))
+        for row_pos, col_num, cell_text in hits:
+            if collector.done:
+                return
+            found = matcher.find_all(cell_text)
+            if not found:
+                continue
+            col_letter = openpyxl.utils.get_column_letter(col_num)
+            # In pandas rows start at 0, add 1 for A1 notation
+            cell_ref = f"{col_letter}{df.index[row_pos] + 1}"
+            for found_keyword in found:
+                collector.add(found_keyword, sheet_name, cell_ref, cell_text)
@@ -0,0 +1,398 @@
+"""
+File index module.
+
+This module maintains a persistent SQLite index of the files found under the
+configured search folders, so filename searches can be answered without
+walking the folders again.
+"""
+
+import os
+import sqlite3
+import datetime
+import logging
+import threading
+import time
+from core.directory_crawler import DirectoryCrawler
+from core.search_results import FileMatch
+
+# Default index database file
+INDEX_FILE = "finding_excellence_index.db"
+
+# Re-list every directory at least this often (seconds), see FileIndex.refresh
+FULL_REFRESH_INTERVAL = 24 * 60 * 60
+
+# Bump when the schema changes; the index is a cache and is simply rebuilt
+_SCHEMA_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (
+    path TEXT PRIMARY KEY,
+    refreshed REAL,
+    full_refreshed REAL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT NOT NULL,
+    root TEXT NOT NULL,
+    parent TEXT,
+    mtime REAL NOT NULL,
+    PRIMARY KEY (root, path)
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT NOT NULL,
+    root TEXT NOT NULL,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (root, path)
+);
+CREATE INDEX IF NOT EXISTS files_root_dir ON files (root, dir);
+"""
+
+class FileIndex:
+    """
+    Persistent index of file paths, names, extensions and modification times.
+
+    Rows are kept per root folder, so nested roots (e.g. a folder and one of
+    its sub-folders) each keep a complete copy of their files and refresh
+    independently.
+    """
+
+    def __init__(self, db_file=INDEX_FILE, extensions=None):
+        """
+        Initialize the file index.
+
+        Args:
+            db_file: Path to the SQLite database file
+            extensions: Tuple of lowercase file extensions to index
+        """
+        if extensions is None:
+            from core.excel_processor import ExcelProcessor
+            extensions = ExcelProcessor.SUPPORTED_EXTENSIONS
+
+        self.db_file = db_file
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.stop_event = threading.Event()
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread = None
+
+        conn = self._connect()
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                conn.executescript("DROP TABLE IF EXISTS roots; DROP TABLE IF EXISTS dirs; DROP TABLE IF EXISTS files;")
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        """
+        Open a new connection to the index database.
+
+        Each operation uses its own connection so that searches from the UI
+        thread never wait for a background refresh to finish.
+
+        Returns:
+            sqlite3.Connection: Open database connection
+        """
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        # SQLite's lower() only folds ASCII; use Python's to match str.lower()
+        conn.create_function("py_lower", 1, str.lower, deterministic=True)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def normalize_root(folder_path):
+        """
+        Normalize a root folder path so it can be used as an index key.
+
+        Args:
+            folder_path: Folder path as configured by the user
+
+        Returns:
+            str: Absolute, normalized folder path
+        """
+        return os.path.normpath(os.path.abspath(folder_path))
+
+    def covers(self, folder_paths, supported_extensions=None):
+        """
+        Check whether the index can answer a search over the given folders.
+
+        Args:
+            folder_paths: List of root folders
+            supported_extensions: Extensions the search is restricted to
+
+        Returns:
+            bool: True if every folder has been indexed at least once
+        """
+        if supported_extensions is not None:
+            if not set(ext.lower() for ext in supported_extensions) <= set(self.extensions):
+                return False
+
+        roots = [self.normalize_root(p) for p in folder_paths]
+        try:
+            conn = self._connect()
+            try:
+                indexed = {row[0] for row in conn.execute("SELECT path FROM roots WHERE refreshed IS NOT NULL")}
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.warning(f"Could not read file index {self.db_file}: {e}")
+            return False
+        return all(root in indexed for root in roots)
+
+    def search(self, folder_paths, filename_keywords, start_date=None, end_date=None,
+               exclude_keywords=None, case_sensitive=False, supported_extensions=None):
+        """
+        Search the index for files matching the given criteria.
+
+        The criteria have the same meaning as in FileSearch.search_by_filename:
+        keywords are matched against the file name, exclude keywords prune any
+        sub-directory whose name contains them.
+
+        Returns:
+            list: List of FileMatch records
+        """
+        if supported_extensions is None:
+            supported_extensions = self.extensions
+        if exclude_keywords is None:
+            exclude_keywords = []
+
+        roots = [self.normalize_root(p) for p in folder_paths]
+        extensions = [ext.lower() for ext in supported_extensions]
+
+        query = (
+            f"SELECT root, dir, name, path, mtime, size FROM files "
+            f"WHERE root = ? AND ext IN ({','.join('?' * len(extensions))})"
+        )
+        params = list(extensions)
+
+        if filename_keywords:
+            # instr() is a plain substring test, matching the walk's `kw in name`
+            name_column = "name" if case_sensitive else "py_lower(name)"
+            query += " AND (" + " OR ".join(f"instr({name_column}, ?) > 0" for _ in filename_keywords) + ")"
+            params.extend(kw if case_sensitive else kw.lower() for kw in filename_keywords)
+
+        if start_date:
+            start_ts = time.mktime(start_date.timetuple())
+            query += " AND mtime >= ?"
+            params.append(start_ts)
+        if end_date:
+            end_ts = time.mktime((end_date + datetime.timedelta(days=1)).timetuple())
+            query += " AND mtime < ?"
+            params.append(end_ts)
+
+        query += " ORDER BY path"
+
+        excludes = exclude_keywords if case_sensitive else [ex.lower() for ex in exclude_keywords]
+
+        found_files = []
+        conn = self._connect()
+        try:
+            for root in roots:
+                for root_dir, dir_path, name, file_path, mtime, size in conn.execute(query, [root] + params):
+                    if excludes and dir_path != root_dir:
+                        rel_dir = os.path.relpath(dir_path, root_dir)
+                        parts = rel_dir.split(os.sep)
+                        if not case_sensitive:
+                            parts = [part.lower() for part in parts]
+                        if any(ex in part for part in parts for ex in excludes):
+                            continue
+
+                    formatted_time = datetime.datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')
+                    found_files.append(FileMatch(name, file_path, formatted_time, mtime, size))
+        finally:
+            conn.close()
+
+        return found_files
+
+    def refresh(self, folder_paths, cancel_event=None, status_callback=None, full=False):
+        """
+        Bring the index entries of the given folders up to date.
+
+        Only directories whose modification time changed since the last
+        refresh are listed again; unchanged directories are skipped and only
+        their known sub-directories are checked. Note that editing a file in
+        place does not change its directory's modification time, so a full
+        re-listing is done when requested and at least every
+        FULL_REFRESH_INTERVAL seconds.
+
+        Args:
+            folder_paths: List of root folders to refresh
+            cancel_event: Optional threading event for cancellation
+            status_callback: Function to call with status updates
+            full: Re-list every directory regardless of its modification time
+
+        Returns:
+            bool: True if all folders were refreshed, False if cancelled
+        """
+        if isinstance(folder_paths, str):
+            folder_paths = [folder_paths]
+
+        with self._refresh_lock:
+            for folder_path in folder_paths:
+                root = self.normalize_root(folder_path)
+                if not os.path.isdir(root):
+                    logging.warning(f"Dropping non-existent folder from index: {root}")
+                    self._forget_root(root)
+                    continue
+
+                if status_callback:
+                    status_callback(f"Indexing folder: {os.path.basename(root)}...")
+
+                conn = self._connect()
+                try:
+                    if not self._refresh_root(conn, root, full, cancel_event):
+                        logging.info(f"Index refresh of {root} cancelled.")
+                        return False
+                finally:
+                    conn.close()
+
+        return True
+
+    def _refresh_root(self, conn, root, full, cancel_event):
+        """
+        Refresh a single root folder, re-listing only changed directories.
+
+        Args:
+            conn: Open database connection
+            root: Normalized root folder path
+            full: Re-list every directory regardless of its modification time
+            cancel_event: Optional threading event for cancellation
+
+        Returns:
+            bool: True if the refresh completed, False if cancelled
+        """
+        started = time.time()
+
+        row = conn.execute("SELECT full_refreshed FROM roots WHERE path = ?", (root,)).fetchone()
+        if row is None or row[0] is None or started - row[0] > FULL_REFRESH_INTERVAL:
+            full = True
+
+        # Snapshot of the directory tree as of the last refresh
+        known_mtimes = {}
+        known_children = {}
+        for dir_path, parent, mtime in conn.execute("SELECT path, parent, mtime FROM dirs WHERE root = ?", (root,)):
+            known_mtimes[dir_path] = mtime
+            if parent is not None:
+                known_children.setdefault(parent, []).append(dir_path)
+
+        def reuse_listing(dir_path, mtime):
+            # Unchanged listing: keep its files, but sub-directories may still have changed
+            if not full and known_mtimes.get(dir_path) == mtime:
+                return known_children.get(dir_path, [])
+            return None
+
+        crawler = DirectoryCrawler(cancel_event=cancel_event)
+        seen_dirs = set()
+        listed_dirs = 0
+
+        for listing in crawler.walk(
+            root,
+            file_filter=lambda name: os.path.splitext(name)[1].lower() in self.extensions,
+            stat_files=True,
+            reuse_listing=reuse_listing
+        ):
+            seen_dirs.add(listing.path)
+            if listing.reused:
+                continue
+            listed_dirs += 1
+
+            file_rows = []
+            for entry in listing.files:
+                try:
+                    st = entry.stat()  # Cached by the crawler
+                except OSError as e:  # File might have been moved/deleted
+                    logging.warning(f"Could not stat {entry.path} while indexing: {e}")
+                    continue
+                ext = os.path.splitext(entry.name)[1].lower()
+                file_rows.append((entry.path, root, listing.path, entry.name, ext, st.st_mtime, st.st_size))
+
+            conn.execute("DELETE FROM files WHERE root = ? AND dir = ?", (root, listing.path))
+            conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)", file_rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?)",
+                (listing.path, root, listing.parent, listing.mtime)
+            )
+
+            if listed_dirs % 500 == 0:
+                conn.commit()
+
+        if cancel_event and cancel_event.is_set():
+            conn.commit()
+            return False
+
+        # Directories that disappeared since the last refresh
+        removed_dirs = [(root, dir_path) for dir_path in known_mtimes if dir_path not in seen_dirs]
+        conn.executemany("DELETE FROM files WHERE root = ? AND dir = ?", removed_dirs)
+        conn.executemany("DELETE FROM dirs WHERE root = ? AND path = ?", removed_dirs)
+
+        now = time.time()
+        if full:
+            conn.execute("INSERT OR REPLACE INTO roots VALUES (?, ?, ?)", (root, now, now))
+        else:
+            conn.execute(
+                "INSERT OR REPLACE INTO roots VALUES (?, ?, (SELECT full_refreshed FROM roots WHERE path = ?))",
+                (root, now, root)
+            )
+        conn.commit()
+
+        logging.info(
+            f"Refreshed index of {root} in {now - started:.1f}s "
+            f"({listed_dirs} of {len(seen_dirs)} directories re-listed, full={full})"
+        )
+        return True
+
+    def _forget_root(self, root):
+        """
+        Remove all entries of a root folder from the index.
+
+        Args:
+            root: Normalized root folder path
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM files WHERE root = ?", (root,))
+                conn.execute("DELETE FROM dirs WHERE root = ?", (root,))
+                conn.execute("DELETE FROM roots WHERE path = ?", (root,))
+        finally:
+            conn.close()
+
+    def start_background_refresh(self, folder_paths):
+        """
+        Refresh the given folders in a background thread.
+
+        Only one background refresh runs at a time; a request made while
+        another refresh is running is ignored. The refresh stops early
+        when stop() is called.
+
+        Args:
+            folder_paths: List of root folders to refresh
+
+        Returns:
+            bool: True if a refresh was started
+        """
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return False
+
+        if isinstance(folder_paths, str):
+            folder_paths = [folder_paths]
+
+        def run():
+            try:
+                self.refresh(list(folder_paths), self.stop_event)
+            except Exception as e:
+                logging.error(f"Error during background index refresh: {e}", exc_info=True)
+
+        self._refresh_thread = threading.Thread(target=run, daemon=True)
+        self._refresh_thread.start()
+        return True
+
+    def stop(self):
+        """
+        Stop any running background refresh.
+        """
+        self.stop_event.set()
@@ -10,41 +10,55 @@ import logging
 import threading
 import time
 from core.excel_processor import ExcelProcessor
+from core.directory_crawler import DirectoryCrawler
+from core.search_results import FileMatch
+from core.progress_reporter import ProgressReporter
+
+# Streaming of matches to results_callback
+RESULT_BATCH_SIZE = 500
+RESULT_BATCH_INTERVAL = 0.1  # seconds
 
 class FileSearch:
     """
     Handles filename-based searching.
     """
     
-    def __init__(self, cancel_event=None):
+    def __init__(self, cancel_event=None, file_index=None, max_workers=None):
         """
         Initialize the file search functionality.
         
         Args:
             cancel_event: Threading event for cancellation
+            file_index: Optional FileIndex used to answer searches without walking
+            max_workers: Number of directories listed concurrently
         """
         self.cancel_event = cancel_event or threading.Event()
+        self.file_index = file_index
+        self.max_workers = max_workers
     
     def search_by_filename(self, folder_paths, filename_keywords, 
                           start_date=None, end_date=None, 
                           exclude_keywords=None, case_sensitive=False,
                           supported_extensions=None, 
-                          status_callback=None):
+                          status_callback=None, results_callback=None):
         """
         Search for files matching given criteria.
         
         Args:
-            folder_path: Root folder to search in
+            folder_paths: Root folder(s) to search in
             filename_keywords: List of keywords to find in filenames
             start_date: Earliest modified date to include
             end_date: Latest modified date to include
             exclude_keywords: Keywords to exclude from results
             case_sensitive: Whether to perform case-sensitive search
             supported_extensions: List of file extensions to include
-            status_callback: Function to call with status updates
+            status_callback: Function to call with status updates, at most
+                every PUBLISH_INTERVAL seconds while walking
+            results_callback: Function called with lists of new matches as they are
+                found, at most every RESULT_BATCH_INTERVAL seconds or RESULT_BATCH_SIZE matches
             
         Returns:
-            list: List of matching files with metadata (name, path, modified_date)
+            list: List of FileMatch records
         """
         if supported_extensions is None:
             supported_extensions = ExcelProcessor.SUPPORTED_EXTENSIONS
@@ -58,110 +72,145 @@ class FileSearch:
             
         # Log the folder paths to help with debugging
         logging.info(f"Searching in folder paths: {folder_paths}")
+        
+        # Answer from the index when every folder has already been indexed,
+        # and refresh it in the background so the next search sees changes
+        if self.file_index is not None and self.file_index.covers(folder_paths, supported_extensions):
+            if status_callback:
+                status_callback("Searching file index...")
+            found_files = self.file_index.search(
+                folder_paths, filename_keywords, start_date, end_date,
+                exclude_keywords, case_sensitive, supported_extensions
+            )
+            self.file_index.start_background_refresh(folder_paths)
+            
+            if results_callback:
+                for start in range(0, len(found_files), RESULT_BATCH_SIZE):
+                    results_callback(found_files[start:start + RESULT_BATCH_SIZE])
+            
+            if status_callback:
+                status_callback(f"Search completed: {len(found_files)} files found.")
+            return found_files
             
         found_files = []
-        processed_dirs = 0
-        processed_files = 0
-        last_update_time = time.time()
-        UPDATE_INTERVAL = 0.2  # Update UI every 200ms for smoother experience
+        reported_count = 0  # Matches already passed to results_callback
+        last_batch_time = time.time()
+        
+        def publish_status(snapshot):
+            status_callback(
+                f"Scanning directory {snapshot['dirs']}: {snapshot['current']} "
+                f"({snapshot['files']} files checked, {snapshot['matches']} matches found)"
+            )
+        
+        # Counters are cheap to update; the status is published a few times per second
+        progress = ProgressReporter(
+            publish_status if status_callback else None, dirs=0, files=0, matches=0, current=""
+        )
+        
+        # Filters applied by the crawler's worker threads
+        excludes = exclude_keywords if case_sensitive else [ex.lower() for ex in exclude_keywords]
+        
+        def keep_dir(name):
+            name_to_check = name if case_sensitive else name.lower()
+            return not any(ex in name_to_check for ex in excludes)
+        
+        def has_supported_extension(name):
+            return name.lower().endswith(supported_extensions)
+        
+        keywords_to_check = [kw if case_sensitive else kw.lower() for kw in filename_keywords or []]
+        
+        crawler = DirectoryCrawler(self.max_workers, self.cancel_event)
         
         try:
-            # Iterate through each provided folder
-            for folder_idx, folder_path in enumerate(folder_paths):
+            valid_folders = []
+            for folder_path in folder_paths:
                 if not os.path.isdir(folder_path):
                     logging.warning(f"Skipping non-existent folder: {folder_path}")
                     continue
-                    
-                if status_callback:
-                    status_callback(f"Searching folder {folder_idx + 1}/{len(folder_paths)}: {os.path.basename(folder_path)}...")
+                valid_folders.append(folder_path)
                 
-                for root_dir, dirs, files in os.walk(folder_path):
-                    processed_dirs += 1
-                    current_time = time.time()
+            if status_callback:
+                status_callback(f"Searching {len(valid_folders)} folder(s): {', '.join(os.path.basename(f) for f in valid_folders)}...")
+            
+            # Crawl all folders at once and merge their listings as they arrive
+            for listing in crawler.walk_many(valid_folders, dir_filter=keep_dir, file_filter=has_supported_extension):
+                current_time = time.time()
+                progress.update(current=os.path.basename(listing.path))
                 
-                    # Update status every directory AND every 200ms for better responsiveness
-                    if status_callback and (processed_dirs % 1 == 0 or current_time - last_update_time > UPDATE_INTERVAL):
-                        status_callback(f"Scanning directory {processed_dirs}: {os.path.basename(root_dir)} ({processed_files} files checked)")
-                        last_update_time = current_time
-                    
+                # Check for cancellation more frequently
+                if self.cancel_event.is_set():
+                    logging.info("Filename search cancelled during directory walk.")
+                    break  # Break from directory walk loop
+
+                matches_before = len(found_files)
+                for entry in listing.files:
                     # Check for cancellation more frequently
                     if self.cancel_event.is_set():
-                        logging.info("Filename search cancelled during directory walk.")
+                        logging.info("Filename search cancelled during file walk.")
                         break  # Break from inner loop
-                
-                    # Filter out excluded directories based on case sensitivity
-                    if not case_sensitive:
-                        dirs[:] = [d for d in dirs if not any(ex.lower() in d.lower() for ex in exclude_keywords)]
-                    else:
-                        dirs[:] = [d for d in dirs if not any(ex in d for ex in exclude_keywords)]
 
-                    for file in files:
-                        processed_files += 1
-                        current_time = time.time()
-                        
-                        # Update status every 10 files OR every 200ms for much better responsiveness
-                        if status_callback and (processed_files % 10 == 0 or current_time - last_update_time > UPDATE_INTERVAL):
-                            status_callback(f"Checking files: {processed_files} processed, {len(found_files)} matches found...")
-                            last_update_time = current_time
-                        
-                        # Check for cancellation more frequently
-                        if self.cancel_event.is_set():
-                            logging.info("Filename search cancelled during file walk.")
-                            break  # Break from inner loop
-
-                        file_lower = file.lower()
-                        if not file_lower.endswith(supported_extensions):
+                    file = entry.name
+                    filename_to_check = file if case_sensitive else file.lower()
+                    
+                    # Check if filename contains any of the keywords
+                    if keywords_to_check:
+                        if not any(kw in filename_to_check for kw in keywords_to_check):
                             continue
-                        
-                        filename_to_check = file if case_sensitive else file_lower
-                        
-                        # Check if filename contains any of the keywords
-                        if filename_keywords:
-                            match_found = False
-                            for kw in filename_keywords:
-                                kw_to_check = kw if case_sensitive else kw.lower()
-                                if kw_to_check in filename_to_check:
-                                    match_found = True
-                                    break
-                            if not match_found:
-                                continue
+                
+                    file_path = entry.path
+                    
+                    # One stat per match; on Windows it comes free with the directory listing
+                    try:
+                        st = entry.stat()
+                        mod_timestamp = st.st_mtime
+                    except OSError as e:  # File might have been moved/deleted
+                        logging.warning(f"Could not getmtime for {file_path}: {e}")
+                        continue
+                    
+                    # Check date range if specified
+                    if start_date or end_date:
+                        mod_date = datetime.date.fromtimestamp(mod_timestamp)
+                        if start_date and mod_date < start_date: continue
+                        if end_date and mod_date > end_date: continue
                     
-                        file_path = os.path.join(root_dir, file)
-                        
-                        # Check date range if specified
-                        if start_date or end_date:
-                            try:
-                                mod_timestamp = os.path.getmtime(file_path)
-                                mod_date = datetime.date.fromtimestamp(mod_timestamp)
-                                if start_date and mod_date < start_date: continue
-                                if end_date and mod_date > end_date: continue
-                            except OSError as e:  # File might have been moved/deleted
-                                logging.warning(f"Could not getmtime for {file_path}: {e}")
-                                continue
-                        
-                        # Get formatted modified time
-                        mod_time_dt = datetime.datetime.fromtimestamp(os.path.getmtime(file_path))
-                        formatted_time = mod_time_dt.strftime('%Y-%m-%d %H:%M:%S')
-                        
-                        # Add to results
-                        found_files.append((file, file_path, formatted_time))
-                        
-                        # Provide immediate feedback when files are found
-                        if len(found_files) % 5 == 0 and status_callback:
-                            status_callback(f"Found {len(found_files)} matching files so far...")
+                    # Get formatted modified time
+                    mod_time_dt = datetime.datetime.fromtimestamp(mod_timestamp)
+                    formatted_time = mod_time_dt.strftime('%Y-%m-%d %H:%M:%S')
+                    
+                    # Add to results
+                    found_files.append(FileMatch(file, file_path, formatted_time, mod_timestamp, st.st_size))
+                    
+                    # Stream full batches right away
+                    if results_callback and len(found_files) - reported_count >= RESULT_BATCH_SIZE:
+                        results_callback(found_files[reported_count:])
+                        reported_count = len(found_files)
+                        last_batch_time = current_time
                 
-                    # Check for cancellation after processing a directory
-                    if self.cancel_event.is_set(): 
-                        break  # Break from inner directory walk loop
-                        
-                # Check for cancellation after processing a folder
-                if self.cancel_event.is_set():
-                    break  # Break from outer folder loop
+                progress.increment(dirs=1, files=len(listing.files), matches=len(found_files) - matches_before)
+                
+                # Stream partial batches at least every RESULT_BATCH_INTERVAL
+                if (results_callback and reported_count < len(found_files)
+                        and current_time - last_batch_time > RESULT_BATCH_INTERVAL):
+                    results_callback(found_files[reported_count:])
+                    reported_count = len(found_files)
+                    last_batch_time = current_time
+            
+                # Check for cancellation after processing a directory
+                if self.cancel_event.is_set(): 
+                    break  # Break from directory walk loop
                     
         except Exception as e:
             logging.error(f"Error during filename search: {e}", exc_info=True)
             raise
         
+        # Hand over the last partial batch
+        if results_callback and reported_count < len(found_files):
+            results_callback(found_files[reported_count:])
+        
+        # Build the index for the next search once a full walk has completed
+        if self.file_index is not None and not self.cancel_event.is_set():
+            self.file_index.start_background_refresh(folder_paths)
+        
         # Final status update
         if status_callback:
             status_callback(f"Search completed: {len(found_files)} files found.")
@@ -0,0 +1,52 @@
+"""
+File type sniffing module.
+
+This module tells what a file really contains from its first bytes and,
+for zip archives, its central directory, so the right reader can be picked
+first instead of trying every parser in turn. File extensions often lie:
+.xls files saved as .xlsx, encrypted workbooks (which are OLE files) and
+truncated downloads are all common on shared drives.
+"""
+
+import zipfile
+
+# What a file turned out to be
+KIND_XLSX = "xlsx"        # Zip archive with a workbook part (.xlsx/.xlsm)
+KIND_OLE = "ole"          # OLE compound file: legacy .xls, or an encrypted workbook
+KIND_BAD_ZIP = "bad_zip"  # Zip signature, but no readable directory or no workbook part
+KIND_OTHER = "other"      # Anything else (text, HTML, garbage)
+
+_OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+_ZIP_MAGIC = (b"PK\x03\x04", b"PK\x05\x06")
+
+# Part every workbook archive has
+_WORKBOOK_PART = "xl/workbook.xml"
+
+def sniff_file_type(file_path):
+    """
+    Find out what kind of file this is, whatever its extension says.
+
+    Reads only the first bytes and, for zip archives, the central directory.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        str: One of KIND_XLSX, KIND_OLE, KIND_BAD_ZIP or KIND_OTHER
+
+    Raises:
+        OSError: If the file can't be read
+    """
+    with open(file_path, 'rb') as f:
+        magic = f.read(8)
+
+    if magic == _OLE_MAGIC:
+        return KIND_OLE
+    if magic[:4] in _ZIP_MAGIC:
+        try:
+            with zipfile.ZipFile(file_path) as archive:
+                names = set(archive.namelist())
+        except (zipfile.BadZipFile, ValueError, EOFError):
+            return KIND_BAD_ZIP
+        return KIND_XLSX if _WORKBOOK_PART in names else KIND_BAD_ZIP
+    return KIND_OTHER
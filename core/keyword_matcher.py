@@ -0,0 +1,145 @@
+"""
+Keyword matching module.
+
+This module finds which of a list of keywords occur in a piece of text.
+Long keyword lists are compiled into an Aho-Corasick automaton so each
+cell is scanned once, however many keywords there are.
+"""
+
+import re
+
+# Every character that str() can produce for a number, date, time, timedelta
+# or boolean cell value ("-1.5e+20", "2024-01-05 00:00:00", "1 day, 2:00:00",
+# "True", "False", "inf", "nan")
+_NON_TEXT_CHARS = frozenset("0123456789.-+:e ,TrueFalsinfdy")
+
+# Up to this many keywords a plain substring test per keyword (done in C)
+# beats walking the automaton character by character in Python
+AUTOMATON_MIN_KEYWORDS = 12
+
+class KeywordMatcher:
+    """
+    Compiled multi-keyword substring matcher.
+
+    Build it once per search and share it across files; it is read-only
+    after construction and therefore safe to use from several threads.
+    """
+
+    def __init__(self, keywords, case_sensitive=False):
+        """
+        Compile the keywords.
+
+        Args:
+            keywords: List of keywords to find
+            case_sensitive: Whether to perform case-sensitive matching
+        """
+        self.keywords = list(keywords)
+        self.case_sensitive = case_sensitive
+
+        # Keywords that differ only by case are one keyword when case-insensitive;
+        # the first spelling is the one reported
+        patterns = {}
+        for kw in self.keywords:
+            pattern = kw if case_sensitive else kw.lower()
+            patterns.setdefault(pattern, kw)
+
+        # (pattern, original keyword) in the order the keywords were given
+        self._patterns = list(patterns.items())
+        # The keywords find_all can report
+        self.distinct_keywords = list(patterns.values())
+        # The empty keyword is contained in every string
+        self._always = {idx for idx, (pattern, _) in enumerate(self._patterns) if not pattern}
+
+        # Whether any keyword could match a cell that isn't stored as text
+        non_text_chars = _NON_TEXT_CHARS if case_sensitive else frozenset("".join(_NON_TEXT_CHARS).lower())
+        self.can_match_non_text = any(set(pattern) <= non_text_chars for pattern, _ in self._patterns)
+
+        self._use_automaton = len(self._patterns) >= AUTOMATON_MIN_KEYWORDS
+        if self._use_automaton:
+            self._build_automaton()
+
+    def regex(self):
+        """
+        Get a regular expression matching text that contains any keyword.
+
+        Used to pre-filter many strings at once (e.g. a pandas column);
+        when not case-sensitive, apply it to the lowercased text. Use
+        find_all on the strings it matches to get the keywords.
+
+        Returns:
+            str: Regular expression pattern
+        """
+        return "|".join(re.escape(pattern) for pattern, _ in self._patterns)
+
+    def _build_automaton(self):
+        """
+        Build the Aho-Corasick goto, failure and output tables.
+        """
+        goto = [{}]
+        outputs = [[]]
+
+        for idx, (pattern, _) in enumerate(self._patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(idx)
+
+        # Breadth-first pass to compute failure links and merge outputs
+        fail = [0] * len(goto)
+        frontier = list(goto[0].values())
+        while frontier:
+            next_frontier = []
+            for state in frontier:
+                for ch, child in goto[state].items():
+                    next_frontier.append(child)
+                    fallback = fail[state]
+                    while fallback and ch not in goto[fallback]:
+                        fallback = fail[fallback]
+                    target = goto[fallback].get(ch, 0)
+                    fail[child] = target if target != child else 0
+                    outputs[child].extend(outputs[fail[child]])
+            frontier = next_frontier
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = [tuple(out) for out in outputs]
+
+    def find_all(self, text):
+        """
+        Find every keyword contained in the text.
+
+        Args:
+            text: String to search
+
+        Returns:
+            list: Original keywords found, in the order they were given
+        """
+        if not self.case_sensitive:
+            text = text.lower()
+
+        if not self._use_automaton:
+            return [kw for pattern, kw in self._patterns if pattern in text]
+
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        found = set(self._always)
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+                if len(found) == len(self._patterns):
+                    break
+
+        return [self._patterns[idx][1] for idx in sorted(found)]
@@ -0,0 +1,180 @@
+"""
+Match collector module.
+
+This module gathers the matches of one file, keeping their number and size
+bounded, and tells the readers when they can stop early because enough
+matches were found.
+"""
+
+from core.search_results import ContentMatch, ContentError, MoreHits
+
+# Marks the end of a long value cut down to a snippet
+ELLIPSIS = "..."
+
+def make_snippet(value, keyword, max_chars):
+    """
+    Cut a long cell value down to the part around the keyword.
+
+    Args:
+        value: Cell text
+        keyword: Keyword found in it
+        max_chars: Maximum length of the snippet, not counting the ellipses
+
+    Returns:
+        str: The value itself if short enough, else a snippet of it
+    """
+    if len(value) <= max_chars:
+        return value
+    pos = value.find(keyword)
+    if pos < 0:
+        pos = max(0, value.lower().find(keyword.lower()))
+    # Center the keyword in the snippet
+    start = max(0, min(pos - (max_chars - len(keyword)) // 2, len(value) - max_chars))
+    end = start + max_chars
+    return (ELLIPSIS if start > 0 else "") + value[start:end] + (ELLIPSIS if end < len(value) else "")
+
+class MatchCollector:
+    """
+    Collects the matches of a file, optionally capped and shortened.
+
+    Readers add every match they find and stop reading the file once done
+    is True. Matches over max_hits_per_file are only counted; the results
+    then end with a MoreHits record. Not thread-safe; use one
+    collector per file.
+    """
+
+    def __init__(self, max_hits_per_keyword=None, stop_at_first_hit=False,
+                 max_hits_per_file=None, max_value_chars=None):
+        """
+        Initialize the collector.
+
+        Args:
+            max_hits_per_keyword: Keep at most this many matches per keyword
+                (None for no limit); the file is done once every keyword has them
+            stop_at_first_hit: The file is done as soon as any keyword matches
+            max_hits_per_file: Keep at most this many matches in total, counting the rest
+            max_value_chars: Store long values as snippets of about this many characters
+        """
+        self.max_hits_per_keyword = max_hits_per_keyword
+        self.stop_at_first_hit = stop_at_first_hit
+        self.max_hits_per_file = max_hits_per_file
+        self.max_value_chars = max_value_chars
+        self.done = False
+        self.more_hits = 0
+        self._results = []
+        self._hit_count = 0
+        self._counts = {}
+        self._keyword_count = None
+
+    @property
+    def limited(self):
+        """
+        Whether matches may be missing from the results because the file was left early.
+        """
+        return self.max_hits_per_keyword is not None or self.stop_at_first_hit
+
+    @property
+    def results(self):
+        """
+        The matches (and errors) collected, followed by the count of dropped matches, if any.
+        """
+        if self.more_hits:
+            return self._results + [MoreHits(self.more_hits)]
+        return list(self._results)
+
+    @property
+    def full(self):
+        """
+        Whether max_hits_per_file matches are kept, so further matches are only counted.
+        """
+        return self.max_hits_per_file is not None and self._hit_count >= self.max_hits_per_file
+
+    def wants(self, keyword):
+        """
+        Whether another match of a keyword would still be kept or counted.
+
+        Lets readers that search for each keyword separately stop early.
+        """
+        if self.done:
+            return False
+        return self.max_hits_per_keyword is None or self._counts.get(keyword, 0) < self.max_hits_per_keyword
+
+    def start(self, keywords):
+        """
+        Tell the collector which keywords are searched for.
+
+        Needed to know when every keyword has reached max_hits_per_keyword;
+        without it a file with a per-keyword limit is read to the end.
+
+        Args:
+            keywords: Distinct keywords, as the matcher reports them
+        """
+        self._keyword_count = len(keywords)
+
+    def reset(self):
+        """
+        Drop everything collected so far, to read the file again from the start.
+        """
+        self.done = False
+        self.more_hits = 0
+        self._results = []
+        self._hit_count = 0
+        self._counts = {}
+
+    def add(self, keyword, sheet, cell, value):
+        """
+        Add a match, unless its keyword already has enough matches.
+
+        Args:
+            keyword: Keyword found
+            sheet: Sheet name
+            cell: Cell reference
+            value: Cell text
+        """
+        if self.done:
+            return
+        count = self._counts.get(keyword, 0)
+        if self.max_hits_per_keyword is not None and count >= self.max_hits_per_keyword:
+            return
+        if self.max_hits_per_file is not None and self._hit_count >= self.max_hits_per_file:
+            self.more_hits += 1
+            return
+        self._counts[keyword] = count + 1
+        self._hit_count += 1
+        if self.max_value_chars is not None:
+            value = make_snippet(value, keyword, self.max_value_chars)
+        self._results.append(ContentMatch(keyword, sheet, cell, value))
+
+        if self.stop_at_first_hit:
+            self.done = True
+        elif (self.max_hits_per_keyword is not None and self._keyword_count is not None
+              and count + 1 == self.max_hits_per_keyword):
+            full = sum(1 for n in self._counts.values() if n >= self.max_hits_per_keyword)
+            self.done = full >= self._keyword_count
+
+    def add_error(self, message, file_path):
+        """
+        Add an error marker for the file.
+
+        Args:
+            message: Error message
+            file_path: Path of the file
+        """
+        self._results.append(ContentError(message, file_path))
+
+    def extend(self, results):
+        """
+        Add results in the format of ExcelProcessor.search_content.
+
+        Errors are kept as they are and MoreHits counts are added up.
+
+        Args:
+            results: List of ContentMatch, ContentError and MoreHits records
+        """
+        for result in results:
+            if isinstance(result, ContentError):
+                self._results.append(result)
+            elif isinstance(result, MoreHits):
+                self.more_hits += result.count
+            else:
+                self.add(result.keyword, result.sheet, result.cell, result.value)
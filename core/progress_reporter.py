@@ -0,0 +1,100 @@
+"""
+Progress reporter module.
+
+This module collects the progress counters of a search from any thread and
+publishes snapshots of them at a fixed rate, so a walk over millions of
+files sends a few status updates per second instead of one per file.
+"""
+
+import time
+import threading
+
+# Seconds between two published snapshots
+PUBLISH_INTERVAL = 0.2
+
+class ProgressReporter:
+    """
+    Thread-safe progress counters, published at most every interval seconds.
+
+    Producers call increment or update as often as they like; the callback
+    is called with a snapshot of the counters when at least interval seconds
+    have passed since the last one, and once more by flush at the end.
+    The callback runs in the producer's thread, outside the lock.
+    """
+
+    def __init__(self, callback=None, interval=PUBLISH_INTERVAL, **counters):
+        """
+        Initialize the reporter.
+
+        Args:
+            callback: Function called with a dict snapshot of the counters
+            interval: Minimum number of seconds between two snapshots
+            **counters: Initial counter values, e.g. files=0
+        """
+        self.callback = callback
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._counters = dict(counters)
+        self._last_publish = time.monotonic()
+        self._changed = False
+
+    def increment(self, **deltas):
+        """
+        Add to counters, publishing a snapshot if one is due.
+
+        Args:
+            **deltas: Amount to add per counter, e.g. files=1
+        """
+        with self._lock:
+            counters = self._counters
+            for name, delta in deltas.items():
+                counters[name] = counters.get(name, 0) + delta
+            snapshot = self._due_snapshot()
+        if snapshot is not None:
+            self.callback(snapshot)
+
+    def update(self, **values):
+        """
+        Set counters or other values, publishing a snapshot if one is due.
+
+        Args:
+            **values: New value per counter, e.g. current="folder"
+        """
+        with self._lock:
+            self._counters.update(values)
+            snapshot = self._due_snapshot()
+        if snapshot is not None:
+            self.callback(snapshot)
+
+    def snapshot(self):
+        """
+        Get a copy of the counters.
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def flush(self):
+        """
+        Publish the counters now if they changed since the last snapshot.
+        """
+        with self._lock:
+            if not self._changed or self.callback is None:
+                return
+            self._changed = False
+            self._last_publish = time.monotonic()
+            snapshot = dict(self._counters)
+        self.callback(snapshot)
+
+    def _due_snapshot(self):
+        """
+        Get a snapshot if one is due, else None. Called with the lock held.
+        """
+        self._changed = True
+        if self.callback is None:
+            return None
+        now = time.monotonic()
+        if now - self._last_publish < self.interval:
+            return None
+        self._last_publish = now
+        self._changed = False
+        return dict(self._counters)
@@ -0,0 +1,151 @@
+"""
+Raw text scanner module.
+
+This module is the last resort for files no parser can read: it memory-maps
+the file and looks for the keywords' UTF-8 and UTF-16LE encodings in the raw
+bytes, without copying or decoding the file. Each occurrence is reported with
+its byte offset and a short snippet of the text around it.
+"""
+
+import re
+import mmap
+import heapq
+from core.match_collector import MatchCollector
+
+# Sheet name reported for raw text matches
+RAW_TEXT_SHEET = "TextContent"
+
+# Encodings the keywords are looked for in
+_ENCODINGS = ("utf-8", "utf-16-le")
+
+# Bytes of context taken on each side of a match for its snippet
+_CONTEXT_BYTES = 40
+
+# Matches between two checks of the cancel event
+_CANCEL_CHECK_HITS = 1000
+
+def _char_pattern(ch, encoding, case_sensitive):
+    """
+    Get a bytes regex matching one character in the given encoding.
+    """
+    variants = {ch} if case_sensitive else {ch, ch.lower(), ch.upper()}
+    # Case mappings may produce several characters (e.g. "ß".upper() == "SS")
+    encoded = sorted({v.encode(encoding) for v in variants}, key=len, reverse=True)
+    if len(encoded) == 1:
+        return re.escape(encoded[0])
+    return b"(?:" + b"|".join(re.escape(e) for e in encoded) + b")"
+
+class RawTextScanner:
+    """
+    Searches the raw bytes of a file through a read-only memory map.
+    """
+
+    def __init__(self, file_path):
+        """
+        Memory-map the file.
+
+        Args:
+            file_path: Path to the file (must not be empty)
+
+        Raises:
+            OSError, ValueError: If the file can't be mapped
+        """
+        self.file_path = file_path
+        with open(file_path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """
+        Release the memory map.
+        """
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _snippet(self, start, end, encoding):
+        """
+        Decode the text around a match, for display.
+
+        Args:
+            start, end: Byte offsets of the match
+            encoding: Encoding the match was found in
+
+        Returns:
+            str: Printable text around the match
+        """
+        begin = max(0, start - _CONTEXT_BYTES)
+        if encoding == "utf-16-le" and (start - begin) % 2:
+            # Keep the code units aligned with the match
+            begin += 1
+        stop = min(len(self._map), end + _CONTEXT_BYTES)
+        text = self._map[begin:stop].decode(encoding, errors='replace')
+        return "".join(ch if ch.isprintable() else " " for ch in text).strip()
+
+    def _find(self, regex, order, keyword, encoding, collector):
+        """
+        Yield the occurrences of one keyword in one encoding, in offset order.
+
+        Stops once the collector wants no more matches of the keyword.
+
+        Yields:
+            tuple: (offset, keyword order, keyword, encoding, end offset)
+        """
+        for match in regex.finditer(self._map):
+            if not collector.wants(keyword):
+                return
+            yield match.start(), order, keyword, encoding, match.end()
+
+    def search(self, matcher, cancel_event=None, collector=None):
+        """
+        Find every occurrence of the matcher's keywords in the raw bytes.
+
+        The occurrences of every keyword and encoding are merged lazily in
+        offset order, so memory use doesn't grow with the number of
+        occurrences. A keyword stops being looked for once the collector has
+        enough of its matches, and the search stops once the collector is
+        done; past max_hits_per_file matches are only counted. The empty
+        keyword is reported once, at offset 0.
+
+        Args:
+            matcher: KeywordMatcher for the keywords
+            cancel_event: Optional threading event for cancellation
+            collector: Optional MatchCollector limiting the matches reported
+
+        Returns:
+            list: List of matches in the format of ExcelProcessor.search_content,
+                with the byte offset as the cell and a snippet as the value,
+                ordered by offset
+        """
+        # Keywords that differ only by case are one keyword when case-insensitive
+        patterns = {}
+        for kw in matcher.keywords:
+            patterns.setdefault(kw if matcher.case_sensitive else kw.lower(), kw)
+
+        if collector is None:
+            collector = MatchCollector()
+        streams = []
+        for order, (pattern, keyword) in enumerate(patterns.items()):
+            if not pattern:
+                streams.append([(0, order, keyword, _ENCODINGS[0], 0)])
+                continue
+            for encoding in _ENCODINGS:
+                regex = re.compile(b"".join(
+                    _char_pattern(ch, encoding, matcher.case_sensitive) for ch in pattern
+                ))
+                streams.append(self._find(regex, order, keyword, encoding, collector))
+
+        for count, (offset, _, keyword, encoding, end) in enumerate(heapq.merge(*streams)):
+            if collector.done:
+                break
+            if count % _CANCEL_CHECK_HITS == 0 and cancel_event and cancel_event.is_set():
+                return []
+            if collector.full:
+                # Only counted, the snippet would be dropped
+                collector.add(keyword, RAW_TEXT_SHEET, None, None)
+            else:
+                collector.add(keyword, RAW_TEXT_SHEET, f"byte {offset}", self._snippet(offset, end, encoding))
+        return collector.results
@@ -0,0 +1,103 @@
+"""
+Search results module.
+
+This module defines the records the searches return. They use __slots__
+instead of a dict per hit, and intern the sheet names and keywords, which
+repeat on every hit, so searches with millions of hits stay small in memory.
+"""
+
+import sys
+from collections import namedtuple
+
+class FileMatch(namedtuple('FileMatch', ('name', 'path', 'modified', 'mtime', 'size'), defaults=(None, None))):
+    """
+    A file found by a filename search.
+
+    name, path and modified (the formatted modification time) are what is
+    displayed and exported; mtime (epoch seconds) and size (bytes), None
+    when unknown, are for sorting.
+    """
+
+    __slots__ = ()
+
+class ContentMatch:
+    """
+    A keyword found in a cell.
+    """
+
+    __slots__ = ('keyword', 'sheet', 'cell', 'value')
+
+    def __init__(self, keyword, sheet, cell, value):
+        """
+        Initialize a match.
+
+        Args:
+            keyword: Keyword found, as given in the search
+            sheet: Sheet name
+            cell: Cell reference, e.g. "B12"
+            value: Cell text, or a snippet of it
+        """
+        self.keyword = sys.intern(keyword)
+        self.sheet = sys.intern(sheet)
+        self.cell = cell
+        self.value = value
+
+    def __eq__(self, other):
+        if not isinstance(other, ContentMatch):
+            return NotImplemented
+        return (self.keyword, self.sheet, self.cell, self.value) == (other.keyword, other.sheet, other.cell, other.value)
+
+    def __repr__(self):
+        return f"ContentMatch({self.keyword!r}, {self.sheet!r}, {self.cell!r}, {self.value!r})"
+
+class ContentError:
+    """
+    A file that couldn't be searched.
+    """
+
+    __slots__ = ('error', 'file_path')
+
+    def __init__(self, error, file_path):
+        """
+        Initialize an error record.
+
+        Args:
+            error: Error message
+            file_path: Path of the file
+        """
+        self.error = error
+        self.file_path = file_path
+
+    def __eq__(self, other):
+        if not isinstance(other, ContentError):
+            return NotImplemented
+        return (self.error, self.file_path) == (other.error, other.file_path)
+
+    def __repr__(self):
+        return f"ContentError({self.error!r}, {self.file_path!r})"
+
+class MoreHits:
+    """
+    The number of matches of a file left out by the per-file cap.
+
+    Always the last record of the file's results.
+    """
+
+    __slots__ = ('count',)
+
+    def __init__(self, count):
+        """
+        Initialize the marker.
+
+        Args:
+            count: Number of matches left out
+        """
+        self.count = count
+
+    def __eq__(self, other):
+        if not isinstance(other, MoreHits):
+            return NotImplemented
+        return self.count == other.count
+
+    def __repr__(self):
+        return f"MoreHits({self.count!r})"
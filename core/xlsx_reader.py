@@ -0,0 +1,396 @@
+"""
+Streaming .xlsx reader module.
+
+This module searches .xlsx/.xlsm files by reading the XML parts inside the
+zip archive with an incremental (expat) parser, without building openpyxl
+Cell objects. The shared-string table is searched once, and sheet cells that
+reference a matching string are then found by index.
+"""
+
+import re
+import posixpath
+import zipfile
+import datetime
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+from openpyxl.utils import get_column_letter
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import from_excel, CALENDAR_WINDOWS_1900, CALENDAR_MAC_1904
+from core.match_collector import MatchCollector
+
+# Relationship types (the last path segment is enough to tell them apart)
+_REL_WORKSHEET = "worksheet"
+_REL_SHARED_STRINGS = "sharedStrings"
+_REL_STYLES = "styles"
+
+# Size of the blocks fed to the XML parser
+_READ_CHUNK_SIZE = 1024 * 1024
+
+# Cell types whose text is stored in the sheet itself rather than in the
+# shared-string table: inline strings, formula string results and errors
+_SHEET_TEXT_TYPE = re.compile(rb"""\bt=["'](?:inlineStr|str|e)["']""")
+
+# Cell types holding numbers, booleans or dates, which only keywords made of
+# digits and punctuation can match
+_NON_TEXT_TYPES = frozenset(("n", "b", "d"))
+
+def _local_name(tag):
+    """
+    Strip the namespace (ElementTree '{ns}' or expat 'prefix:') from a tag.
+    """
+    return tag.rpartition('}')[2].rpartition(':')[2]
+
+def _cast_number(value):
+    """
+    Convert a numeric cell value the same way openpyxl does.
+    """
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+class XlsxReader:
+    """
+    Reads cell text straight from the XML parts of an .xlsx/.xlsm file.
+    """
+
+    def __init__(self, file_path):
+        """
+        Open the workbook archive and read its sheet list.
+
+        Args:
+            file_path: Path to the .xlsx/.xlsm file
+
+        Raises:
+            zipfile.BadZipFile, KeyError, ET.ParseError: If the file is not a
+                readable workbook; callers fall back to openpyxl
+        """
+        self.file_path = file_path
+        self._zip = zipfile.ZipFile(file_path)
+        self._members = set(self._zip.namelist())
+        self._shared_strings = None
+        try:
+            self._read_workbook()
+        except Exception:
+            self._zip.close()
+            raise
+
+    def close(self):
+        """
+        Close the workbook archive.
+        """
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _read_workbook(self):
+        """
+        Read sheet names, part locations, the date epoch and date styles.
+        """
+        rels_path = "xl/_rels/workbook.xml.rels"
+        targets = {}
+        part_by_type = {}
+        for rel in ET.fromstring(self._zip.read(rels_path)).iter():
+            if _local_name(rel.tag) != "Relationship":
+                continue
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                target = target.lstrip("/")
+            else:
+                target = posixpath.normpath(posixpath.join("xl", target))
+            rel_type = posixpath.basename(rel.get("Type", ""))
+            targets[rel.get("Id")] = (rel_type, target)
+            part_by_type.setdefault(rel_type, target)
+
+        self.epoch = CALENDAR_WINDOWS_1900
+        self.sheets = []  # (name, part path)
+        for element in ET.fromstring(self._zip.read("xl/workbook.xml")).iter():
+            name = _local_name(element.tag)
+            if name == "workbookPr":
+                if element.get("date1904") in ("1", "true"):
+                    self.epoch = CALENDAR_MAC_1904
+            elif name == "sheet":
+                rel_id = next((v for k, v in element.attrib.items() if _local_name(k) == "id"), None)
+                rel_type, target = targets.get(rel_id, ("", None))
+                if target and rel_type == _REL_WORKSHEET:
+                    self.sheets.append((element.get("name"), target))
+
+        self._shared_strings_path = part_by_type.get(_REL_SHARED_STRINGS)
+        self._read_date_styles(part_by_type.get(_REL_STYLES))
+
+    def _read_date_styles(self, styles_path):
+        """
+        Find the cell style indices whose number format is a date or time.
+
+        Args:
+            styles_path: Path of the styles part inside the archive (may be None)
+        """
+        self.date_styles = set()
+        self.timedelta_styles = set()
+        if styles_path not in self._members:
+            return
+
+        root = ET.fromstring(self._zip.read(styles_path))
+        custom_formats = {}
+        cell_xfs = None
+        for element in root:
+            name = _local_name(element.tag)
+            if name == "numFmts":
+                for num_fmt in element:
+                    custom_formats[int(num_fmt.get("numFmtId"))] = num_fmt.get("formatCode")
+            elif name == "cellXfs":
+                cell_xfs = element
+
+        if cell_xfs is None:
+            return
+        for idx, xf in enumerate(cell_xfs):
+            fmt_id = int(xf.get("numFmtId", 0))
+            fmt = custom_formats.get(fmt_id, BUILTIN_FORMATS.get(fmt_id))
+            if fmt is None:
+                continue
+            if is_date_format(fmt):
+                self.date_styles.add(idx)
+            if is_timedelta_format(fmt):
+                self.timedelta_styles.add(idx)
+
+    def shared_strings(self):
+        """
+        Read the shared-string table.
+
+        Returns:
+            list: Plain text of each shared string, as openpyxl reports it
+        """
+        if self._shared_strings is not None:
+            return self._shared_strings
+
+        strings = []
+        if self._shared_strings_path in self._members:
+            parts = []
+            state = {'depth_rph': 0, 'in_text': False}
+
+            def start(name, attrs):
+                name = _local_name(name)
+                if name == "t":
+                    state['in_text'] = not state['depth_rph']
+                elif name == "rPh":  # Phonetic runs aren't part of the text
+                    state['depth_rph'] += 1
+
+            def end(name):
+                name = _local_name(name)
+                if name == "t":
+                    state['in_text'] = False
+                elif name == "rPh":
+                    state['depth_rph'] -= 1
+                elif name == "si":
+                    strings.append("".join(parts).replace('x005F_', ''))
+                    parts.clear()
+
+            def chars(data):
+                if state['in_text']:
+                    parts.append(data)
+
+            self._parse(self._shared_strings_path, start, end, chars)
+
+        self._shared_strings = strings
+        return strings
+
+    def _parse(self, part_path, start, end, chars):
+        """
+        Stream one XML part of the archive through expat.
+
+        Args:
+            part_path: Path of the part inside the archive
+            start, end, chars: expat element start/end and character handlers
+        """
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = chars
+        with self._zip.open(part_path) as f:
+            while True:
+                data = f.read(_READ_CHUNK_SIZE)
+                if not data:
+                    break
+                parser.Parse(data, False)
+        parser.Parse(b"", True)
+
+    def cell_text(self, data_type, value, style_id):
+        """
+        Convert a raw non-shared-string cell value to the text openpyxl would give.
+
+        Args:
+            data_type: Cell type attribute ('n', 'b', 'str', 'e', 'd', 'inlineStr')
+            value: Raw value text from the XML
+            style_id: Cell style index
+
+        Returns:
+            str: Text of the cell value
+        """
+        if data_type == "n":
+            number = _cast_number(value)
+            if style_id in self.date_styles:
+                try:
+                    return str(from_excel(number, self.epoch, timedelta=style_id in self.timedelta_styles))
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return str(number)
+        if data_type == "b":
+            return str(bool(int(value)))
+        if data_type == "d":
+            try:
+                return str(datetime.datetime.fromisoformat(value.rstrip("Z")))
+            except ValueError:
+                return value
+        return value
+
+    def search(self, matcher, cancel_event=None, collector=None):
+        """
+        Search every worksheet for the matcher's keywords.
+
+        Args:
+            matcher: KeywordMatcher for the keywords
+            cancel_event: Optional threading event for cancellation
+            collector: Optional MatchCollector; reading stops once it is done
+
+        Returns:
+            list: List of matches found, in the same format as ExcelProcessor.search_content
+        """
+        shared = self.shared_strings()
+        # Search each distinct string once; cells then only look up their index
+        shared_hits = {}
+        for idx, text in enumerate(shared):
+            found = matcher.find_all(text)
+            if found:
+                shared_hits[idx] = found
+
+        # Pre-filter: when no shared string matches and no keyword can match a
+        # number, date or boolean, only cells with text stored in the sheet
+        # itself can match, and most sheets have none of those
+        text_only = not shared_hits and not matcher.can_match_non_text
+
+        if collector is None:
+            collector = MatchCollector()
+        for sheet_name, part_path in self.sheets:
+            if (cancel_event and cancel_event.is_set()) or collector.done:
+                break
+            if text_only and not self._has_sheet_text(part_path):
+                continue
+            self._search_sheet(sheet_name, part_path, matcher, shared, shared_hits, cancel_event, collector)
+        return collector.results
+
+    def _has_sheet_text(self, part_path):
+        """
+        Check whether a worksheet has cells with text stored in the sheet XML.
+
+        This only decompresses the part and scans the bytes, which is far
+        cheaper than parsing it.
+
+        Args:
+            part_path: Path of the worksheet part inside the archive
+
+        Returns:
+            bool: True if the sheet has inline string, formula string or error cells
+        """
+        if part_path not in self._members:
+            return False
+        tail = b""
+        with self._zip.open(part_path) as f:
+            while True:
+                data = f.read(_READ_CHUNK_SIZE)
+                if not data:
+                    return False
+                # Keep a little of the previous block so a match can't straddle blocks
+                if _SHEET_TEXT_TYPE.search(tail + data):
+                    return True
+                tail = data[-16:]
+
+    def _search_sheet(self, sheet_name, part_path, matcher, shared, shared_hits, cancel_event, collector):
+        """
+        Stream one worksheet and add its matches to the collector.
+        """
+        if part_path not in self._members:
+            return
+
+        search_non_text = matcher.can_match_non_text
+        cell = {'r': None, 't': 'n', 's': 0}
+        position = {'row': 0, 'col': 0}
+        text_parts = []
+        state = {'in_value': False}
+
+        class _Cancelled(Exception):
+            pass
+
+        def start(name, attrs):
+            name = _local_name(name)
+            if name == "c":
+                r = attrs.get("r")
+                cell['r'] = r
+                cell['t'] = attrs.get("t", "n")
+                s = attrs.get("s")
+                cell['s'] = int(s) if s else 0
+                text_parts.clear()
+                # Keep the column counter in step for following cells without 'r'
+                position['col'] = _column_index(r) if r else position['col'] + 1
+            elif name == "v" or name == "t":
+                # <t> only occurs inside <is> of inline strings here
+                state['in_value'] = True
+            elif name == "row":
+                r = attrs.get("r")
+                position['row'] = int(r) if r else position['row'] + 1
+                position['col'] = 0
+                if collector.done or (position['row'] % 50 == 0 and cancel_event and cancel_event.is_set()):
+                    raise _Cancelled()
+
+        def end(name):
+            name = _local_name(name)
+            if name == "v" or name == "t":
+                state['in_value'] = False
+            elif name == "c":
+                if not text_parts:
+                    return
+                raw = "".join(text_parts)
+                data_type = cell['t']
+                if data_type == "s":
+                    index = int(raw)
+                    found = shared_hits.get(index)
+                    if not found:
+                        return
+                    value = shared[index]
+                else:
+                    if not raw and data_type != "inlineStr":
+                        return
+                    if data_type in _NON_TEXT_TYPES and not search_non_text:
+                        return
+                    value = self.cell_text(data_type, raw, cell['s'])
+                    found = matcher.find_all(value)
+                    if not found:
+                        return
+
+                ref = cell['r'] or f"{get_column_letter(position['col'])}{position['row']}"
+                for keyword in found:
+                    collector.add(keyword, sheet_name, ref, value)
+
+        def chars(data):
+            if state['in_value']:
+                text_parts.append(data)
+
+        try:
+            self._parse(part_path, start, end, chars)
+        except _Cancelled:
+            pass
+
+def _column_index(ref):
+    """
+    Get the 1-based column index of an A1-style cell reference.
+    """
+    col = 0
+    for ch in ref:
+        if ch.isalpha():
+            col = col * 26 + (ord(ch.upper()) - 64)
+        else:
+            break
+    return col
@@ -11,6 +11,7 @@ import ttkbootstrap as ttk
 import sys
 import os
 import traceback
+import multiprocessing
 
 # Fix taskbar icon on Windows: set a unique AppUserModelID so Windows
 # uses our exe icon instead of the generic Python/Tkinter one.
@@ -113,4 +114,6 @@ def main():
         logger.info(f"{APP_NAME} shutting down.")
 
 if __name__ == "__main__":
+    # Required for the process-based content search in the frozen executable
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,77 @@
+"""
+Small folder of workbooks shared by the content cache and index tests.
+"""
+
+import os
+import csv
+import openpyxl
+from core.excel_processor import ExcelProcessor
+
+KEYWORD = "needle"
+
+# Keyword lists the tests search for, and whether the search is case-sensitive
+SEARCHES = [
+    (["needle"], False),
+    (["needle", "hay"], False),
+    (["Needle"], True),
+    (["2024"], False),
+    (["missing"], False),
+]
+
+def write_workbook(path, sheets):
+    """
+    Write an .xlsx file.
+
+    Args:
+        path: File path
+        sheets: Dictionary mapping sheet names to lists of rows
+    """
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for name, rows in sheets.items():
+        ws = wb.create_sheet(name)
+        for row in rows:
+            ws.append(row)
+    wb.save(path)
+
+def make_tree(folder):
+    """
+    Write a few workbooks and a CSV file with known contents.
+
+    Returns:
+        list: Paths of the files written
+    """
+    sub = os.path.join(folder, "sub")
+    os.makedirs(sub, exist_ok=True)
+    paths = [
+        os.path.join(folder, "report.xlsx"),
+        os.path.join(folder, "many.xlsx"),
+        os.path.join(sub, "export.csv"),
+        os.path.join(sub, "empty.xlsx"),
+    ]
+    write_workbook(paths[0], {
+        "Summary": [["Needle Report", 2024], ["hay", "a needle in the hay"]],
+        "Data": [[1.5, "needle"], [None, "HAY BALE"]],
+    })
+    write_workbook(paths[1], {
+        "Sheet": [[f"needle {i}", f"hay {i}"] for i in range(8)],
+    })
+    with open(paths[2], "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "note"])
+        writer.writerow(["needle", "found in 2024"])
+        writer.writerow(["hay", "Needle again"])
+    write_workbook(paths[3], {"Sheet": [["nothing", "here"]]})
+    return paths
+
+def direct_results(paths, keywords, case_sensitive=False, **limits):
+    """
+    Search each file with ExcelProcessor.search_content, as ContentSearch
+    reports it (files without results left out).
+    """
+    results = {}
+    for path in paths:
+        found = ExcelProcessor.search_content(path, keywords, case_sensitive, **limits)
+        if found:
+            results[path] = found
+    return results
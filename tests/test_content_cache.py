@@ -0,0 +1,90 @@
+"""
+Tests for answering content searches from the content cache.
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from core.content_cache import ContentCache
+from core.content_search import ContentSearch
+from core.excel_processor import ExcelProcessor
+from tests.sample_tree import SEARCHES, make_tree, direct_results, write_workbook
+
+class ContentCacheTest(unittest.TestCase):
+    """
+    Searches answered from the cache match searching the files themselves.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.paths = make_tree(os.path.join(self.tmp_dir, "tree"))
+        self.cache = ContentCache(os.path.join(self.tmp_dir, "cache.db"))
+        self.searches = []
+
+    def tearDown(self):
+        for search in self.searches:
+            search.shutdown()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _search(self, keywords, case_sensitive=False, **kwargs):
+        search = ContentSearch(max_workers=2, content_cache=self.cache, **kwargs)
+        self.searches.append(search)
+        return search.search_files_contents(self.paths, keywords, case_sensitive)
+
+    def _search_unopened(self, keywords, case_sensitive=False, **kwargs):
+        """
+        Search, failing if any file had to be opened.
+        """
+        with mock.patch.object(ExcelProcessor, "search_content", wraps=ExcelProcessor.search_content) as opened:
+            results = self._search(keywords, case_sensitive, **kwargs)
+        self.assertEqual(opened.call_count, 0)
+        return results
+
+    def test_cached_results_match_direct_search(self):
+        for keywords, case_sensitive in SEARCHES:
+            with self.subTest(keywords=keywords, case_sensitive=case_sensitive):
+                expected = direct_results(self.paths, keywords, case_sensitive)
+                self.assertEqual(self._search(keywords, case_sensitive), expected)
+                self.assertEqual(self._search_unopened(keywords, case_sensitive), expected)
+
+    def test_new_keyword_merges_with_cached_hits(self):
+        self._search(["needle"])
+        lookup = self.cache.lookup(self.paths, ["needle", "hay"])
+        self.assertTrue(all(cached.missing == ["hay"] for cached in lookup.values()))
+        self.assertEqual(self._search(["needle", "hay"]), direct_results(self.paths, ["needle", "hay"]))
+
+    def test_capped_search_served_from_cache(self):
+        self._search(["needle", "hay"])
+        expected = direct_results(self.paths, ["needle", "hay"], max_hits_per_file=3, max_value_chars=8)
+        self.assertEqual(self._search_unopened(["needle", "hay"], max_hits_per_file=3, max_value_chars=8), expected)
+
+    def test_capped_search_is_not_cached(self):
+        self._search(["needle"], max_hits_per_file=3)
+        lookup = self.cache.lookup(self.paths, ["needle"])
+        self.assertEqual(lookup[self.paths[1]].missing, ["needle"])
+
+    def test_changed_files_are_searched_again(self):
+        self._search(["needle"])
+        report, many, export = self.paths[:3]
+        # A new size, and a new modification time only
+        write_workbook(report, {"Summary": [["no match now"]]})
+        st = os.stat(export)
+        os.utime(export, (st.st_atime, st.st_mtime + 10))
+
+        lookup = self.cache.lookup(self.paths, ["needle"])
+        self.assertEqual(lookup[report].missing, ["needle"])
+        self.assertEqual(lookup[export].missing, ["needle"])
+        self.assertEqual(lookup[many].missing, [])
+
+        results = self._search(["needle"])
+        self.assertNotIn(report, results)
+        self.assertEqual(results, direct_results(self.paths, ["needle"]))
+        self.assertEqual(self._search_unopened(["needle"]), results)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Tests for answering content searches from the content index.
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from core.content_index import ContentIndex
+from core.content_search import ContentSearch
+from core.excel_processor import ExcelProcessor
+from tests.sample_tree import SEARCHES, make_tree, direct_results, write_workbook
+
+# Several words, a word too short for the trigram lookup, and no word at all
+INDEX_SEARCHES = SEARCHES + [
+    (["a needle in"], False),
+    (["ne"], False),
+    (["."], False),
+]
+
+class ContentIndexTest(unittest.TestCase):
+    """
+    Searches answered from the index match searching the files themselves.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp_dir, "tree")
+        self.paths = make_tree(self.root)
+        self.index = ContentIndex(os.path.join(self.tmp_dir, "index.db"))
+        self.assertTrue(self.index.refresh([self.root]))
+        self.searches = []
+
+    def tearDown(self):
+        for search in self.searches:
+            search.shutdown()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _lookup(self, keywords, case_sensitive=False):
+        """
+        Look the keywords up, leaving out the answered files without results.
+        """
+        answered, not_indexed = self.index.lookup(self.paths, keywords, case_sensitive)
+        return {path: results for path, results in answered.items() if results}, not_indexed
+
+    def _search_unopened(self, keywords, case_sensitive=False, **kwargs):
+        """
+        Search through ContentSearch, failing if any file had to be opened.
+        """
+        search = ContentSearch(max_workers=2, content_index=self.index, **kwargs)
+        self.searches.append(search)
+        with mock.patch.object(ExcelProcessor, "search_content", wraps=ExcelProcessor.search_content) as opened:
+            results = search.search_files_contents(self.paths, keywords, case_sensitive)
+        self.assertEqual(opened.call_count, 0)
+        return results
+
+    def test_lookup_matches_direct_search(self):
+        for keywords, case_sensitive in INDEX_SEARCHES:
+            with self.subTest(keywords=keywords, case_sensitive=case_sensitive):
+                expected = direct_results(self.paths, keywords, case_sensitive)
+                self.assertEqual(self._lookup(keywords, case_sensitive), (expected, []))
+                self.assertEqual(self._search_unopened(keywords, case_sensitive), expected)
+
+    def test_lookup_of_some_files(self):
+        subset = self.paths[1:3]
+        answered, not_indexed = self.index.lookup(subset, ["needle"])
+        self.assertEqual(not_indexed, [])
+        self.assertEqual(answered, direct_results(subset, ["needle"]))
+
+    def test_capped_search_served_from_index(self):
+        expected = direct_results(self.paths, ["needle", "hay"], max_hits_per_file=3, max_value_chars=8)
+        self.assertEqual(self._search_unopened(["needle", "hay"], max_hits_per_file=3, max_value_chars=8), expected)
+
+    def test_changed_files_are_not_answered_until_refreshed(self):
+        report, many, export = self.paths[:3]
+        # A new size, and a new modification time only
+        write_workbook(report, {"Summary": [["needle moved"]]})
+        st = os.stat(export)
+        os.utime(export, (st.st_atime, st.st_mtime + 10))
+
+        answered, not_indexed = self.index.lookup(self.paths, ["needle"])
+        self.assertEqual(sorted(not_indexed), sorted([report, export]))
+        self.assertIn(many, answered)
+
+        self.assertTrue(self.index.refresh([self.root]))
+        expected = direct_results(self.paths, ["needle"])
+        self.assertEqual(self._lookup(["needle"]), (expected, []))
+        self.assertEqual(expected[report][0].value, "needle moved")
+
+    def test_removed_files_are_not_answered(self):
+        os.remove(self.paths[1])
+        self.assertTrue(self.index.refresh([self.root]))
+        answered, not_indexed = self.index.lookup(self.paths, ["needle"])
+        self.assertEqual(not_indexed, [self.paths[1]])
+        self.assertEqual(
+            {path: results for path, results in answered.items() if results},
+            direct_results(self.paths[:1] + self.paths[2:], ["needle"])
+        )
+
+    def test_cells_are_read_in_batches(self):
+        batches = []
+        self.assertIsNone(ExcelProcessor.extract_cells(self.paths[1], batches.append, batch_size=5))
+        self.assertEqual([len(batch) for batch in batches], [5, 5, 5, 1])
+        cells = []
+        ExcelProcessor.extract_cells(self.paths[1], cells.extend)
+        self.assertEqual([cell for batch in batches for cell in batch], cells)
+
+if __name__ == "__main__":
+    unittest.main()
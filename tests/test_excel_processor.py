@@ -0,0 +1,46 @@
+"""
+Tests for picking the reader of a file from its contents.
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import openpyxl
+from core.excel_processor import ExcelProcessor
+from core.search_results import ContentMatch
+
+KEYWORD = "needle"
+
+class MisnamedWorkbookTest(unittest.TestCase):
+    """
+    A workbook archive named .xls is read as a workbook, not as raw bytes.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "misnamed.xls")
+        wb = openpyxl.Workbook()
+        wb.active["B2"] = f"a {KEYWORD} here"
+        wb.save(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _assert_found(self, results):
+        self.assertEqual(results, [ContentMatch(KEYWORD, "Sheet", "B2", f"a {KEYWORD} here")])
+        self.assertFalse(ExcelProcessor.is_known_unreadable(self.path))
+
+    def test_streaming_reader(self):
+        self._assert_found(ExcelProcessor.search_content(self.path, [KEYWORD]))
+
+    def test_openpyxl_fallback(self):
+        with mock.patch("core.excel_processor.XlsxReader", side_effect=KeyError("broken")):
+            self._assert_found(ExcelProcessor.search_content(self.path, [KEYWORD]))
+
+if __name__ == "__main__":
+    unittest.main()
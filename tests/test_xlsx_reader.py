@@ -0,0 +1,134 @@
+"""
+Tests for the streaming xlsx reader.
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import re
+import shutil
+import zipfile
+import tempfile
+import datetime
+import unittest
+from unittest import mock
+import openpyxl
+from core.keyword_matcher import KeywordMatcher
+from core.xlsx_reader import XlsxReader
+
+KEYWORD = "needle"
+
+def _drop_cell_refs(path, keep):
+    """
+    Rewrite the first worksheet of a workbook, dropping the 'r' attribute of
+    the cells for which keep(ref) is False.
+    """
+    part = "xl/worksheets/sheet1.xml"
+    with zipfile.ZipFile(path) as zf:
+        members = {name: zf.read(name) for name in zf.namelist()}
+
+    def strip(match):
+        ref = match.group(1)
+        return match.group(0) if keep(ref) else match.group(0).replace(f' r="{ref}"', "")
+
+    xml = members[part].decode("utf-8")
+    members[part] = re.sub(r'<c r="([A-Z]+\d+)"[^>]*>', strip, xml).encode("utf-8")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+
+class XlsxReaderRefTest(unittest.TestCase):
+    """
+    XlsxReader reports the same cell references as openpyxl.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _make_workbook(self, keep):
+        path = os.path.join(self.tmp_dir, "mixed.xlsx")
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        for row in range(1, 8):
+            for col in range(1, 8):
+                # Column B is empty, so counting cells alone goes wrong after it
+                if col == 2:
+                    continue
+                # Hits in A, D and F, misses in C, E and G
+                text = f"{KEYWORD} {row}.{col}" if col in (1, 4, 6) else f"hay {row}.{col}"
+                ws.cell(row=row, column=col, value=text)
+        wb.save(path)
+        _drop_cell_refs(path, keep)
+        return path
+
+    def _openpyxl_refs(self, path):
+        wb = openpyxl.load_workbook(path, read_only=True)
+        try:
+            return sorted(
+                f"{cell.column_letter}{cell.row}"
+                for row in wb.active.iter_rows()
+                for cell in row
+                if isinstance(cell.value, str) and KEYWORD in cell.value
+            )
+        finally:
+            wb.close()
+
+    def _reader_refs(self, path):
+        with XlsxReader(path) as reader:
+            return sorted(match.cell for match in reader.search(KeywordMatcher([KEYWORD])))
+
+    def test_hits_without_ref_after_misses_with_ref(self):
+        # The misses after the gap keep 'r', the hits after them don't
+        path = self._make_workbook(lambda ref: ref[0] in "CEG")
+        self.assertEqual(self._reader_refs(path), self._openpyxl_refs(path))
+
+    def test_mixed_refs(self):
+        # Cells on odd rows keep 'r'
+        path = self._make_workbook(lambda ref: int(ref[1:]) % 2 == 1)
+        self.assertEqual(self._reader_refs(path), self._openpyxl_refs(path))
+
+class XlsxReaderNonTextTest(unittest.TestCase):
+    """
+    Numbers, booleans and dates are only converted when a keyword can match them.
+    """
+
+    # Has letters no number, boolean or date text contains
+    TEXT_KEYWORD = "invoice"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "values.xlsx")
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append([f"{self.TEXT_KEYWORD} 2024", 2024, True, datetime.datetime(2024, 5, 17)])
+        ws.append(["hay", 3.5, False, datetime.datetime(2023, 1, 2)])
+        wb.save(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _search(self, keyword):
+        with XlsxReader(self.path) as reader:
+            with mock.patch.object(reader, "cell_text", wraps=reader.cell_text) as cell_text:
+                matches = [(match.cell, match.value) for match in reader.search(KeywordMatcher([keyword]))]
+            converted = {call.args[0] for call in cell_text.call_args_list}
+            return matches, converted
+
+    def test_text_keyword_skips_non_text_cells(self):
+        matches, converted = self._search(self.TEXT_KEYWORD)
+        self.assertEqual(matches, [("A1", f"{self.TEXT_KEYWORD} 2024")])
+        self.assertFalse(converted & {"n", "b", "d"})
+
+    def test_numeric_keyword_matches_numbers_and_dates(self):
+        matches, converted = self._search("2024")
+        self.assertEqual(
+            matches, [("A1", f"{self.TEXT_KEYWORD} 2024"), ("B1", "2024"), ("D1", "2024-05-17 00:00:00")]
+        )
+        self.assertIn("n", converted)
+
+if __name__ == "__main__":
+    unittest.main()
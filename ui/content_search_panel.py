@@ -29,6 +29,7 @@ class ContentSearchPanel:
         self.content_search_active = False
         self.content_keywords = tk.StringVar()
         self.content_case_sensitive = tk.BooleanVar(value=False)
+        self.content_first_hit_only = tk.BooleanVar(value=False)
         
         # Create main frame (initially not packed)
         self.frame = ttk.LabelFrame(parent, text="Content Search (after finding files)", padding="10")
@@ -69,6 +70,14 @@ class ContentSearchPanel:
             variable=self.content_case_sensitive
         )
         content_case_checkbox.pack(side=tk.LEFT, padx=10)
+        
+        # Triage mode: stop reading each file at its first match
+        first_hit_checkbox = ttk.Checkbutton(
+            content_keywords_options_frame, 
+            text="First Match per File", 
+            variable=self.content_first_hit_only
+        )
+        first_hit_checkbox.pack(side=tk.LEFT, padx=10)
     
     def _create_controls_section(self):
         """
@@ -131,7 +140,7 @@ class ContentSearchPanel:
         Update the selection status and content search button state.
         
         Args:
-            selected_items: List of selected treeview items
+            selected_items: Collection of the selected results
         """
         if selected_items:
             # Enable search button if files are selected
@@ -226,12 +235,13 @@ class ContentSearchPanel:
             messagebox.showinfo("No Keywords", "Please enter content keywords to search for.")
             return
         
-        # Get case sensitivity
+        # Get case sensitivity and search mode
         case_sensitive = self.content_case_sensitive.get()
+        first_hit_only = self.content_first_hit_only.get()
         
         # Trigger search callback
         if 'on_content_search' in self.callbacks:
-            self.callbacks['on_content_search'](selected_files, keywords, case_sensitive)
+            self.callbacks['on_content_search'](selected_files, keywords, case_sensitive, first_hit_only)
     
     def set_search_button_state(self, enable=True):
         """
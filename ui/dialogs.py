@@ -9,6 +9,7 @@ import tkinter as tk
 from tkinter import ttk
 from tkcalendar import Calendar
 import os
+from core.search_results import ContentError, MoreHits
 
 class CalendarDialog:
     """
@@ -171,10 +172,10 @@ class ContentResultsDialog:
             for file_path, findings in self.results_map.items():
                 try:
                     # Check for error entry
-                    if len(findings) == 1 and 'error' in findings[0]:
+                    if len(findings) == 1 and isinstance(findings[0], ContentError):
                         self.text_widget.insert(tk.END, f"File: {os.path.basename(file_path)}\n", "file_header_bold")
                         self.text_widget.insert(tk.END, f"Path: {file_path}\n", "file_path_italic")
-                        self.text_widget.insert(tk.END, f"  ERROR: {findings[0]['error']}\n\n", "error_text_red")
+                        self.text_widget.insert(tk.END, f"  ERROR: {findings[0].error}\n\n", "error_text_red")
                         continue
 
                     # Process files with findings
@@ -185,16 +186,23 @@ class ContentResultsDialog:
                         
                         # Display each finding
                         for finding in findings:
+                            if isinstance(finding, MoreHits):
+                                # Matches over the per-file cap were only counted
+                                total_matches_count += finding.count
+                                self.text_widget.insert(
+                                    tk.END, f"  ... {finding.count} more hits not shown\n\n", "bullet_point"
+                                )
+                                continue
                             total_matches_count += 1
                             self.text_widget.insert(tk.END, f"  • Keyword '", "bullet_point")
-                            self.text_widget.insert(tk.END, f"{finding['keyword']}", "keyword_bold")
+                            self.text_widget.insert(tk.END, f"{finding.keyword}", "keyword_bold")
                             self.text_widget.insert(tk.END, f"' found in Sheet '", "bullet_point")
-                            self.text_widget.insert(tk.END, f"{finding['sheet']}", "sheet_italic")
+                            self.text_widget.insert(tk.END, f"{finding.sheet}", "sheet_italic")
                             self.text_widget.insert(tk.END, f"', Cell ", "bullet_point")
-                            self.text_widget.insert(tk.END, f"{finding['cell']}\n", "cell_bold")
+                            self.text_widget.insert(tk.END, f"{finding.cell}\n", "cell_bold")
                             
                             # Truncate long values
-                            display_value = finding['value']
+                            display_value = finding.value
                             if len(display_value) > 200:
                                 display_value = display_value[:200] + "..."
                             self.text_widget.insert(tk.END, f"    Value: {display_value}\n\n", "value_text")
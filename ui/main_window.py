@@ -20,7 +20,10 @@ import sys
 # Internal modules
 from core.config_manager import ConfigManager
 from core.file_search import FileSearch
-from core.content_search import ContentSearch
+from core.file_index import FileIndex
+from core.content_cache import ContentCache
+from core.content_index import ContentIndex
+from core.content_search import ContentSearch, BACKEND_THREAD
 from ui.search_panel import SearchPanel
 from ui.results_panel import ResultsPanel
 from ui.content_search_panel import ContentSearchPanel
@@ -51,6 +54,8 @@ class ExcelFinderApp:
         
         # Thread-safe communication for filename search (polling pattern)
         self._status_queue = queue.Queue()
+        self._results_queue = queue.Queue()  # (search_id, batch of results)
+        self._filename_search_id = 0
         self._filename_search_complete = False
         self._filename_search_results = None
         self._filename_search_error = None
@@ -58,9 +63,43 @@ class ExcelFinderApp:
         # Initialize configuration
         self.config_manager = ConfigManager()
         
+        # Initialize the persistent filename index (optional, can be disabled in config)
+        self.file_index = None
+        if self.config_manager.get("use_file_index", True):
+            try:
+                self.file_index = FileIndex()
+            except Exception as e:
+                logging.error(f"Could not open file index, searching without it: {e}", exc_info=True)
+        
+        # Initialize the persistent content search cache (optional, can be disabled in config)
+        self.content_cache = None
+        if self.config_manager.get("use_content_cache", True):
+            try:
+                self.content_cache = ContentCache(
+                    max_bytes=self.config_manager.get("content_cache_max_mb", 256) * 1024 * 1024
+                )
+            except Exception as e:
+                logging.error(f"Could not open content cache, searching without it: {e}", exc_info=True)
+        
+        # Initialize the persistent content index (optional, can be disabled in config)
+        self.content_index = None
+        if self.config_manager.get("use_content_index", True):
+            try:
+                self.content_index = ContentIndex()
+            except Exception as e:
+                logging.error(f"Could not open content index, searching without it: {e}", exc_info=True)
+        
         # Initialize search engines
-        self.file_search = FileSearch(self.cancel_event)
-        self.content_search = ContentSearch(self.cancel_event)
+        self.file_search = FileSearch(self.cancel_event, self.file_index)
+        self.content_search = ContentSearch(
+            self.cancel_event,
+            max_workers=self.config_manager.get("content_search_workers", None),
+            backend=self.config_manager.get("content_search_backend", BACKEND_THREAD),
+            content_cache=self.content_cache,
+            content_index=self.content_index,
+            max_hits_per_file=self.config_manager.get("content_max_hits_per_file", 1000),
+            max_value_chars=self.config_manager.get("content_max_value_chars", 200)
+        )
         
         # Apply UI styling
         self._setup_ui_style()
@@ -307,6 +346,13 @@ class ExcelFinderApp:
         # Use update_idletasks() to avoid re-entering the event loop
         self.root.update_idletasks()
     
+    def _show_content_progress(self, current, total):
+        """
+        Show the number of files a content search has processed.
+        """
+        self.status_var.set(f"Content search: Processed {current}/{total} files...")
+        self._update_progress(current)
+    
     def _update_progress(self, value=None):
         """
         Update the progress bar value.
@@ -378,11 +424,15 @@ class ExcelFinderApp:
                 self._status_queue.get_nowait()
             except queue.Empty:
                 break
+        # Result batches are tagged with the search id, so late batches
+        # from a previous (cancelled) search are ignored
+        self._filename_search_id += 1
 
         # Start search in a separate thread
         threading.Thread(
             target=self._run_filename_search,
-            args=(folder_path, filename_keywords, start_date, end_date, exclude_keywords, case_sensitive),
+            args=(self._filename_search_id, folder_path, filename_keywords, start_date, end_date,
+                  exclude_keywords, case_sensitive),
             daemon=True
         ).start()
 
@@ -390,7 +440,7 @@ class ExcelFinderApp:
         self.root.after(100, self._poll_filename_search_complete)
 
     
-    def _run_filename_search(self, folder_path, filename_keywords, start_date, end_date, 
+    def _run_filename_search(self, search_id, folder_path, filename_keywords, start_date, end_date, 
                             exclude_keywords, case_sensitive):
         """
         Run the filename search in a background thread.
@@ -402,6 +452,10 @@ class ExcelFinderApp:
             def update_status(msg):
                 self._status_queue.put(msg)
             
+            # Result batches are streamed the same way and shown on each poll
+            def add_results(batch):
+                self._results_queue.put((search_id, batch))
+            
             # Perform the search
             found_files = self.file_search.search_by_filename(
                 folder_path,
@@ -410,9 +464,14 @@ class ExcelFinderApp:
                 end_date,
                 exclude_keywords,
                 case_sensitive,
-                status_callback=update_status
+                status_callback=update_status,
+                results_callback=add_results
             )
-            
+
+            # Index the folders' contents in the background for later content searches
+            if self.content_index is not None and not self.cancel_event.is_set():
+                self.content_index.start_background_refresh(folder_path)
+
             # Signal completion via instance variables (no Tkinter calls here)
             self._filename_search_results = found_files
             self._filename_search_error = None
@@ -439,7 +498,12 @@ class ExcelFinderApp:
         except queue.Empty:
             pass
         
-        if not self._filename_search_complete:
+        # Check completion before draining results, so no batch queued
+        # before the completion flag was set can be left behind
+        search_complete = self._filename_search_complete
+        self._drain_filename_results()
+        
+        if not search_complete:
             # Still running — check again in 100ms
             self.root.after(100, self._poll_filename_search_complete)
             return
@@ -456,13 +520,22 @@ class ExcelFinderApp:
                 self.cancel_event.is_set()
             )
     
+    def _drain_filename_results(self):
+        """
+        Append result batches streamed by the current filename search.
+        """
+        try:
+            while True:
+                search_id, batch = self._results_queue.get_nowait()
+                if search_id == self._filename_search_id:
+                    self.results_panel.add_results(batch)
+        except queue.Empty:
+            pass
+    
     def _update_results_and_finalize_filename_search(self, files, cancelled):
         """
-        Update the UI with search results and finalize the search operation.
+        Finalize the search operation once all results have been streamed in.
         """
-        # Add files to results
-        self.results_panel.add_results(files)
-        
         # Reset UI state — stop_progress uses update_idletasks, safe inside after() callback
         self._stop_progress()
         self._toggle_search_buttons(enable=True)
@@ -507,7 +580,7 @@ class ExcelFinderApp:
         # Final flush — do NOT call root.update() here, it causes event-loop reentrance
         self.root.update_idletasks()
     
-    def _start_content_search(self, files_to_search, keywords, case_sensitive):
+    def _start_content_search(self, files_to_search, keywords, case_sensitive, first_hit_only=False):
         """
         Start a content search operation.
         """
@@ -527,37 +600,33 @@ class ExcelFinderApp:
         logging.info(
             f"Content search started for {len(files_to_search)} files. "
             f"Keywords: '{','.join(keywords)}', "
-            f"CaseSensitive: {case_sensitive}"
+            f"CaseSensitive: {case_sensitive}, "
+            f"FirstHitOnly: {first_hit_only}"
         )
         
         # Start search in a separate thread
         threading.Thread(
             target=self._run_content_search,
-            args=(files_to_search, keywords, case_sensitive),
+            args=(files_to_search, keywords, case_sensitive, first_hit_only),
             daemon=True
         ).start()
     
-    def _run_content_search(self, files_to_search, keywords, case_sensitive):
+    def _run_content_search(self, files_to_search, keywords, case_sensitive, first_hit_only=False):
         """
         Run the content search in a background thread.
         """
         try:
-            # Define progress callback
+            # Called a few times per second at most, one UI update per call
             def update_progress(current, total):
-                self.root.after(0, self._update_progress, current)
-                self.root.after(
-                    0, 
-                    lambda c=current, t=total: self.status_var.set(
-                        f"Content search: Processed {c}/{t} files..."
-                    )
-                )
+                self.root.after(0, self._show_content_progress, current, total)
             
             # Perform the search
             all_results = self.content_search.search_files_contents(
                 files_to_search,
                 keywords,
                 case_sensitive,
-                progress_callback=update_progress
+                progress_callback=update_progress,
+                stop_at_first_hit=first_hit_only
             )
             
             # Update UI with results
@@ -598,9 +667,12 @@ class ExcelFinderApp:
                 export_callback=self._export_content_results
             )
     
-    def _export_filename_results(self, result_items):
+    def _export_filename_results(self, results):
         """
         Export filename search results to a file.
+        
+        Args:
+            results: List of FileMatch records, in display order
         """
         filepath = filedialog.asksaveasfilename(
             defaultextension=".csv",
@@ -611,11 +683,6 @@ class ExcelFinderApp:
         if not filepath:
             return
         
-        # Extract values from treeview items
-        results = []
-        for item_id in result_items:
-            results.append(self.results_panel.results_tree.item(item_id, 'values'))
-        
         # Export using ExportManager
         success = ExportManager.export_filename_results(results, filepath)
         
@@ -677,6 +744,12 @@ class ExcelFinderApp:
         # Gracefully shut down content search executor
         self.content_search.shutdown()
         
+        # Stop any background index refresh
+        if self.file_index is not None:
+            self.file_index.stop()
+        if self.content_index is not None:
+            self.content_index.stop()
+        
         # Save configuration
         self.config_manager.save_config()
         
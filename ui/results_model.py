@@ -0,0 +1,260 @@
+"""Results model.
+
+This module keeps the filename search results in memory for the results
+panel, which only creates Treeview items for the rows on screen.
+"""
+
+import time
+import heapq
+import threading
+from array import array
+from core.search_results import FileMatch
+
+# Rows sorted per call to sorted() by sort jobs; the GIL is held for a whole
+# call, so smaller chunks keep the Tk thread responsive while sorting
+SORT_CHUNK_ROWS = 20000
+
+def _sorted_in_chunks(order, key, reverse):
+    """
+    Sort row numbers in chunks merged afterwards, releasing the GIL in between.
+    """
+    runs = []
+    for start in range(0, len(order), SORT_CHUNK_ROWS):
+        runs.append(sorted(order[start:start + SORT_CHUNK_ROWS], key=key, reverse=reverse))
+        time.sleep(0)
+    if len(runs) == 1:
+        return runs[0]
+    # A generator, so the GIL can change hands between rows
+    return heapq.merge(*runs, key=key, reverse=reverse)
+
+class ResultsModel:
+    """
+    Column store of filename search results, with their display order and selection.
+
+    Rows are numbered in the order they were added. The sort order is a
+    compact array of row numbers, so sorting never touches the columns, and
+    the display order is the part of it that matches the quick filter.
+    Doesn't use Tk, and must only be used from the Tk thread, except for
+    the functions returned by sort_job.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty model.
+        """
+        self.generation = 0
+        self._fold_lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """
+        Remove all results.
+        """
+        self.names = []
+        self.paths = []
+        self.modified = []
+        self.mtimes = array('d')  # Epoch seconds, -1 if unknown
+        self.sizes = array('q')   # Bytes, -1 if unknown
+        self._folded = {}         # Casefolded names and paths, filled by sort_keys
+        self.generation += 1      # Tells results computed before a clear apart
+        self.all_order = array('l')  # Every row number, in sort order
+        self.order = array('l')  # Row numbers displayed: all_order minus the filtered out rows
+        self.selected = set()    # Selected row numbers
+        self.anchor = None       # Row that shift-selections extend from
+        self.cursor = None       # Row last clicked or moved to
+        self.filter_text = ""    # Lowercase quick filter text
+        self._blobs = []          # Lowercase text the quick filter looks in, filled on first use
+
+    def __len__(self):
+        """
+        Number of rows displayed.
+        """
+        return len(self.order)
+
+    def extend(self, results):
+        """
+        Append results, displayed after the current rows if they match the filter.
+
+        Args:
+            results: Iterable of FileMatch records or (name, path, modified_date) tuples
+        """
+        start = len(self.paths)
+        for result in results:
+            match = FileMatch(*result)
+            self.names.append(match.name)
+            self.paths.append(match.path)
+            self.modified.append(match.modified)
+            self.mtimes.append(-1 if match.mtime is None else match.mtime)
+            self.sizes.append(-1 if match.size is None else match.size)
+        new_rows = range(start, len(self.paths))
+        self.all_order.extend(new_rows)
+        self.order.extend(self._matching(new_rows, self.filter_text))
+
+    def record(self, row):
+        """
+        Get a row as a FileMatch.
+
+        Args:
+            row: Row number
+        """
+        mtime, size = self.mtimes[row], self.sizes[row]
+        return FileMatch(
+            self.names[row], self.paths[row], self.modified[row],
+            None if mtime < 0 else mtime, None if size < 0 else size
+        )
+
+    def records(self):
+        """
+        Get all displayed rows as FileMatch records, in display order.
+        """
+        return [self.record(row) for row in self.order]
+
+    def window(self, offset, count):
+        """
+        Get the row numbers of a slice of the display.
+
+        Args:
+            offset: Display position of the first row
+            count: Number of rows
+        """
+        return self.order[offset:offset + count]
+
+    def position(self, row):
+        """
+        Get the display position of a row, None if it isn't displayed.
+        """
+        try:
+            return self.order.index(row)
+        except ValueError:
+            return None
+
+    def selected_rows(self):
+        """
+        Get the selected row numbers in display order.
+        """
+        if not self.selected:
+            return []
+        selected = self.selected
+        return [row for row in self.order if row in selected]
+
+    def select(self, row, extend=False, toggle=False):
+        """
+        Update the selection for a click on a row.
+
+        Args:
+            row: Row number clicked
+            extend: Select the range from the anchor row to this row (Shift)
+            toggle: Add or remove the row, keeping the rest (Control)
+        """
+        self.cursor = row
+        if extend and self.anchor is not None and self.anchor in self.selected:
+            start, end = sorted((self.position(self.anchor), self.position(row)))
+            if not toggle:
+                self.selected = set()
+            self.selected.update(self.order[start:end + 1])
+            return
+        if toggle:
+            self.selected ^= {row}
+        else:
+            self.selected = {row}
+        self.anchor = row
+
+    def select_all(self):
+        """
+        Select every displayed row.
+        """
+        self.selected = set(self.order)
+
+    def sort_job(self, column, reverse=False):
+        """
+        Prepare sorting the rows by a column.
+
+        Names and paths sort case-insensitively, the modified date by
+        timestamp and the size by bytes. The casefolded text is computed
+        once per row and kept for later sorts.
+
+        Args:
+            column: "name", "path", "modified" or "size"
+            reverse: Sort in descending order
+
+        Returns:
+            function: Function without arguments returning the sorted array
+                of row numbers, for set_order. It works on the rows present
+                now and may run in a worker thread while rows are added.
+        """
+        count = len(self.paths)
+        order = array('l', self.all_order)
+        if column in ("modified", "size"):
+            keys = self.mtimes if column == "modified" else self.sizes
+            values = folded = None
+        else:
+            values = self.names if column == "name" else self.paths
+            keys = folded = self._folded.setdefault(column, [])
+        lock = self._fold_lock
+
+        def run():
+            if folded is not None:
+                with lock:
+                    folded.extend(value.casefold() for value in values[len(folded):count])
+            return array('l', _sorted_in_chunks(order, keys.__getitem__, reverse))
+        return run
+
+    def set_order(self, order, row_count):
+        """
+        Put the rows in a new order, e.g. as returned by a sort_job function.
+
+        Rows added since the order was computed stay at the end.
+
+        Args:
+            order: Array of every row number
+            row_count: Number of rows when the order was computed
+        """
+        order.extend(range(row_count, len(self.paths)))
+        self.all_order = order
+        if self.filter_text:
+            self.order = array('l', self._matching(order, self.filter_text))
+        else:
+            self.order = array('l', order)
+
+    def _matching(self, rows, filter_text):
+        """
+        Get the rows whose text contains the filter text, in the order given.
+
+        Args:
+            rows: Row numbers to check
+            filter_text: Lowercase text, empty to match every row
+        """
+        if not filter_text:
+            return rows
+        blobs = self._blobs
+        if len(blobs) < len(self.paths):
+            # The name is part of the path, only the path and the date are kept
+            blobs.extend(
+                f"{self.paths[row]} {self.modified[row]}".lower() for row in range(len(blobs), len(self.paths))
+            )
+        return [row for row in rows if filter_text in blobs[row]]
+
+    def apply_filter(self, filter_text):
+        """
+        Display only the rows containing a text in their path or modified date.
+
+        A text extending the current one only looks through the rows
+        displayed now. Selected rows that are filtered out are deselected.
+
+        Args:
+            filter_text: Lowercase text to look for, empty to clear the filter
+
+        Returns:
+            int: Number of rows displayed
+        """
+        if filter_text and self.filter_text and self.filter_text in filter_text:
+            candidates = self.order
+        else:
+            candidates = self.all_order
+        self.filter_text = filter_text
+        self.order = array('l', self._matching(candidates, filter_text))
+
+        if filter_text and self.selected:
+            selected = self.selected
+            self.selected = {row for row in self.order if row in selected}
+        return len(self.order)
@@ -6,11 +6,51 @@ This module contains UI elements for displaying and interacting with search resu
 import tkinter as tk
 from tkinter import ttk, messagebox
 import os
+import queue
 import logging
+import threading
+from ui.results_model import ResultsModel
+
+# Rows scrolled per mouse wheel notch
+WHEEL_SCROLL_ROWS = 3
+
+# Row height assumed until the Treeview style reports one
+DEFAULT_ROW_HEIGHT = 20
+
+# Sort in a worker thread from this many rows on; fewer are sorted at once
+BACKGROUND_SORT_ROWS = 20000
+
+# How often a background sort is checked for completion (milliseconds)
+SORT_POLL_INTERVAL = 50
+
+# Wait this long after the last keystroke before filtering (milliseconds)
+FILTER_DEBOUNCE_DELAY = 150
+
+# Modifier bits of Tk event.state
+_SHIFT_MASK = 0x0001
+_CONTROL_MASK = 0x0004
+
+def _format_size(size):
+    """
+    Format a file size for display ("" if unknown).
+    """
+    if size < 0:
+        return ""
+    if size < 1024:
+        return f"{size} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
 
 class ResultsPanel:
     """
     Panel for displaying search results and providing interaction options.
+    
+    The results live in a ResultsModel; the Treeview only holds the rows
+    on screen (their item ids are the model's row numbers), so it stays
+    responsive with millions of results. Scrolling, selection and sorting
+    are handled on the model, and the visible page is then redrawn.
     """
     
     def __init__(self, parent, callbacks):
@@ -23,6 +63,13 @@ class ResultsPanel:
         """
         self.parent = parent
         self.callbacks = callbacks
+        self.model = ResultsModel()
+        self._offset = 0           # Display position of the first row on screen
+        self._page_size = 1        # Rows that fit in the Treeview
+        self._render_pending = False
+        self._sort_queue = queue.Queue()
+        self._sort_id = 0            # Identifies the latest sort requested
+        self._sorts_running = 0      # Background sorts not yet polled
         
         # Create the results frame
         self.results_frame = ttk.LabelFrame(parent, text="Search Results", padding="10")
@@ -62,8 +109,8 @@ class ResultsPanel:
         # Quick filter
         ttk.Label(left_actions, text="Quick Filter:").pack(side=tk.LEFT, padx=(10, 2))
         self.filter_var = tk.StringVar()
-        # Quick filtering temporarily simplified
-        self.filter_var = tk.StringVar()
+        self._filter_after_id = None
+        self.filter_var.trace_add("write", self._on_filter_changed)
         ttk.Entry(left_actions, textvariable=self.filter_var, width=20).pack(side=tk.LEFT, padx=2)
         
         # Export button
@@ -84,13 +131,13 @@ class ResultsPanel:
         # Create treeview with columns
         self.results_tree = ttk.Treeview(
             tree_frame, 
-            columns=("name", "path", "modified"), 
+            columns=("name", "path", "modified", "size"), 
             show="headings", 
             selectmode='extended'
         )
         
         # Configure column headings with sort functionality
-        self.sort_direction = {"name": False, "path": False, "modified": False}  # False = ascending
+        self.sort_direction = {"name": False, "path": False, "modified": False, "size": False}  # False = ascending
         
         self.results_tree.heading("name", text="File Name", 
                                  command=lambda: self._sort_column("name"))
@@ -98,20 +145,25 @@ class ResultsPanel:
                                  command=lambda: self._sort_column("path"))
         self.results_tree.heading("modified", text="Modified Date", 
                                  command=lambda: self._sort_column("modified"))
+        self.results_tree.heading("size", text="Size", 
+                                 command=lambda: self._sort_column("size"))
         
         # Configure column widths and alignment
         self.results_tree.column("name", width=250, anchor=tk.W, stretch=True)
         self.results_tree.column("path", width=450, anchor=tk.W, stretch=True)
         self.results_tree.column("modified", width=150, anchor=tk.CENTER, stretch=True)
+        self.results_tree.column("size", width=90, anchor=tk.E, stretch=False)
         
-        # Add scrollbars
-        scrollbar_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
+        self._row_height = int(ttk.Style().lookup("Treeview", "rowheight") or DEFAULT_ROW_HEIGHT)
+        
+        # Add scrollbars; the vertical one scrolls the model, not the Treeview
+        self.scrollbar_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self._on_scrollbar)
         scrollbar_x = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.results_tree.xview)
-        self.results_tree.configure(yscroll=scrollbar_y.set, xscroll=scrollbar_x.set)
+        self.results_tree.configure(xscroll=scrollbar_x.set)
         
         # Pack the components
         self.results_tree.grid(row=0, column=0, sticky='nsew')
-        scrollbar_y.grid(row=0, column=1, sticky='ns')
+        self.scrollbar_y.grid(row=0, column=1, sticky='ns')
         scrollbar_x.grid(row=1, column=0, sticky='ew')
         
         # Configure grid weights to make the treeview resizable
@@ -119,13 +171,17 @@ class ResultsPanel:
         tree_frame.grid_columnconfigure(0, weight=1)
         
         # Bind events
+        self.results_tree.bind("<Configure>", self._on_resize)
         self.results_tree.bind("<Button-3>", self._show_context_menu)
         self.results_tree.bind("<Double-1>", lambda e: self._open_selected_file())
-        self.results_tree.bind("<<TreeviewSelect>>", self._on_selection_change)
-        self.results_tree.bind("<ButtonRelease-1>", self._on_selection_change)
-        
-        # Bind column resize event
-        self.results_tree.bind('<Button-1>', self._column_resize_check)
+        self.results_tree.bind("<Button-1>", self._on_click)
+        self.results_tree.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.results_tree.bind("<Button-4>", lambda e: self._scroll_to(self._offset - WHEEL_SCROLL_ROWS))
+        self.results_tree.bind("<Button-5>", lambda e: self._scroll_to(self._offset + WHEEL_SCROLL_ROWS))
+        for key, step in (("Up", -1), ("Down", 1), ("Prior", "-page"), ("Next", "page"),
+                          ("Home", "-all"), ("End", "all")):
+            self.results_tree.bind(f"<{key}>", lambda e, step=step: self._on_key_move(step, False))
+            self.results_tree.bind(f"<Shift-{key}>", lambda e, step=step: self._on_key_move(step, True))
     
     def _create_context_menu(self):
         """
@@ -139,68 +195,196 @@ class ResultsPanel:
     
     def clear_results(self):
         """
-        Clear all items from the results treeview.
+        Clear all results. The quick filter stays on for the next results.
         """
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
+        self.model.clear()
+        self.model.apply_filter(self.filter_var.get().lower())
+        self._offset = 0
+        self._render()
+        self._on_selection_change()
     
     def add_result(self, name, path, modified_date):
         """
-        Add a single result to the treeview.
+        Add a single result.
         
         Args:
             name: File name
             path: Full file path
             modified_date: Modified date string
         """
-        self.results_tree.insert("", "end", values=(name, path, modified_date))
+        self.add_results([(name, path, modified_date)])
     
     def add_results(self, results):
         """
-        Add multiple results to the treeview.
+        Add multiple results.
+        
+        The redraw is deferred, so batches arriving together cost one redraw.
         
         Args:
             results: List of (name, path, modified_date) tuples
         """
-        for name, path, modified_date in results:
-            self.add_result(name, path, modified_date)
+        self.model.extend(results)
+        self._schedule_render()
     
     def get_selected_files(self):
         """
         Get the paths of all selected files.
         
         Returns:
-            list: List of file paths
+            list: List of file paths, in display order
         """
-        selected_items = self.results_tree.selection()
-        return [self.results_tree.item(item, 'values')[1] for item in selected_items]
+        return [self.model.paths[row] for row in self.model.selected_rows()]
     
     def select_all_results(self):
         """
-        Select all results in the treeview.
+        Select all results.
         """
-        for item in self.results_tree.get_children():
-            self.results_tree.selection_add(item)
+        self.model.select_all()
+        self._render()
         
         # Update selection state
         self._on_selection_change()
     
     def deselect_all_results(self):
         """
-        Deselect all results in the treeview.
+        Deselect all results.
         """
-        self.results_tree.selection_remove(self.results_tree.selection())
+        self.model.selected = set()
+        self._render()
         
         # Update selection state
         self._on_selection_change()
     
+    def _schedule_render(self):
+        """
+        Redraw the visible rows once the event loop is idle.
+        """
+        if not self._render_pending:
+            self._render_pending = True
+            self.results_tree.after_idle(self._render)
+    
+    def _render(self):
+        """
+        Recreate the Treeview items for the rows on screen and update the scrollbar.
+        """
+        self._render_pending = False
+        total = len(self.model)
+        self._offset = max(0, min(self._offset, total - self._page_size))
+        rows = self.model.window(self._offset, self._page_size)
+        
+        tree = self.results_tree
+        tree.delete(*tree.get_children())
+        model = self.model
+        for row in rows:
+            tree.insert(
+                "", "end", iid=str(row),
+                values=(model.names[row], model.paths[row], model.modified[row], _format_size(model.sizes[row]))
+            )
+        tree.selection_set([str(row) for row in rows if row in model.selected])
+        
+        if total:
+            self.scrollbar_y.set(self._offset / total, min(1.0, (self._offset + len(rows)) / total))
+        else:
+            self.scrollbar_y.set(0.0, 1.0)
+    
+    def _scroll_to(self, offset):
+        """
+        Show the rows from a display position on.
+        
+        Args:
+            offset: Display position of the first row to show
+        """
+        offset = max(0, min(offset, len(self.model) - self._page_size))
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+        return "break"
+    
+    def _on_scrollbar(self, *args):
+        """
+        Handle the vertical scrollbar ("moveto" fraction or "scroll" n units/pages).
+        """
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self.model)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self._page_size if args[2] == "pages" else 1)
+            self._scroll_to(self._offset + step)
+    
+    def _on_mouse_wheel(self, event):
+        """
+        Scroll on mouse wheel (Windows and macOS; X11 sends Button-4/5).
+        """
+        notches = event.delta // 120 if abs(event.delta) >= 120 else (1 if event.delta > 0 else -1)
+        return self._scroll_to(self._offset - notches * WHEEL_SCROLL_ROWS)
+    
+    def _on_resize(self, event):
+        """
+        Recompute how many rows fit when the Treeview is resized.
+        """
+        # One row's height for the headings
+        page_size = max(1, event.height // self._row_height - 1)
+        if page_size != self._page_size:
+            self._page_size = page_size
+            self._render()
+    
+    def _on_click(self, event):
+        """
+        Select rows on click, with Shift and Control as in a Treeview.
+        
+        The selection is kept in the model, since most rows have no item.
+        """
+        self._column_resize_check(event)
+        if self.results_tree.identify_region(event.x, event.y) not in ("cell", "tree"):
+            # Headings and separators keep their default behavior
+            return None
+        iid = self.results_tree.identify_row(event.y)
+        if not iid:
+            return "break"
+        self.results_tree.focus_set()
+        self.model.select(
+            int(iid), extend=bool(event.state & _SHIFT_MASK), toggle=bool(event.state & _CONTROL_MASK)
+        )
+        self._render()
+        self._on_selection_change()
+        return "break"
+    
+    def _on_key_move(self, step, extend):
+        """
+        Move the selection with the arrow, page and Home/End keys.
+        
+        Args:
+            step: Rows to move by, or "page", "-page", "all", "-all"
+            extend: Extend the selection from the anchor row (Shift)
+        """
+        total = len(self.model)
+        if not total:
+            return "break"
+        current = self.model.position(self.model.cursor) if self.model.cursor is not None else None
+        if current is None:
+            current = -1
+        if step in ("all", "-all"):
+            target = total - 1 if step == "all" else 0
+        else:
+            delta = {"page": self._page_size, "-page": -self._page_size}.get(step, step)
+            target = max(0, min(total - 1, current + delta))
+        
+        self.model.select(self.model.order[target], extend=extend)
+        
+        # Keep the row on screen
+        if target < self._offset:
+            self._offset = target
+        elif target >= self._offset + self._page_size:
+            self._offset = target - self._page_size + 1
+        self._render()
+        self._on_selection_change()
+        return "break"
+    
     def _on_selection_change(self, event=None):
         """
         Handle selection changes in the results treeview.
         """
         if 'on_result_selection_change' in self.callbacks:
-            selected_items = self.results_tree.selection()
-            self.callbacks['on_result_selection_change'](selected_items)
+            self.callbacks['on_result_selection_change'](self.model.selected)
     
     def _show_context_menu(self, event):
         """
@@ -212,20 +396,22 @@ class ResultsPanel:
         # Select row under mouse if not already selected
         iid = self.results_tree.identify_row(event.y)
         if iid:
-            if iid not in self.results_tree.selection():
-                self.results_tree.selection_set(iid)
+            if int(iid) not in self.model.selected:
+                self.model.select(int(iid))
+                self._render()
+                self._on_selection_change()
             self.context_menu.post(event.x_root, event.y_root)
     
     def _open_selected_file(self):
         """
         Open the selected file using the system default application.
         """
-        selected_items = self.results_tree.selection()
-        if not selected_items:
+        selected_rows = self.model.selected_rows()
+        if not selected_rows:
             return
             
         try:
-            file_path = self.results_tree.item(selected_items[0], 'values')[1]
+            file_path = self.model.paths[selected_rows[0]]
             os.startfile(file_path)
             logging.info(f"Opened file: {file_path}")
         except IndexError:
@@ -238,12 +424,12 @@ class ResultsPanel:
         """
         Open the folder containing the selected file.
         """
-        selected_items = self.results_tree.selection()
-        if not selected_items:
+        selected_rows = self.model.selected_rows()
+        if not selected_rows:
             return
             
         try:
-            file_path = self.results_tree.item(selected_items[0], 'values')[1]
+            file_path = self.model.paths[selected_rows[0]]
             folder_path = os.path.dirname(file_path)
             os.startfile(folder_path)
             logging.info(f"Opened folder: {folder_path}")
@@ -257,12 +443,12 @@ class ResultsPanel:
         """
         Copy the selected file path to clipboard.
         """
-        selected_items = self.results_tree.selection()
-        if not selected_items:
+        selected_rows = self.model.selected_rows()
+        if not selected_rows:
             return
             
         try:
-            file_path = self.results_tree.item(selected_items[0], 'values')[1]
+            file_path = self.model.paths[selected_rows[0]]
             self.parent.clipboard_clear()
             self.parent.clipboard_append(file_path)
             # Create a small info popup
@@ -299,99 +485,144 @@ class ResultsPanel:
         Export filename search results to a file.
         """
         if 'on_export_filename_results' in self.callbacks:
-            items = self.results_tree.get_children()
-            if not items:
+            if not len(self.model):
                 messagebox.showinfo("No Results", "There are no filename results to export.")
                 return
                 
-            self.callbacks['on_export_filename_results'](items)
+            self.callbacks['on_export_filename_results'](self.model.records())
             
+    def _on_filter_changed(self, *args):
+        """
+        Filter again once the user stops typing in the quick filter.
+        """
+        if self._filter_after_id is not None:
+            self.results_tree.after_cancel(self._filter_after_id)
+        self._filter_after_id = self.results_tree.after(FILTER_DEBOUNCE_DELAY, self._apply_quick_filter)
+    
     def _apply_quick_filter(self, *args):
         """
-        Apply quick filter to the results treeview.
-        Filter is applied to all columns.
+        Show only the results containing the quick filter text.
+        Filter is applied to the path (which includes the file name) and the modified date.
         """
+        self._filter_after_id = None
         try:
             # Get filter text
             filter_text = self.filter_var.get().lower()
-            
-            # If no filter, show all items
-            if not filter_text:
-                for item in self.results_tree.get_children():
-                    self.results_tree.item(item, tags=())
+            if filter_text == self.model.filter_text:
                 return
             
-            # Check each item against the filter
-            visible_count = 0
-            for item in self.results_tree.get_children():
-                values = self.results_tree.item(item, 'values')
-                # Convert values to lowercase string for matching
-                item_text = ' '.join([str(v).lower() for v in values])
-                
-                # If filter matches, show the item
-                if filter_text in item_text:
-                    self.results_tree.item(item, tags=())
-                    visible_count += 1
-                else:
-                    # If no match, add 'hidden' tag
-                    self.results_tree.item(item, tags=('hidden',))
-            
-            # Configure tag to hide items not matching filter
-            self.results_tree.tag_configure('hidden', foreground='#aaaaaa')
+            visible_count = self.model.apply_filter(filter_text)
+            self._offset = 0
+            self._render()
+            self._on_selection_change()
             
             # Update status - show count of visible items
-            total_count = len(self.results_tree.get_children())
+            total_count = len(self.model.all_order)
             if 'update_status' in self.callbacks:
-                self.callbacks['update_status'](f"Showing {visible_count} of {total_count} results matching '{filter_text}'")
+                if filter_text:
+                    self.callbacks['update_status'](f"Showing {visible_count} of {total_count} results matching '{filter_text}'")
+                else:
+                    self.callbacks['update_status'](f"Showing all {total_count} results")
                 
         except Exception as e:
             # Ensure exception doesn't crash the application
             logging.error(f"Error in quick filter: {e}")
     
     def _sort_column(self, column):
-        """Sort treeview by a column.
+        """Sort the results by a column.
+        
+        Large result sets are sorted in a worker thread; the visible page
+        is redrawn once the new order is ready.
         
         Args:
             column: Column ID to sort by
         """
         try:
-            # Get all items from treeview
-            item_list = [(self.results_tree.set(k, column), k) for k in self.results_tree.get_children('')]
-            
-            # If the column is 'modified', sort as a date
-            if column == 'modified':
-                # Custom sort logic for dates in format YYYY-MM-DD HH:MM:SS
-                item_list.sort(reverse=self.sort_direction[column])
-            else:
-                # Regular string sort for other columns
-                item_list.sort(reverse=self.sort_direction[column])
+            job = self.model.sort_job(column, reverse=self.sort_direction[column])
+            self._sort_id += 1
+            request = (self._sort_id, self.model.generation, len(self.model.paths))
             
             # Update direction for next click
             self.sort_direction[column] = not self.sort_direction[column]
+            self._update_sort_headings(column)
             
-            # Rearrange items in sorted positions
-            for index, (val, k) in enumerate(item_list):
-                self.results_tree.move(k, '', index)
-                
-            # Add visual indicator of sort direction to column header
-            for col in self.results_tree['columns']:
-                # Reset all headers
-                if col == column:
-                    # Use Up/Down arrows as sort indicators
-                    direction = "▼" if self.sort_direction[column] else "▲"  # Down arrow if descending, up if ascending
-                    self.results_tree.heading(col, text=f"{col.title()} {direction}")
-                else:
-                    # Remove direction indicator from other columns
-                    current_text = self.results_tree.heading(col)['text']
-                    if current_text.endswith(" ▲") or current_text.endswith(" ▼"):
-                        self.results_tree.heading(col, text=current_text[:-2])
-                    else:
-                        self.results_tree.heading(col, text=col.title())
+            if len(self.model.all_order) < BACKGROUND_SORT_ROWS:
+                self._apply_sort(request, job())
+                return
+            
+            if 'update_status' in self.callbacks:
+                self.callbacks['update_status'](f"Sorting {len(self.model.all_order)} results...")
+            
+            def run():
+                try:
+                    order = job()
+                except Exception as e:
+                    logging.error(f"Error sorting results: {e}", exc_info=True)
+                    order = None
+                self._sort_queue.put((request, order))
+            
+            threading.Thread(target=run, daemon=True).start()
+            self._sorts_running += 1
+            if self._sorts_running == 1:
+                self.results_tree.after(SORT_POLL_INTERVAL, self._poll_sort)
                         
         except Exception as e:
             # Ensure exception doesn't crash the application
             logging.error(f"Error sorting column: {e}")
     
+    def _poll_sort(self):
+        """
+        Apply the orders computed by background sorts, once they are ready.
+        """
+        try:
+            while True:
+                request, order = self._sort_queue.get_nowait()
+                self._sorts_running -= 1
+                if order is not None:
+                    self._apply_sort(request, order)
+                    if request[0] == self._sort_id and 'update_status' in self.callbacks:
+                        self.callbacks['update_status'](f"Sorted {len(self.model.all_order)} results.")
+        except queue.Empty:
+            pass
+        if self._sorts_running:
+            self.results_tree.after(SORT_POLL_INTERVAL, self._poll_sort)
+    
+    def _apply_sort(self, request, order):
+        """
+        Show a sorted order, unless a newer sort was requested or the results were cleared.
+        
+        Args:
+            request: (sort id, model generation, row count) when the sort was requested
+            order: Sorted array of row numbers
+        """
+        sort_id, generation, row_count = request
+        if sort_id != self._sort_id or generation != self.model.generation:
+            return
+        self.model.set_order(order, row_count)
+        self._offset = 0
+        self._render()
+    
+    def _update_sort_headings(self, column):
+        """
+        Show the sort direction in the heading of the sorted column.
+        
+        Args:
+            column: Column ID sorted by
+        """
+        for col in self.results_tree['columns']:
+            # Reset all headers
+            if col == column:
+                # Use Up/Down arrows as sort indicators
+                direction = "▼" if self.sort_direction[column] else "▲"  # Down arrow if descending, up if ascending
+                self.results_tree.heading(col, text=f"{col.title()} {direction}")
+            else:
+                # Remove direction indicator from other columns
+                current_text = self.results_tree.heading(col)['text']
+                if current_text.endswith(" ▲") or current_text.endswith(" ▼"):
+                    self.results_tree.heading(col, text=current_text[:-2])
+                else:
+                    self.results_tree.heading(col, text=col.title())
+    
     def _column_resize_check(self, event):
         """Check if user clicked on column separator for resizing.
         
@@ -7,6 +7,7 @@ This module handles exporting search results to various formats.
 import os
 import csv
 import logging
+from core.search_results import ContentError, MoreHits
 
 class ExportManager:
     """
@@ -32,9 +33,9 @@ class ExportManager:
                 
                 # Handle both raw tuples and treeview items
                 if isinstance(results, list) and results and isinstance(results[0], tuple):
-                    # Direct list of tuples
+                    # Direct list of tuples (FileMatch records also carry mtime and size)
                     for row in results:
-                        writer.writerow(row)
+                        writer.writerow(row[:3])
                 else:
                     # Treeview items (ids that need values extracted)
                     for item_id in results:
@@ -76,20 +77,24 @@ class ExportManager:
                     
                     for file_path, findings in results_map.items():
                         # Handle error entries
-                        if len(findings) == 1 and 'error' in findings[0]:
-                            writer.writerow([file_path, "ERROR", "", "", findings[0]['error']])
+                        if len(findings) == 1 and isinstance(findings[0], ContentError):
+                            writer.writerow([file_path, "ERROR", "", "", findings[0].error])
                             continue
                             
                         # Handle normal findings
                         for finding in findings:
+                            if isinstance(finding, MoreHits):
+                                writer.writerow([file_path, "MORE HITS", "", "", f"{finding.count} more hits not shown"])
+                                continue
+                            
                             # Get a truncated value for CSV
-                            value_snippet = finding['value'][:200] if len(finding['value']) > 200 else finding['value']
+                            value_snippet = finding.value[:200] if len(finding.value) > 200 else finding.value
                             
                             writer.writerow([
                                 file_path,
-                                finding['keyword'],
-                                finding['sheet'],
-                                finding['cell'],
+                                finding.keyword,
+                                finding.sheet,
+                                finding.cell,
                                 value_snippet
                             ])
                 else:
@@ -99,17 +104,21 @@ class ExportManager:
                         f.write(f"Path: {file_path}\n\n")
                         
                         # Handle error entries
-                        if len(findings) == 1 and 'error' in findings[0]:
-                            f.write(f"  ERROR: {findings[0]['error']}\n\n")
+                        if len(findings) == 1 and isinstance(findings[0], ContentError):
+                            f.write(f"  ERROR: {findings[0].error}\n\n")
                             f.write("-" * 80 + "\n\n")
                             continue
                             
                         # Handle normal findings
                         for finding in findings:
-                            f.write(f"  • Keyword '{finding['keyword']}' found in Sheet '{finding['sheet']}', Cell {finding['cell']}\n")
+                            if isinstance(finding, MoreHits):
+                                f.write(f"  ... {finding.count} more hits not shown\n\n")
+                                continue
+                            
+                            f.write(f"  • Keyword '{finding.keyword}' found in Sheet '{finding.sheet}', Cell {finding.cell}\n")
                             
                             # Truncate long values
-                            display_value = finding['value']
+                            display_value = finding.value
                             if len(display_value) > 200:
                                 display_value = display_value[:200] + "..."
                                 